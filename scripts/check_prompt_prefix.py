@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Check that prompt prefixes stay byte-identical across requests.
+
+1. Assembles the summarizer and classifier prompts for different dates and
+   inputs and checks that their static prefixes hash the same.
+2. Runs a few different questions through the advisor (offline stub backends
+   by default, --live for the real model and search) with the prefix monitor
+   attached and reports, per caller, how many system prompt variants were seen.
+
+Exits with status 1 if any prefix drifted.
+
+Usage:
+    python scripts/check_prompt_prefix.py [--live]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import HumanMessage, SystemMessage  # noqa: E402
+
+from src.prompt_prefix import get_prefix_monitor, prefix_callbacks, prefix_hash  # noqa: E402
+from src.prompts import SUMMARIZE_WEB_SEARCH, SUMMARIZE_WEB_SEARCH_INPUT  # noqa: E402
+
+QUESTIONS = [
+    "What are the prerequisites for COMP3311?",
+    "Tell me about COMP9020 and COMP9021",
+    "What careers can a UNSW data science graduate pursue?",
+]
+
+
+def check_templates() -> bool:
+    """Hash the static prefix of summarizer prompts built for different days and pages."""
+    hashes = {
+        prefix_hash([
+            SystemMessage(content=SUMMARIZE_WEB_SEARCH),
+            HumanMessage(content=SUMMARIZE_WEB_SEARCH_INPUT.format(date=date, webpage_content=page)),
+        ])
+        for date, page in [("Mon Jan 1, 2024", "page one"), ("Tue Feb 2, 2027", "another page")]
+    }
+    ok = len(hashes) == 1
+    print(f"summarizer template: {'stable' if ok else 'DRIFTS'} ({len(hashes)} prefix hash(es))")
+    return ok
+
+
+async def run_questions(live: bool) -> None:
+    from unsw_deepagents_advisor import create_unsw_deep_agent
+    from src.stubs import install_stub_backends
+
+    agent = create_unsw_deep_agent(llm=None if live else install_stub_backends())
+    for question in QUESTIONS:
+        await agent.ainvoke(
+            {"messages": [HumanMessage(content=question)]},
+            config={"recursion_limit": 100, "callbacks": prefix_callbacks()},
+        )
+
+
+def main():
+    """Run both checks and print the per-caller report."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", action="store_true", help="Use the configured model and search APIs")
+    args = parser.parse_args()
+
+    ok = check_templates()
+    asyncio.run(run_questions(args.live))
+    monitor = get_prefix_monitor()
+    print(f"\n{'caller':<60} {'calls':>6} {'tool sets':>10} {'variants':>9}")
+    for caller, entry in sorted(monitor.report().items()):
+        print(f"{caller[:60]:<60} {entry['calls']:>6} {entry['tool_sets']:>10} {entry['system_prompt_variants']:>9}")
+    ok = ok and monitor.drifts == 0
+    print(f"\nPrefix drifts: {monitor.drifts}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Compare the local extractive summarizer with LLM page summaries.
+
+Each line of the input JSONL needs a "content" field (page markdown) and may
+carry "facts" (strings a useful summary should mention) and a "reference"
+summary. For every page and summarizer the report shows fact recall, ROUGE-1
+recall against the reference, summary length and latency.
+
+The LLM summarizer runs only with --llm (requires DASHSCOPE_API_KEY, or
+--stub for the offline stub model, which measures the plumbing, not quality).
+
+Usage:
+    python scripts/compare_summarizers.py [--data scripts/data/summarization_corpus.jsonl]
+                                          [--llm] [--stub] [--words 120]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from dotenv import load_dotenv
+
+from src.extractive import extractive_summary
+from src.fingerprint import STOPWORDS
+
+DEFAULT_DATA = os.path.join(os.path.dirname(__file__), "data", "summarization_corpus.jsonl")
+
+
+def load_rows(path: str) -> list[dict]:
+    """Load corpus rows from JSONL."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _words(text: str) -> list[str]:
+    return [w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in STOPWORDS]
+
+
+def rouge1_recall(summary: str, reference: str) -> float:
+    """Share of the reference's content words (with multiplicity) found in the summary."""
+    reference_counts = Counter(_words(reference))
+    if not reference_counts:
+        return 0.0
+    overlap = reference_counts & Counter(_words(summary))
+    return sum(overlap.values()) / sum(reference_counts.values())
+
+
+def fact_recall(summary: str, facts: list[str]) -> float:
+    """Share of the facts mentioned (case-insensitive) in the summary."""
+    if not facts:
+        return 0.0
+    return sum(fact.lower() in summary.lower() for fact in facts) / len(facts)
+
+
+def main():
+    """Run both summarizers over the corpus and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=DEFAULT_DATA, help="JSONL file with a 'content' field per line")
+    parser.add_argument("--llm", action="store_true", help="Also run the LLM summarizer")
+    parser.add_argument("--stub", action="store_true", help="Use the offline stub model for --llm")
+    parser.add_argument("--words", type=int, default=120, help="Extractive summary length in words")
+    args = parser.parse_args()
+
+    load_dotenv()
+    summarizers = {"extractive": lambda content: extractive_summary(content, args.words)["summary"]}
+    if args.llm:
+        if args.stub:
+            from src.stubs import install_stub_backends
+
+            install_stub_backends()
+        from src.tavilys import _generate_summary
+
+        def _llm(content: str) -> str:
+            # Bypass the summary cache so every run measures the model call
+            result = _generate_summary(content)
+            return result["summary"] if result else ""
+
+        summarizers["llm"] = _llm
+
+    rows = load_rows(args.data)
+    totals = {name: Counter() for name in summarizers}
+    for row in rows:
+        print(f"── {row.get('id', row.get('url', '?'))} ({len(row['content'])} chars)")
+        for name, summarize in summarizers.items():
+            start = time.perf_counter()
+            summary = summarize(row["content"])
+            seconds = time.perf_counter() - start
+            facts = fact_recall(summary, row.get("facts", []))
+            rouge = rouge1_recall(summary, row.get("reference", ""))
+            totals[name].update({"facts": facts, "rouge1": rouge, "words": len(summary.split()), "seconds": seconds})
+            print(f"  {name:<10} facts {facts:5.0%}  ROUGE-1 {rouge:5.0%}  {len(summary.split()):4d} words  "
+                  f"{seconds * 1e3:8.1f} ms")
+            flat = " ".join(summary.split())
+            print(f"             {flat[:160]}{'...' if len(flat) > 160 else ''}")
+
+    n = len(rows)
+    print("=" * 80)
+    print(f"Pages: {n}")
+    for name, total in totals.items():
+        print(f"{name:<10} mean fact recall {total['facts'] / n:5.1%}  mean ROUGE-1 {total['rouge1'] / n:5.1%}  "
+              f"mean {total['words'] / n:5.1f} words  mean latency {total['seconds'] / n * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
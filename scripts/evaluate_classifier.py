@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Compare the local complexity classifier with gold or LLM labels.
+
+Each line of the input JSONL needs a "request" field. Rows that already carry
+"task_type"/"difficulty" labels are used as-is; the bundled evaluation set is
+fully labelled, so the default run is offline. Unlabelled rows are labelled by
+the LLM classifier (requires DASHSCOPE_API_KEY), and --llm relabels every row
+with it. Reports accuracy overall and on the confident fast-path subset,
+fast-path coverage and per-request latency.
+
+Usage:
+    python scripts/evaluate_classifier.py [--data scripts/data/classifier_eval.jsonl]
+                                          [--threshold 0.9] [--llm] [--save-labels labelled.jsonl]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from dotenv import load_dotenv
+
+from src.complexity_classifier import CONFIDENCE_THRESHOLD, ComplexityClassifier
+
+DEFAULT_DATA = os.path.join(os.path.dirname(__file__), "data", "classifier_eval.jsonl")
+
+
+def load_rows(path: str) -> list[dict]:
+    """Load evaluation rows from JSONL."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    """Run the evaluation and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=DEFAULT_DATA, help="JSONL file with a 'request' field per line")
+    parser.add_argument("--threshold", type=float, default=CONFIDENCE_THRESHOLD, help="Fast-path confidence threshold")
+    parser.add_argument("--llm", action="store_true", help="Relabel every row with the LLM classifier")
+    parser.add_argument("--save-labels", help="Write the rows with LLM labels to this JSONL file")
+    args = parser.parse_args()
+
+    load_dotenv()
+    rows = load_rows(args.data)
+    classifier = ComplexityClassifier(confidence_threshold=args.threshold)
+
+    llm_seconds = []
+    unlabelled = []
+    for row in rows:
+        if args.llm or "task_type" not in row or "difficulty" not in row:
+            # Imported here so labelled runs need neither the model client nor an API key
+            from src.todo_tools import classify_with_llm
+
+            start = time.perf_counter()
+            labels = classify_with_llm(row["request"])
+            llm_seconds.append(time.perf_counter() - start)
+            if labels is None:
+                unlabelled.append(row)
+                continue
+            row.update(labels)
+    for row in unlabelled:
+        print(f"⚠️  No LLM label for {row['request']!r}; skipped")
+        rows.remove(row)
+
+    if args.save_labels:
+        with open(args.save_labels, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    totals = {"type": 0, "difficulty": 0, "joint": 0, "confident": 0, "confident_joint": 0}
+    local_seconds = []
+    for row in rows:
+        start = time.perf_counter()
+        predicted, confidence = classifier.predict_local(row["request"])
+        local_seconds.append(time.perf_counter() - start)
+
+        type_ok = predicted["task_type"] == row["task_type"]
+        difficulty_ok = predicted["difficulty"] == row["difficulty"]
+        totals["type"] += type_ok
+        totals["difficulty"] += difficulty_ok
+        totals["joint"] += type_ok and difficulty_ok
+        if confidence >= args.threshold:
+            totals["confident"] += 1
+            totals["confident_joint"] += type_ok and difficulty_ok
+        if not (type_ok and difficulty_ok):
+            print(f"✗ {row['request']!r}: local={predicted} ({confidence:.2f}) "
+                  f"label={{'task_type': {row['task_type']!r}, 'difficulty': {row['difficulty']!r}}}")
+
+    n = len(rows)
+    print("=" * 80)
+    print(f"Requests:              {n}")
+    print(f"task_type accuracy:    {totals['type'] / n:.1%}")
+    print(f"difficulty accuracy:   {totals['difficulty'] / n:.1%}")
+    print(f"joint accuracy:        {totals['joint'] / n:.1%}")
+    print(f"fast-path coverage:    {totals['confident'] / n:.1%} (threshold {args.threshold})")
+    if totals["confident"]:
+        print(f"fast-path accuracy:    {totals['confident_joint'] / totals['confident']:.1%}")
+    print(f"local latency (mean):  {sum(local_seconds) / n * 1e6:.0f} µs")
+    if llm_seconds:
+        print(f"LLM latency (mean):    {sum(llm_seconds) / len(llm_seconds) * 1e3:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
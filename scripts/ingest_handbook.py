@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Load a snapshot of UNSW handbook pages into the local full-text index.
+
+Walks a directory of saved handbook pages (.html/.htm, .md or .txt), converts
+HTML to markdown, detects each page's course or program code (file name,
+title, then page text) and stores it in the SQLite FTS5 index consulted by
+search_course_details, search_unsw_programs and parallel_course_details.
+A page's file modification time is its fetch time for staleness checks.
+Re-ingesting a page replaces it.
+
+Usage:
+    python scripts/ingest_handbook.py SNAPSHOT_DIR [--db data/handbook.sqlite]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.handbook import DEFAULT_HANDBOOK_DB, HANDBOOK_DB_ENV, HandbookIndex, ingest_directory  # noqa: E402
+
+
+def main():
+    """Ingest the snapshot directory and print what was indexed."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("snapshot_dir", help="Directory of saved handbook pages")
+    parser.add_argument(
+        "--db", default=os.environ.get(HANDBOOK_DB_ENV, DEFAULT_HANDBOOK_DB),
+        help=f"Index file (default: ${HANDBOOK_DB_ENV} or data/handbook.sqlite)",
+    )
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.db)), exist_ok=True)
+    start = time.perf_counter()
+    index = HandbookIndex(args.db)
+    counts = ingest_directory(index, args.snapshot_dir)
+    print(
+        f"Indexed {sum(counts.values())} page(s) in {time.perf_counter() - start:.1f}s "
+        f"({', '.join(f'{n} {kind}' for kind, n in sorted(counts.items())) or 'none'}); "
+        f"{index.count()} page(s) in {args.db}"
+    )
+
+
+if __name__ == "__main__":
+    main()
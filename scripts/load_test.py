@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Concurrent-session load test of the advisor on stub backends.
+
+Simulates N students, each asking a sequence of questions drawn from a mix of
+Simple, Moderate and Difficult templates, against one advisor built with
+create_unsw_deep_agent() (one conversation thread per session). The model,
+Tavily and page backends are the offline stubs with configurable latency
+distributions and error rates, so runs are repeatable and cost nothing.
+
+Reports throughput, error rate and p50/p95/p99 turn latency overall and per
+difficulty tier, and p50/p95/p99 latency per tool.
+
+Latency specs: "0.2" (seconds), "uniform:0.1,0.5", "lognormal:MEDIAN,SIGMA",
+"exp:MEAN".
+
+Usage:
+    python scripts/load_test.py [--sessions 20] [--turns 3] [--think-time 0.5]
+                                [--model-latency lognormal:0.4,0.5] [--search-latency lognormal:0.6,0.4]
+                                [--fetch-latency lognormal:0.3,0.8] [--model-error-rate 0.01]
+                                [--search-error-rate 0.02] [--fetch-error-rate 0.05]
+                                [--seed 7] [--json report.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from src.stubs import LatencyDistribution, install_stub_backends
+from src.utils import TurnTimings, iter_agent_events
+from unsw_deepagents_advisor import create_unsw_deep_agent
+
+COURSES = [
+    "COMP1511", "COMP1521", "COMP1531", "COMP2511", "COMP2521", "COMP3121", "COMP3311", "COMP3331",
+    "COMP3900", "COMP6080", "COMP6441", "COMP6771", "COMP9020", "COMP9021", "COMP9024", "COMP9311",
+    "COMP9331", "COMP9414", "COMP9417", "COMP9444", "MATH1131", "MATH1231", "DATA3001", "ZZSC9020",
+]
+PROGRAMS = [("Master of Information Technology", "8543"), ("Bachelor of Computer Science", "3778"),
+            ("Master of Data Science", "8959"), ("Master of Computing", "8545")]
+
+# Question templates per expected difficulty tier, with the share of traffic each tier gets
+QUESTION_MIX = {
+    "Simple": (0.5, [
+        "What are the prerequisites for {course}?",
+        "How many units of credit is {course}?",
+        "Is {course} offered in term 3?",
+    ]),
+    "Moderate": (0.35, [
+        "Compare {course} and {course2} for a student interested in AI",
+        "What is the {program} ({code}) and which core courses does it have?",
+        "Which courses should I take before {course}?",
+    ]),
+    "Difficult": (0.15, [
+        "Plan my {program} ({code}) over 6 terms including {course} and electives",
+        "I'm an international student in the {program}; plan my study and tell me about visa work limits and careers",
+    ]),
+}
+
+
+def sample_question(rng: random.Random) -> tuple[str, str]:
+    """Draw (expected tier, question) from the mix."""
+    tiers = list(QUESTION_MIX)
+    tier = rng.choices(tiers, weights=[QUESTION_MIX[t][0] for t in tiers])[0]
+    course, course2 = rng.sample(COURSES, 2)
+    program, code = rng.choice(PROGRAMS)
+    template = rng.choice(QUESTION_MIX[tier][1])
+    return tier, template.format(course=course, course2=course2, program=program, code=code)
+
+
+def percentiles(values: list[float]) -> dict:
+    """Nearest-rank p50/p95/p99 of a list of seconds."""
+    if not values:
+        return {"p50": None, "p95": None, "p99": None}
+    ordered = sorted(values)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+    return {"p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+class ToolTimer(BaseCallbackHandler):
+    """Collects the wall time and outcome of every tool run (sub-agent tools included)."""
+
+    def __init__(self):
+        self.started: dict = {}
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self.started[run_id] = ((serialized or {}).get("name") or kwargs.get("name") or "tool", time.perf_counter())
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        name, start = self.started.pop(run_id, (None, None))
+        if name is not None:
+            self.latencies[name].append(time.perf_counter() - start)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        name, start = self.started.pop(run_id, (None, None))
+        if name is not None:
+            self.latencies[name].append(time.perf_counter() - start)
+            self.errors[name] += 1
+
+
+async def run_session(agent, session: int, turns: int, think_time: float, rng: random.Random, tool_timer, results):
+    """One simulated student asking `turns` questions in one conversation thread."""
+    thread_id = f"load-{session}-{uuid.uuid4().hex[:6]}"
+    for _ in range(turns):
+        expected, question = sample_question(rng)
+        timings = TurnTimings()
+        config = {"recursion_limit": 100, "configurable": {"thread_id": thread_id}, "callbacks": [tool_timer]}
+        started = time.perf_counter()
+        row = {"session": session, "expected_tier": expected, "question": question}
+        try:
+            final_state = {}
+            async for event in iter_agent_events(
+                agent, {"messages": [HumanMessage(content=question)]}, config=config, timings=timings
+            ):
+                if event["type"] == "final":
+                    final_state = event["state"] or {}
+            classification = final_state.get("task_classification") or {}
+            row.update(ok=True, tier=classification.get("difficulty", expected), **timings.as_dict())
+        except Exception as e:
+            row.update(ok=False, tier=expected, error=f"{type(e).__name__}: {e}", total=time.perf_counter() - started)
+        results.append(row)
+        if think_time:
+            await asyncio.sleep(rng.expovariate(1 / think_time))
+
+
+async def run_load_test(args) -> dict:
+    """Run every session concurrently and build the report."""
+    model = install_stub_backends(
+        model_latency=LatencyDistribution.parse(args.model_latency, args.seed),
+        search_latency=LatencyDistribution.parse(args.search_latency, args.seed + 1),
+        fetch_latency=LatencyDistribution.parse(args.fetch_latency, args.seed + 2),
+        model_error_rate=args.model_error_rate,
+        search_error_rate=args.search_error_rate,
+        fetch_error_rate=args.fetch_error_rate,
+        seed=args.seed,
+    )
+    agent = create_unsw_deep_agent(llm=model, checkpointer=InMemorySaver())
+    # Sync tools and stub calls run in the default executor; size it for the simulated load
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=max(32, args.sessions * 4)))
+
+    tool_timer = ToolTimer()
+    results: list[dict] = []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        run_session(agent, i, args.turns, args.think_time, random.Random(args.seed * 1000 + i), tool_timer, results)
+        for i in range(args.sessions)
+    ))
+    wall = time.perf_counter() - started
+
+    ok = [r for r in results if r["ok"]]
+    by_tier = defaultdict(list)
+    for r in ok:
+        by_tier[r["tier"]].append(r["total"])
+    return {
+        "config": {k: (str(v) if isinstance(v, LatencyDistribution) else v) for k, v in vars(args).items()},
+        "turns": len(results),
+        "errors": len(results) - len(ok),
+        "error_rate": round((len(results) - len(ok)) / len(results), 4) if results else 0.0,
+        "wall_seconds": round(wall, 2),
+        "throughput_turns_per_second": round(len(ok) / wall, 3) if wall else 0.0,
+        "latency": percentiles([r["total"] for r in ok]),
+        "time_to_first_token": percentiles([r["time_to_first_token"] for r in ok if r.get("time_to_first_token") is not None]),
+        "by_tier": {tier: {"turns": len(v), **percentiles(v)} for tier, v in sorted(by_tier.items())},
+        "by_tool": {
+            name: {"calls": len(v), "errors": tool_timer.errors[name], **percentiles(v)}
+            for name, v in sorted(tool_timer.latencies.items())
+        },
+        "sample_errors": sorted({r["error"] for r in results if not r["ok"]})[:5],
+    }
+
+
+def print_report(report: dict) -> None:
+    """Print the report as tables."""
+    fmt = lambda v: f"{v:8.3f}" if v is not None else "       -"
+    print("=" * 80)
+    print(f"Turns: {report['turns']}  errors: {report['errors']} ({report['error_rate']:.1%})  "
+          f"wall: {report['wall_seconds']}s  throughput: {report['throughput_turns_per_second']} turns/s")
+    print(f"{'':<38}{'count':>7}{'p50':>9}{'p95':>9}{'p99':>9}")
+    row = lambda label, n, p: print(f"{label:<38}{n:>7}{fmt(p['p50'])}{fmt(p['p95'])}{fmt(p['p99'])}")
+    row("all turns (s)", report["turns"] - report["errors"], report["latency"])
+    row("time to first token (s)", report["turns"] - report["errors"], report["time_to_first_token"])
+    print("-- by difficulty tier")
+    for tier, stats in report["by_tier"].items():
+        row(f"  {tier}", stats["turns"], stats)
+    print("-- by tool (calls, errors in brackets)")
+    for name, stats in report["by_tool"].items():
+        row(f"  {name} [{stats['errors']}]", stats["calls"], stats)
+    for error in report["sample_errors"]:
+        print(f"✗ {error}")
+
+
+def main():
+    """Parse options, run the load test and print (and optionally save) the report."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent simulated sessions")
+    parser.add_argument("--turns", type=int, default=3, help="Questions per session")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Mean pause between a session's questions (s)")
+    parser.add_argument("--model-latency", default="lognormal:0.4,0.5", help="Stub model latency spec")
+    parser.add_argument("--search-latency", default="lognormal:0.6,0.4", help="Stub Tavily search latency spec")
+    parser.add_argument("--fetch-latency", default="lognormal:0.3,0.8", help="Stub page fetch latency spec")
+    parser.add_argument("--model-error-rate", type=float, default=0.0, help="Share of model calls that fail")
+    parser.add_argument("--search-error-rate", type=float, default=0.0, help="Share of searches that fail")
+    parser.add_argument("--fetch-error-rate", type=float, default=0.0, help="Share of page fetches answered with 503")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for questions, latencies and errors")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load_test(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
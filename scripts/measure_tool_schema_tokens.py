@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Measure the tool-schema prompt tokens bound to the main agent per tier.
+
+Every ReAct step sends the JSON schemas of all bound tools. For each task type
+and difficulty this prints the tools the budget controller binds, their schema
+size in tokens (tiktoken, or ~4 characters per token offline) and the saving
+per model step compared with binding the full tool set.
+
+Usage:
+    python scripts/measure_tool_schema_tokens.py
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.utils.function_calling import convert_to_openai_tool  # noqa: E402
+
+from src.budget import BudgetController, select_tool_names  # noqa: E402
+from src.complexity_classifier import DIFFICULTIES, TASK_TYPES  # noqa: E402
+from src.stubs import StubChatModel  # noqa: E402
+from src.usage import estimate_tokens  # noqa: E402
+from unsw_deepagents_advisor import create_main_tools  # noqa: E402
+
+
+def schema_tokens(tools: list) -> int:
+    """Tokens of the tool schemas as sent to an OpenAI-compatible endpoint."""
+    return estimate_tokens(json.dumps([convert_to_openai_tool(t) for t in tools], ensure_ascii=False))
+
+
+def main():
+    """Print the per-tier tool schema token table."""
+    controller = BudgetController(StubChatModel(), create_main_tools(StubChatModel()))
+    full = schema_tokens(controller.tools)
+    print(f"Full tool set: {len(controller.tools)} tools, {full:,} schema tokens per model step\n")
+    print(f"{'task type':<24} {'difficulty':<10} {'tools':>5} {'tokens':>7} {'saved':>7} {'saved %':>8}")
+    for task_type in TASK_TYPES:
+        for difficulty in DIFFICULTIES:
+            tools = controller.tools_for(select_tool_names({"task_type": task_type, "difficulty": difficulty}))
+            tokens = schema_tokens(tools)
+            print(
+                f"{task_type:<24} {difficulty:<10} {len(tools):>5} {tokens:>7,} "
+                f"{full - tokens:>7,} {(full - tokens) / full:>8.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
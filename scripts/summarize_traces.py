@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Summarize a JSONL trace file written with --trace.
+
+Groups spans by name (e.g. "tavily.search", "page.markdownify", "tool
+search_course_details", "llm ChatQwen", "subagent course-planner") and reports
+count, total, p50, p95 and max duration, plus the share of each turn's wall
+time (root span duration) spent in that kind of span.
+
+Usage:
+    python scripts/summarize_traces.py traces.jsonl [--top 20]
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.tracing import iter_otlp_spans
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an unsorted list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))]
+
+
+def main():
+    """Print the per-span-name latency table."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="JSONL trace file")
+    parser.add_argument("--top", type=int, default=20, help="Rows to show, by total time (default: 20)")
+    args = parser.parse_args()
+
+    durations = defaultdict(list)
+    root_total = 0.0
+    roots = 0
+    with open(args.path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for span in iter_otlp_spans(json.loads(line)):
+                ms = (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+                durations[span["name"]].append(ms)
+                if "parentSpanId" not in span:
+                    root_total += ms
+                    roots += 1
+
+    print(f"{roots} trace(s), {sum(len(v) for v in durations.values())} span(s), {root_total / 1000:.1f}s in root spans\n")
+    print(f"{'span':<40} {'count':>6} {'total s':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'% root':>7}")
+    rows = sorted(durations.items(), key=lambda item: sum(item[1]), reverse=True)[: args.top]
+    for name, values in rows:
+        total = sum(values)
+        share = total / root_total if root_total else 0.0
+        print(
+            f"{name[:40]:<40} {len(values):>6} {total / 1000:>9.2f} {percentile(values, 0.5):>9.1f} "
+            f"{percentile(values, 0.95):>9.1f} {max(values):>9.1f} {share:>7.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Aggregate a token usage log written with ADVISOR_USAGE_LOG.
+
+Prints totals and the per-source breakdown (main agent, each sub-agent,
+summarization, classification), most expensive first, followed by the most
+expensive requests.
+
+Usage:
+    python scripts/usage_report.py usage.jsonl [--top 10]
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.usage import UsageRecord, format_usage_report, summarize_records
+
+
+def main():
+    """Print the aggregate and per-request usage report."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="JSONL usage log")
+    parser.add_argument("--top", type=int, default=10, help="Most expensive requests to list (default: 10)")
+    args = parser.parse_args()
+
+    with open(args.path, encoding="utf-8") as f:
+        records = [UsageRecord(**json.loads(line)) for line in f if line.strip()]
+
+    report = summarize_records(records)
+    print(f"{report['requests']} request(s): {format_usage_report(report)}\n")
+
+    by_request = defaultdict(list)
+    for record in records:
+        by_request[record.request_id].append(record)
+    costliest = sorted(by_request.items(), key=lambda item: sum(r.cost_usd for r in item[1]), reverse=True)
+    print(f"Top {min(args.top, len(costliest))} request(s) by cost:")
+    for request_id, request_records in costliest[: args.top]:
+        request_report = summarize_records(request_records)
+        top_source = next(iter(request_report["by_source"]), "-")
+        print(
+            f"  {request_id}  ${request_report['cost_usd']:.5f}  "
+            f"{request_report['input_tokens']:,} in / {request_report['output_tokens']:,} out  "
+            f"(largest: {top_source})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Batch question answering over a JSONL file of questions.
+
+Advisor staff preparing FAQ answers run hundreds of questions at a time. Each
+input line holds a question ({"question": "..."}, or "request" / "message"),
+optionally with an "id". Questions run concurrently, up to a parallelism
+limit, in one process, so they share the search, page and summary caches,
+the HTTP and model clients and the response cache.
+
+Every finished question is appended to the output JSONL at once, with its
+answer, files, timings, budget and token usage. A rerun with the same output
+file skips the questions already answered, so an interrupted batch resumes
+where it stopped; failed questions are retried.
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+
+from langchain_core.messages import HumanMessage
+
+from src.prompt_prefix import prefix_callbacks
+from src.tracing import tracing_callbacks
+from src.usage import get_usage_ledger, usage_callbacks
+from src.utils import TurnTimings, iter_agent_events
+
+QUESTION_FIELDS = ("question", "request", "message")
+
+
+def load_questions(path: str) -> list[dict]:
+    """Read the batch input: one {"id", "question"} dict per non-empty line.
+
+    Lines without an id are numbered by line ("line-12"), so ids stay stable
+    across reruns of the same file.
+    """
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            text = next((row[k] for k in QUESTION_FIELDS if isinstance(row.get(k), str) and row[k].strip()), None)
+            if text is None:
+                raise ValueError(f"{path}:{number}: no question field ({', '.join(QUESTION_FIELDS)})")
+            questions.append({"id": str(row.get("id", f"line-{number}")), "question": text.strip()})
+    return questions
+
+
+def answered_ids(path: str) -> set[str]:
+    """Ids already answered successfully in an existing output file."""
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by an interruption; that question runs again
+                continue
+            if row.get("status") == "ok":
+                done.add(row["id"])
+    return done
+
+
+def default_output_path(input_path: str) -> str:
+    """questions.jsonl -> questions.answers.jsonl"""
+    root, _ = os.path.splitext(input_path)
+    return f"{root}.answers.jsonl"
+
+
+async def answer_question(agent, item: dict, response_cache=None, recursion_limit: int = 100) -> dict:
+    """Answer one batch question and return its output row."""
+    started = time.time()
+    row = {"id": item["id"], "question": item["question"], "started_at": started}
+    cached = response_cache.lookup(item["question"]) if response_cache is not None else None
+    if cached is not None:
+        return {
+            **row,
+            "status": "ok",
+            "answer": cached.answer,
+            "files": cached.files,
+            "cached": {"matched_query": cached.matched_query, "similarity": round(cached.similarity, 3)},
+            "timings": {"total": time.time() - started},
+        }
+
+    timings = TurnTimings()
+    request_id = uuid.uuid4().hex
+    config = {
+        "recursion_limit": recursion_limit,
+        "callbacks": [*tracing_callbacks(), *usage_callbacks(request_id), *prefix_callbacks()],
+    }
+    try:
+        final_state = {}
+        async for event in iter_agent_events(
+            agent, {"messages": [HumanMessage(content=item["question"])]}, config=config, timings=timings
+        ):
+            if event["type"] == "final":
+                final_state = event["state"] or {}
+        messages = final_state.get("messages") or []
+        answer = messages[-1].content if messages else ""
+        files = dict(final_state.get("files") or {})
+        if response_cache is not None and answer:
+            response_cache.store(item["question"], answer, files)
+        return {
+            **row,
+            "status": "ok",
+            "answer": answer,
+            "files": files,
+            "timings": timings.as_dict(),
+            "budget_usage": final_state.get("budget_usage"),
+            "token_usage": get_usage_ledger().report(request_id),
+        }
+    except Exception as e:
+        return {**row, "status": "error", "error": f"{type(e).__name__}: {e}", "timings": {"total": time.time() - started}}
+    finally:
+        get_usage_ledger().finish(request_id)
+
+
+async def run_batch(
+    agent,
+    input_path: str,
+    output_path: str | None = None,
+    concurrency: int = 4,
+    response_cache=None,
+    progress=print,
+) -> dict:
+    """Answer every question of a JSONL file, appending results to the output file.
+
+    Args:
+        agent: Compiled advisor graph (shared by all questions)
+        input_path: JSONL file of questions
+        output_path: JSONL file the answers are appended to (default: <input>.answers.jsonl)
+        concurrency: Questions running at once
+        response_cache: Optional ResponseCache answering repeated questions
+        progress: Callable receiving one progress line per finished question
+
+    Returns:
+        Batch summary: counts, wall time, throughput and latency percentiles
+    """
+    output_path = output_path or default_output_path(input_path)
+    questions = load_questions(input_path)
+    done = answered_ids(output_path)
+    pending = [q for q in questions if q["id"] not in done]
+    if len(pending) < len(questions):
+        progress(f"↩️  Resuming: {len(questions) - len(pending)} of {len(questions)} question(s) already answered")
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    counts = {"ok": 0, "error": 0, "skipped": len(questions) - len(pending)}
+    latencies = []
+    started = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as out:
+
+        async def _run(item: dict):
+            async with semaphore:
+                row = await answer_question(agent, item, response_cache)
+            # Written as soon as it finishes, so an interruption loses only running questions
+            out.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+            out.flush()
+            counts[row["status"]] += 1
+            total = (row.get("timings") or {}).get("total")
+            if total is not None:
+                latencies.append(total)
+            finished = counts["ok"] + counts["error"]
+            mark = "✅" if row["status"] == "ok" else "❌"
+            detail = f"{total:.1f}s" if total is not None else ""
+            if row["status"] == "error":
+                detail += f" {row['error']}"
+            progress(f"{mark} [{finished}/{len(pending)}] {row['id']} {detail}".rstrip())
+
+        await asyncio.gather(*(_run(item) for item in pending))
+
+    wall = time.perf_counter() - started
+    latencies.sort()
+    summary = {
+        "output": output_path,
+        "questions": len(questions),
+        **counts,
+        "wall_seconds": round(wall, 2),
+        "questions_per_minute": round((counts["ok"] + counts["error"]) / wall * 60, 2) if wall > 0 and pending else 0.0,
+    }
+    if latencies:
+        summary["p50_seconds"] = round(latencies[len(latencies) // 2], 2)
+        summary["p95_seconds"] = round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 2)
+    return summary
@@ -0,0 +1,222 @@
+"""In-graph enforcement of per-difficulty tool-call and latency budgets.
+
+The budgets in the prompts ("Simple: ≤1 tool call, target ≤30s", ...) used to be
+advisory only. The controller here reads the `task_classification` produced
+before the agent starts, counts search tool calls and elapsed time for the
+current turn, and once a budget runs out forces a final-answer step by giving
+the model no tools to call. Every finished turn is logged with how close it
+came to its budget.
+
+Within budget, the model is bound only to the tools its request can use: the
+search tools of its task type, plus parallel, reflection and delegation tools
+as the difficulty grows. Every tool schema is sent on every ReAct step, so a
+simple course lookup no longer pays for all seventeen.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.complexity_classifier import DIFFICULTIES, TASK_TYPES
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TierBudget:
+    """Tool-call and wall-clock budget for one difficulty tier."""
+
+    max_tool_calls: int
+    max_seconds: float
+
+
+# Mirrors COMPLEXITY MAPPING in TODO_USAGE_INSTRUCTIONS
+BUDGETS = {
+    "Simple": TierBudget(max_tool_calls=1, max_seconds=30.0),
+    "Moderate": TierBudget(max_tool_calls=2, max_seconds=120.0),
+    "Difficult": TierBudget(max_tool_calls=3, max_seconds=180.0),
+}
+DEFAULT_TIER = "Moderate"
+
+# Planning, reflection and file tools do not count against the search budget
+BOOKKEEPING_TOOLS = frozenset(
+    {"classify_task_complexity", "write_todos", "read_todos", "think_tool", "ls", "read_file", "write_file"}
+)
+
+# Search tools (single, parallel) that serve each task type
+TASK_TYPE_TOOLS = {
+    "Course Planning": (["search_course_details", "search_unsw_programs"], ["parallel_course_details"]),
+    "Program Info": (["search_unsw_programs", "search_course_details"], ["parallel_unsw_programs"]),
+    "Career Advice": (["search_career_opportunities"], ["parallel_career_opportunities"]),
+    "International Support": (["search_international_student_info"], ["parallel_international_info"]),
+    "Comparison": (
+        ["search_unsw_programs", "search_course_details"],
+        ["parallel_unsw_programs", "parallel_course_details", "parallel_tavily_search"],
+    ),
+    "General Inquiry": (
+        ["search_unsw_programs", "search_course_details", "search_career_opportunities", "search_international_student_info"],
+        ["parallel_tavily_search"],
+    ),
+}
+
+# Tools added per difficulty on top of the task type's single search tools;
+# Difficult requests keep the full tool set. The TODO tools are always bound:
+# the system prompt asks for a TODO list at every tier
+SIMPLE_TOOLS = ("ls", "read_file", "write_todos", "read_todos")
+MODERATE_TOOLS = (*SIMPLE_TOOLS, "think_tool", "task")
+
+
+def select_tool_names(classification: dict | None) -> frozenset[str] | None:
+    """Names of the tools to bind for a classified request, or None for all tools."""
+    if not classification:
+        return None
+    task_type = classification.get("task_type")
+    difficulty = classification.get("difficulty", DEFAULT_TIER)
+    if task_type not in TASK_TYPE_TOOLS or difficulty == "Difficult":
+        return None
+    single, parallel = TASK_TYPE_TOOLS[task_type]
+    if difficulty == "Simple":
+        return frozenset([*single, *SIMPLE_TOOLS])
+    return frozenset([*single, *parallel, *MODERATE_TOOLS])
+
+
+FINAL_ANSWER_NOTICE = (
+    "⏱️ The {reason} budget for this {tier} request is used up "
+    "({tool_calls}/{max_tool_calls} tool calls, {elapsed:.0f}s/{max_seconds:.0f}s). "
+    "Do not call any more tools. Answer the question now, concisely, using the "
+    "information already gathered (read_file results and tool outputs above)."
+)
+
+
+# Name given to the injected final-answer notice so it is not mistaken for a new turn
+NOTICE_NAME = "budget_controller"
+
+# Id prefix of the tool calls injected by the pre-agent speculation stage; the
+# agent did not choose them, so they do not count against its budget
+SPECULATIVE_ID_PREFIX = "speculative_"
+
+
+def _current_turn(messages: list) -> list:
+    """Return the messages after the most recent (real) human message."""
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage) and messages[i].name != NOTICE_NAME:
+            return messages[i + 1:]
+    return messages
+
+
+def turn_usage(state: dict, now: float | None = None) -> dict:
+    """Measure the current turn against its tier budget.
+
+    Tool calls are counted in rounds: one model step that issues several
+    search calls at once (a parallel batch) counts as one tool call. Calls
+    injected by the speculation stage are not counted.
+
+    Args:
+        state: Agent state with messages, task_classification and turn_started_at
+        now: Current time (default: time.time())
+
+    Returns:
+        Dict with tier, tool_calls, max_tool_calls, elapsed, max_seconds,
+        exhausted (bool) and reason ("tool-call", "time" or None)
+    """
+    tier = (state.get("task_classification") or {}).get("difficulty", DEFAULT_TIER)
+    budget = BUDGETS.get(tier, BUDGETS[DEFAULT_TIER])
+    started = state.get("turn_started_at")
+    elapsed = ((now or time.time()) - started) if started else 0.0
+
+    tool_calls = 0
+    for message in _current_turn(state.get("messages", [])):
+        if isinstance(message, AIMessage) and any(
+            call["name"] not in BOOKKEEPING_TOOLS and not (call.get("id") or "").startswith(SPECULATIVE_ID_PREFIX)
+            for call in message.tool_calls
+        ):
+            tool_calls += 1
+
+    reason = None
+    if tool_calls >= budget.max_tool_calls:
+        reason = "tool-call"
+    elif elapsed >= budget.max_seconds:
+        reason = "time"
+
+    return {
+        "tier": tier,
+        "tool_calls": tool_calls,
+        "max_tool_calls": budget.max_tool_calls,
+        "elapsed": elapsed,
+        "max_seconds": budget.max_seconds,
+        "exhausted": reason is not None,
+        "reason": reason,
+    }
+
+
+def format_budget_usage(usage: dict) -> str:
+    """One-line human-readable summary of a turn's budget usage."""
+    return (
+        f"{usage['tier']}: {usage['tool_calls']}/{usage['max_tool_calls']} tool calls "
+        f"({usage['tool_calls'] / usage['max_tool_calls']:.0%}), "
+        f"{usage['elapsed']:.1f}s/{usage['max_seconds']:.0f}s "
+        f"({usage['elapsed'] / usage['max_seconds']:.0%})"
+        + (f", forced final answer ({usage['reason']} budget)" if usage.get("forced") else "")
+    )
+
+
+class BudgetController:
+    """Model selection and hooks that enforce the tier budgets inside the graph.
+
+    Pass `select_model` as the model of create_react_agent together with
+    `pre_model_hook` and `post_model_hook`. The agent's ToolNode should hold
+    all tools; `select_model` only narrows which schemas the model sees.
+    """
+
+    def __init__(self, model, tools: list):
+        """Create a controller.
+
+        Args:
+            model: The chat model (without tools bound)
+            tools: Tools the agent may call while within budget
+        """
+        self.model = model
+        self.tools = tools
+        self._bound_model = model.bind_tools(tools)
+        # Bind every reduced tool set once up front; binding converts the schemas
+        self._bound_subsets: dict[frozenset[str], object] = {}
+        for task_type in TASK_TYPES:
+            for difficulty in DIFFICULTIES:
+                names = select_tool_names({"task_type": task_type, "difficulty": difficulty})
+                if names is not None and names not in self._bound_subsets:
+                    self._bound_subsets[names] = model.bind_tools(self.tools_for(names))
+
+    def tools_for(self, names: frozenset[str] | None) -> list:
+        """The controller's tools restricted to `names` (all tools for None), in original order."""
+        if names is None:
+            return list(self.tools)
+        return [t for t in self.tools if t.name in names]
+
+    def select_model(self, state: dict, runtime=None):
+        """Return the model bound to the request's tool set, or the bare model once the budget is spent."""
+        if turn_usage(state)["exhausted"]:
+            return self.model
+        names = select_tool_names(state.get("task_classification"))
+        return self._bound_subsets.get(names, self._bound_model)
+
+    def pre_model_hook(self, state: dict) -> dict:
+        """Tell the model to answer now when the budget is spent."""
+        usage = turn_usage(state)
+        # Always set llm_input_messages so a notice from an earlier step never lingers
+        if not usage["exhausted"]:
+            return {"llm_input_messages": state["messages"]}
+        notice = HumanMessage(content=FINAL_ANSWER_NOTICE.format(**usage), name=NOTICE_NAME)
+        return {"llm_input_messages": [*state["messages"], notice]}
+
+    def post_model_hook(self, state: dict) -> dict:
+        """Record and log budget usage when the model produces its final answer."""
+        last = state["messages"][-1]
+        if isinstance(last, AIMessage) and last.tool_calls:
+            return {}
+        usage = turn_usage(state)
+        # The answer step itself was forced if the budget was already spent before it
+        usage["forced"] = usage["exhausted"]
+        logger.info("Turn budget usage: %s", format_budget_usage(usage))
+        return {"budget_usage": usage}
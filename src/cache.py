@@ -0,0 +1,333 @@
+"""Caches for search results, fetched pages and page summaries.
+
+Values are JSON-serializable and stored per namespace with a time-to-live:
+- "search": Tavily responses keyed by query and options
+- "page": fetched pages converted to markdown, keyed by URL
+- "summary": summaries keyed by a hash of the page content
+
+`MemoryCache` lives in one process. `SQLiteCache` stores entries in a local
+SQLite file (WAL mode) so several worker processes share one cache, with a
+small in-memory layer in front of it for hot keys.
+
+Entries are kept for a grace period after they expire. `get_or_load` serves
+such a stale entry immediately and refreshes it in the background on a small
+bounded pool (stale-while-revalidate), so a popular page never makes a user
+wait for a full refetch. Loads of the same key are single-flight: concurrent
+misses share one load and a key is never refreshed twice at once.
+"""
+
+import contextvars
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Default time-to-live per namespace (seconds)
+DEFAULT_TTLS = {
+    "search": 6 * 60 * 60,
+    "page": 24 * 60 * 60,
+    "summary": 7 * 24 * 60 * 60,
+}
+FALLBACK_TTL = 60 * 60
+
+# How long past expiry an entry may still be served while it is refreshed (seconds)
+STALE_TTLS = {
+    "search": 24 * 60 * 60,
+    "page": 7 * 24 * 60 * 60,
+    "summary": 30 * 24 * 60 * 60,
+}
+FALLBACK_STALE_TTL = 0
+
+# Background refresh pool size and the most refreshes allowed to wait for it
+REFRESH_WORKERS = 2
+MAX_PENDING_REFRESHES = 64
+
+# The shared cache file deletes rows past their grace period when it is opened
+# and then once every this many writes
+PURGE_EVERY_SETS = 1000
+
+# Environment variable naming the shared cache file (unset: per-process memory cache)
+CACHE_PATH_ENV = "ADVISOR_CACHE_PATH"
+
+
+def make_key(*parts) -> str:
+    """Build a compact, stable cache key from arbitrary JSON-serializable parts."""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class MemoryCache:
+    """Thread-safe in-process LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def get(self, namespace: str, key: str):
+        """Return the cached value, or None when missing or expired."""
+        entry = self.lookup(namespace, key)
+        if entry is None or entry[1]:
+            return None
+        return entry[0]
+
+    def lookup(self, namespace: str, key: str) -> tuple[object, bool] | None:
+        """Return (value, stale), or None when missing or past the stale grace period."""
+        with self._lock:
+            item = self._entries.get((namespace, key))
+            if item is None:
+                self.stats[f"{namespace}_misses"] += 1
+                return None
+            expires_at, value = item
+            now = time.time()
+            if expires_at + STALE_TTLS.get(namespace, FALLBACK_STALE_TTL) < now:
+                del self._entries[(namespace, key)]
+                self.stats[f"{namespace}_misses"] += 1
+                return None
+            self._entries.move_to_end((namespace, key))
+            stale = expires_at < now
+            self.stats[f"{namespace}_{'stale_hits' if stale else 'hits'}"] += 1
+            return value, stale
+
+    def set(self, namespace: str, key: str, value, ttl: float | None = None, expires_at: float | None = None) -> None:
+        """Store a value for ttl seconds (default: the namespace TTL)."""
+        if expires_at is None:
+            expires_at = time.time() + (ttl if ttl is not None else DEFAULT_TTLS.get(namespace, FALLBACK_TTL))
+        with self._lock:
+            self._entries[(namespace, key)] = (expires_at, value)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteCache:
+    """Cache shared by all processes on a host through one SQLite file."""
+
+    def __init__(self, path: str, memory_entries: int = 1024, purge_every: int = PURGE_EVERY_SETS):
+        """Open (and create if needed) the shared cache, purging rows past their grace period.
+
+        Args:
+            path: SQLite database file shared by the worker processes
+            memory_entries: Size of the per-process in-memory layer
+            purge_every: Purge expired rows once every this many writes (0: only when opened)
+        """
+        self.path = path
+        self.purge_every = purge_every
+        self._memory = MemoryCache(max_entries=memory_entries)
+        self._local = threading.local()
+        self._writes = itertools.count(1)
+        self.stats = Counter()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+        self.purge_expired()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads; one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace: str, key: str):
+        """Return the cached value, or None when missing or expired."""
+        entry = self.lookup(namespace, key)
+        if entry is None or entry[1]:
+            return None
+        return entry[0]
+
+    def lookup(self, namespace: str, key: str) -> tuple[object, bool] | None:
+        """Return (value, stale), or None when missing or past the stale grace period."""
+        entry = self._memory.lookup(namespace, key)
+        if entry is not None and not entry[1]:
+            self.stats[f"{namespace}_hits"] += 1
+            return entry
+        # A stale in-process copy may already have been refreshed by another process
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        now = time.time()
+        if row is None or row[1] + STALE_TTLS.get(namespace, FALLBACK_STALE_TTL) < now:
+            self.stats[f"{namespace}_misses"] += 1
+            return None
+        value = json.loads(row[0])
+        self._memory.set(namespace, key, value, expires_at=row[1])
+        stale = row[1] < now
+        self.stats[f"{namespace}_{'stale_hits' if stale else 'hits'}"] += 1
+        if not stale:
+            self.stats[f"{namespace}_shared_hits"] += 1
+        return value, stale
+
+    def set(self, namespace: str, key: str, value, ttl: float | None = None) -> None:
+        """Store a value for ttl seconds (default: the namespace TTL)."""
+        expires_at = time.time() + (ttl if ttl is not None else DEFAULT_TTLS.get(namespace, FALLBACK_TTL))
+        self._memory.set(namespace, key, value, expires_at=expires_at)
+        self._connection().execute(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value, ensure_ascii=False), expires_at),
+        )
+        # Every worker writes here, so the file stays bounded without a separate janitor
+        if self.purge_every and next(self._writes) % self.purge_every == 0:
+            self.purge_expired()
+
+    def purge_expired(self) -> int:
+        """Delete rows past their stale grace period; returns the number removed."""
+        conn = self._connection()
+        now = time.time()
+        removed = conn.execute(
+            f"DELETE FROM cache WHERE namespace NOT IN ({', '.join('?' * len(STALE_TTLS))}) AND expires_at < ?",
+            (*STALE_TTLS, now - FALLBACK_STALE_TTL),
+        ).rowcount
+        for namespace, grace in STALE_TTLS.items():
+            removed += conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND expires_at < ?", (namespace, now - grace)
+            ).rowcount
+        self.stats["purges"] += 1
+        self.stats["purged"] += removed
+        return removed
+
+
+class Refresher:
+    """Single-flight loads and bounded background refreshes of cache entries."""
+
+    def __init__(self, cache, max_workers: int = REFRESH_WORKERS, max_pending: int = MAX_PENDING_REFRESHES):
+        """Create the refresher.
+
+        Args:
+            cache: Cache the loaded values are stored in
+            max_workers: Background refresh threads
+            max_pending: Refreshes allowed to be queued or running; more are dropped
+        """
+        self.cache = cache
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cache-refresh")
+        self._inflight: dict[tuple[str, str], Future] = {}
+        self._pending: set[tuple[str, str]] = set()
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def load(self, namespace: str, key: str, loader):
+        """Run the loader and store its value, sharing one run among concurrent callers.
+
+        A loader result of None is returned but not cached.
+        """
+        with self._lock:
+            future = self._inflight.get((namespace, key))
+            owner = future is None
+            if owner:
+                future = self._inflight[(namespace, key)] = Future()
+        if not owner:
+            self.stats["deduplicated"] += 1
+            return future.result()
+        try:
+            value = loader()
+            if value is not None:
+                self.cache.set(namespace, key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[(namespace, key)]
+
+    def refresh(self, namespace: str, key: str, loader) -> bool:
+        """Schedule a background reload unless one is already queued or running.
+
+        Returns:
+            True when a refresh was scheduled
+        """
+        with self._lock:
+            if (namespace, key) in self._pending or (namespace, key) in self._inflight:
+                self.stats["refreshes_deduplicated"] += 1
+                return False
+            if len(self._pending) >= self.max_pending:
+                self.stats["refreshes_dropped"] += 1
+                return False
+            self._pending.add((namespace, key))
+        self.stats["refreshes"] += 1
+        # Copy the context so spans opened by the loader stay in the request's trace
+        self._pool.submit(contextvars.copy_context().run, self._refresh, namespace, key, loader)
+        return True
+
+    def _refresh(self, namespace: str, key: str, loader) -> None:
+        try:
+            self.load(namespace, key, loader)
+        except Exception:
+            # The stale entry stays in place; the next hit schedules another refresh
+            self.stats["refresh_failures"] += 1
+        finally:
+            with self._lock:
+                self._pending.discard((namespace, key))
+
+
+# Shared cache and refresher instances - initialize lazily on first use
+_cache = None
+_refresher = None
+_init_lock = threading.Lock()
+
+
+def get_cache():
+    """Get the process-wide cache (shared SQLite file when ADVISOR_CACHE_PATH is set)."""
+    global _cache
+    if _cache is None:
+        with _init_lock:
+            if _cache is None:
+                path = os.environ.get(CACHE_PATH_ENV)
+                _cache = SQLiteCache(path) if path else MemoryCache()
+    return _cache
+
+
+def get_refresher() -> Refresher:
+    """Get the process-wide refresher for the shared cache."""
+    global _refresher
+    cache = get_cache()
+    if _refresher is None or _refresher.cache is not cache:
+        with _init_lock:
+            # Concurrent first callers must share one refresher, or single-flight breaks
+            if _refresher is None or _refresher.cache is not cache:
+                _refresher = Refresher(cache)
+    return _refresher
+
+
+def get_or_load(namespace: str, key: str, loader) -> tuple[object, str]:
+    """Cached value of a key, loading it on a miss and refreshing it when stale.
+
+    Args:
+        namespace: Cache namespace ("search", "page", "summary")
+        key: Cache key (see make_key)
+        loader: Zero-argument callable producing the value; None results are not cached
+
+    Returns:
+        (value, status) where status is "hit", "stale" (served while a
+        background refresh runs) or "miss" (loaded now)
+    """
+    entry = get_cache().lookup(namespace, key)
+    if entry is not None:
+        value, stale = entry
+        if stale:
+            get_refresher().refresh(namespace, key, loader)
+            return value, "stale"
+        return value, "hit"
+    return get_refresher().load(namespace, key, loader), "miss"
+
+
+def reset_cache() -> None:
+    """Drop the process-wide cache instance (e.g. in a freshly forked worker)."""
+    global _cache, _refresher
+    _cache = None
+    _refresher = None
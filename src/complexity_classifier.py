@@ -0,0 +1,290 @@
+"""Local fast-path classifier for task type and difficulty.
+
+`classify_task_complexity` used to spend a full LLM round trip on every request
+just to label it. This module answers confident cases locally in microseconds:
+- Keyword rules for strong, unambiguous signals
+- A small multinomial Naive Bayes model trained on labelled seed requests
+- A normalized-request cache so repeated questions are never re-classified
+
+Ambiguous requests are handed to an LLM fallback supplied by the caller.
+"""
+
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Callable
+
+from src.fingerprint import canonical_key, extract_codes, normalize_query
+
+TASK_TYPES = (
+    "Course Planning",
+    "Program Info",
+    "Career Advice",
+    "International Support",
+    "Comparison",
+    "General Inquiry",
+)
+DIFFICULTIES = ("Simple", "Moderate", "Difficult")
+DEFAULT_CLASSIFICATION = {"task_type": "General Inquiry", "difficulty": "Moderate"}
+
+# Labelled seed requests used to train the lexical model: (request, task_type, difficulty)
+SEED_EXAMPLES = [
+    ("COMP9021 prerequisites", "Course Planning", "Simple"),
+    ("prereqs for COMP9020?", "Course Planning", "Simple"),
+    ("How many UOC is COMP9311?", "Course Planning", "Simple"),
+    ("When is COMP9417 offered?", "Course Planning", "Simple"),
+    ("Is COMP6080 hard?", "Course Planning", "Simple"),
+    ("What does COMP9444 cover?", "Course Planning", "Simple"),
+    ("Which term can I take COMP3311", "Course Planning", "Simple"),
+    ("Can I take COMP9321 and COMP9331 together in term 2?", "Course Planning", "Moderate"),
+    ("Which electives should I pick for an AI specialisation?", "Course Planning", "Moderate"),
+    ("What should I study in my first term of the Master of IT?", "Course Planning", "Moderate"),
+    ("Suggest a course order for COMP9021, COMP9024 and COMP9311", "Course Planning", "Moderate"),
+    ("Plan my Master of IT over 4 terms with a focus on machine learning", "Course Planning", "Difficult"),
+    ("Build a full study plan for my Bachelor of Computer Science with a data science major", "Course Planning", "Difficult"),
+    ("Create a term by term degree plan including prerequisites and electives", "Course Planning", "Difficult"),
+    ("What is the Master of Information Technology program?", "Program Info", "Simple"),
+    ("How long is the Master of Data Science?", "Program Info", "Simple"),
+    ("What is program 8543?", "Program Info", "Simple"),
+    ("Tuition fee for Master of IT", "Program Info", "Simple"),
+    ("Entry requirements for the Master of Data Science", "Program Info", "Moderate"),
+    ("What specialisations does the Master of IT offer and what are their core courses?", "Program Info", "Moderate"),
+    ("What are the admission requirements, fees and structure of the Bachelor of Engineering?", "Program Info", "Difficult"),
+    ("What jobs can I get with a Master of IT?", "Career Advice", "Simple"),
+    ("Average salary of a data scientist in Sydney", "Career Advice", "Simple"),
+    ("How do I find internships as a UNSW student?", "Career Advice", "Moderate"),
+    ("Which skills do software engineering employers in Sydney want?", "Career Advice", "Moderate"),
+    ("Plan my career path into machine learning engineering including internships, skills and networking", "Career Advice", "Difficult"),
+    ("Do I need a student visa to study at UNSW?", "International Support", "Simple"),
+    ("What IELTS score does UNSW require?", "International Support", "Simple"),
+    ("Can international students work part time?", "International Support", "Simple"),
+    ("How do I apply for a student visa and accommodation before arriving?", "International Support", "Moderate"),
+    ("What post-study work visa options do I have after graduating?", "International Support", "Moderate"),
+    ("As an international student, walk me through visa, accommodation, scholarships and part-time work", "International Support", "Difficult"),
+    ("Compare COMP9020 and COMP9021", "Comparison", "Moderate"),
+    ("Master of IT vs Master of Data Science", "Comparison", "Moderate"),
+    ("Which is better for AI, COMP9444 or COMP9417?", "Comparison", "Moderate"),
+    ("Compare programs, careers and visa implications of the Master of IT and Master of Data Science", "Comparison", "Difficult"),
+    ("Compare the Master of Cyber Security and Master of IT in terms of courses, jobs and fees", "Comparison", "Difficult"),
+    ("Hello", "General Inquiry", "Simple"),
+    ("Where is the UNSW library?", "General Inquiry", "Simple"),
+    ("How do I contact student services?", "General Inquiry", "Simple"),
+    ("How does UNSW's trimester system work?", "General Inquiry", "Moderate"),
+    ("I have a GPA of 3.2 and IELTS 7, I want to do a master's in data science, please give me advice", "General Inquiry", "Difficult"),
+]
+
+# Minimum confidence to answer without the LLM. Calibrated on scripts/data/classifier_eval.jsonl:
+# the lexical model alone is overconfident (wrong labels at 0.85-0.88), so only rule-backed
+# labels and very confident model labels take the fast path
+CONFIDENCE_THRESHOLD = 0.9
+
+# (pattern, task_type) rules; the first matching rule wins
+_TYPE_RULES = [
+    (re.compile(r"\b(compare|comparison|vs\.?|versus|difference between|better than|which is better)\b"), "Comparison"),
+    (re.compile(r"\b(visas?|ielts|toefl|pte|international students?|coe|oshc|post-study)\b"), "International Support"),
+    (re.compile(r"\b(careers?|jobs?|salary|salaries|employers?|internships?|graduate roles?|resumes?)\b"), "Career Advice"),
+    (re.compile(r"\b(prereq\w*|pre-requisite\w*|corequisite\w*|co-requisite\w*|uoc|elective\w*|study plan|plan my|enrol\w*|timetable|terms?|trimesters?)\b"), "Course Planning"),
+    (re.compile(r"\b(masters? of|bachelors? of|graduate certificates?|programs?|programmes?|degrees?|specialisations?|specializations?|tuition|fees?)\b"), "Program Info"),
+]
+_PLANNING_RE = re.compile(r"\b(plan|planning|roadmap|pathway|over \d+ terms?|term by term|full|comprehensive|step by step)\b")
+_CONJUNCTION_RE = re.compile(r",|\band\b|\bplus\b|\bas well as\b")
+
+
+class NaiveBayesText:
+    """Minimal multinomial Naive Bayes text classifier with Laplace smoothing."""
+
+    def __init__(self, alpha: float = 0.5):
+        self.alpha = alpha
+        self.class_counts: Counter = Counter()
+        self.feature_counts: dict[str, Counter] = {}
+        self.class_totals: Counter = Counter()
+        self.vocab: set[str] = set()
+
+    @staticmethod
+    def features(text: str) -> list[str]:
+        """Unigram and bigram features over normalized tokens."""
+        tokens = normalize_query(text)
+        features = list(tokens)
+        features.extend(f"{a}_{b}" for a, b in zip(tokens, tokens[1:]))
+        if extract_codes(text):
+            features.append("__has_code__")
+        return features
+
+    def fit(self, texts: list[str], labels: list[str]) -> "NaiveBayesText":
+        """Train the model on parallel lists of texts and labels."""
+        for text, label in zip(texts, labels):
+            features = self.features(text)
+            self.class_counts[label] += 1
+            self.feature_counts.setdefault(label, Counter()).update(features)
+            self.class_totals[label] += len(features)
+            self.vocab.update(features)
+        return self
+
+    def predict_proba(self, text: str) -> dict[str, float]:
+        """Return the posterior probability of each class."""
+        features = [f for f in self.features(text) if f in self.vocab]
+        total_docs = sum(self.class_counts.values())
+        vocab_size = len(self.vocab)
+        log_scores = {}
+        for label, count in self.class_counts.items():
+            score = math.log(count / total_docs)
+            denominator = self.class_totals[label] + self.alpha * vocab_size
+            counts = self.feature_counts[label]
+            for feature in features:
+                score += math.log((counts[feature] + self.alpha) / denominator)
+            log_scores[label] = score
+        top = max(log_scores.values())
+        exp_scores = {label: math.exp(score - top) for label, score in log_scores.items()}
+        norm = sum(exp_scores.values())
+        return {label: value / norm for label, value in exp_scores.items()}
+
+
+def _rule_task_type(text: str) -> str | None:
+    lowered = text.lower()
+    for pattern, task_type in _TYPE_RULES:
+        if pattern.search(lowered):
+            return task_type
+    return None
+
+
+def _rule_difficulty(text: str, task_type: str | None) -> str | None:
+    """Return a rule-based difficulty when the signals are unambiguous."""
+    lowered = text.lower()
+    codes = extract_codes(text)
+    aspects = {t for pattern, t in _TYPE_RULES if pattern.search(lowered)}
+    words = len(lowered.split())
+
+    if _PLANNING_RE.search(lowered) and (words > 8 or len(aspects) > 1):
+        return "Difficult"
+    if len(aspects) >= 3 or (task_type == "Comparison" and len(_CONJUNCTION_RE.findall(lowered)) >= 2):
+        return "Difficult"
+    if task_type == "Comparison":
+        return "Moderate"
+    if len(codes) <= 1 and len(aspects) <= 1 and words <= 8:
+        return "Simple"
+    return None
+
+
+class ComplexityClassifier:
+    """Rules plus a lexical model, with an optional LLM fallback and a cache."""
+
+    def __init__(
+        self,
+        examples: list[tuple[str, str, str]] = SEED_EXAMPLES,
+        confidence_threshold: float = CONFIDENCE_THRESHOLD,
+        cache_size: int = 1024,
+    ):
+        """Train the local models.
+
+        Args:
+            examples: Labelled (request, task_type, difficulty) training examples
+            confidence_threshold: Minimum model probability to answer without the LLM
+            cache_size: Maximum number of cached classifications
+        """
+        texts = [e[0] for e in examples]
+        self.type_model = NaiveBayesText().fit(texts, [e[1] for e in examples])
+        self.difficulty_model = NaiveBayesText().fit(texts, [e[2] for e in examples])
+        self.confidence_threshold = confidence_threshold
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def predict_local(self, user_request: str) -> tuple[dict, float]:
+        """Classify locally and report the confidence of the weaker label.
+
+        Args:
+            user_request: The raw user query
+
+        Returns:
+            (classification dict, confidence in [0, 1])
+        """
+        result, type_conf, difficulty_conf = self._predict(user_request)
+        return result, min(type_conf, difficulty_conf)
+
+    def predict_task_type(self, user_request: str) -> tuple[str, float]:
+        """Classify the task type alone locally; returns (task_type, confidence in [0, 1])."""
+        result, type_conf, _ = self._predict(user_request)
+        return result["task_type"], type_conf
+
+    def _predict(self, user_request: str) -> tuple[dict, float, float]:
+        type_proba = self.type_model.predict_proba(user_request)
+        model_type = max(type_proba, key=type_proba.get)
+        rule_type = _rule_task_type(user_request)
+        if rule_type is not None:
+            task_type = rule_type
+            # Rules are trusted when the model agrees; disagreement is left to the LLM, and so
+            # is a request touching three or more topics (the first rule's topic may not lead)
+            lowered = user_request.lower()
+            topics = {t for pattern, t in _TYPE_RULES if pattern.search(lowered)} - {"Comparison"}
+            agreed = rule_type == model_type and len(topics) < 3
+            type_conf = max(type_proba[rule_type], 0.9) if agreed else 0.5
+        else:
+            task_type = model_type
+            type_conf = type_proba[model_type]
+
+        difficulty_proba = self.difficulty_model.predict_proba(user_request)
+        model_difficulty = max(difficulty_proba, key=difficulty_proba.get)
+        rule_difficulty = _rule_difficulty(user_request, task_type)
+        if rule_difficulty is not None:
+            difficulty = rule_difficulty
+            difficulty_conf = (
+                max(difficulty_proba[rule_difficulty], 0.9) if rule_difficulty == model_difficulty else 0.5
+            )
+        else:
+            difficulty = model_difficulty
+            difficulty_conf = difficulty_proba[model_difficulty]
+
+        return {"task_type": task_type, "difficulty": difficulty}, type_conf, difficulty_conf
+
+    def classify(
+        self,
+        user_request: str,
+        llm_fallback: Callable[[str], dict] | None = None,
+    ) -> dict:
+        """Classify a request, calling the LLM only for ambiguous cases.
+
+        Args:
+            user_request: The raw user query
+            llm_fallback: Callable returning {"task_type", "difficulty"} for ambiguous
+                requests, or None when it could not produce a classification
+
+        Returns:
+            Dict with task_type and difficulty (DEFAULT_CLASSIFICATION when the
+            fallback gives up; that answer is not cached, so the request is retried)
+        """
+        key = canonical_key(user_request)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                return dict(self._cache[key])
+
+        result, confidence = self.predict_local(user_request)
+        if confidence >= self.confidence_threshold or llm_fallback is None:
+            self.stats["local"] += 1
+        else:
+            self.stats["llm_fallback"] += 1
+            result = llm_fallback(user_request)
+            if result is None:
+                self.stats["llm_unparsed"] += 1
+                return dict(DEFAULT_CLASSIFICATION)
+
+        with self._lock:
+            self._cache[key] = dict(result)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+
+# Shared classifier instance - initialize lazily on first use
+_classifier = None
+
+
+def get_classifier() -> ComplexityClassifier:
+    """Get the shared classifier, training it if needed."""
+    global _classifier
+    if _classifier is None:
+        _classifier = ComplexityClassifier()
+    return _classifier
@@ -0,0 +1,291 @@
+"""Term-by-term degree plan solver.
+
+Given a program's core courses and elective pool, the prerequisite graph
+(src.prereq_graph), term offerings and a UOC cap per term, `solve_plan`
+produces a valid term-by-term plan, or explains why none exists, in one
+deterministic call. The LLM then only narrates the result.
+
+Scheduling is list scheduling: each term takes, up to the UOC cap, the
+eligible courses (prerequisites done in an earlier term, offered that term,
+UOC threshold met) with the longest chain of courses still depending on them
+first, then the ones offered in fewest terms. A course whose co-requisite
+cannot be taken by that term is dropped and its UOC refilled with the next
+eligible course. When electives are a choice, elective combinations are
+generated cheapest first (fewest courses added beyond the core plan) and the
+first MAX_ELECTIVE_COMBINATIONS of them are tried in turn until one fits.
+"""
+
+import heapq
+
+import itertools
+import math
+from dataclasses import dataclass, field
+
+from src.prereq_graph import PrerequisiteGraph, format_requirement, is_satisfied, requirement_codes
+
+TERMS = ("T1", "T2", "T3")
+# Terms assumed for a course whose offering terms are unknown
+DEFAULT_OFFERINGS = frozenset(TERMS)
+DEFAULT_UOC = 6
+
+# Elective combinations tried (cheapest first) before giving up
+MAX_ELECTIVE_COMBINATIONS = 200
+
+
+@dataclass
+class DegreePlan:
+    """Result of the solver: the terms of a feasible plan, or the reasons there is none."""
+
+    feasible: bool
+    terms: list[tuple[str, list[str], int]] = field(default_factory=list)
+    electives: list[str] = field(default_factory=list)
+    problems: list[str] = field(default_factory=list)
+    assumptions: list[str] = field(default_factory=list)
+
+    def format(self) -> str:
+        """Plain-text rendering for the agent."""
+        lines = []
+        if self.feasible:
+            for label, courses, uoc in self.terms:
+                lines.append(f"{label}: {', '.join(courses) if courses else '(no courses)'} ({uoc} UOC)")
+            if self.electives:
+                lines.append(f"Electives chosen: {', '.join(self.electives)}")
+        else:
+            lines.append("No valid plan exists with these constraints:")
+            lines.extend(f"- {problem}" for problem in self.problems)
+        if self.assumptions:
+            lines.append("Assumptions: " + "; ".join(self.assumptions))
+        return "\n".join(lines)
+
+
+def term_sequence(start_term: str, count: int) -> list[tuple[str, str]]:
+    """(label, term) pairs for `count` consecutive main terms, e.g. ("Year 1 T2", "T2")."""
+    start = TERMS.index(start_term) if start_term in TERMS else 0
+    sequence = []
+    for i in range(count):
+        position = start + i
+        sequence.append((f"Year {position // len(TERMS) + 1} {TERMS[position % len(TERMS)]}", TERMS[position % len(TERMS)]))
+    return sequence
+
+
+class _Problem:
+    """Course data the scheduler needs, with defaults for unknown courses."""
+
+    def __init__(self, graph: PrerequisiteGraph, courses: set[str], completed: set[str]):
+        self.graph = graph
+        self.courses = courses
+        self.completed = completed
+        self.assumptions: list[str] = []
+        self.uoc, self.offerings, self.depends, self.min_uoc, self.corequisites = {}, {}, {}, {}, {}
+        unknown_terms = []
+        for code in sorted(courses):
+            node = graph.courses.get(code)
+            self.uoc[code] = node.uoc if node else DEFAULT_UOC
+            main_terms = frozenset(t for t in (node.terms if node else ()) if t in TERMS)
+            if not main_terms:
+                unknown_terms.append(code)
+            self.offerings[code] = main_terms or DEFAULT_OFFERINGS
+            self.depends[code] = graph.chosen_prerequisites(code, courses, completed)
+            self.min_uoc[code] = node.min_uoc if node else 0
+            self.corequisites[code] = node.corequisite if node else None
+        if unknown_terms:
+            self.assumptions.append(f"offering terms unknown, assumed every term: {', '.join(unknown_terms)}")
+        # Length of the longest chain of courses that still depend on each course
+        self.tail = {}
+        for code in sorted(courses):
+            self._tail(code, set())
+
+    def _tail(self, code: str, visiting: set) -> int:
+        if code in self.tail:
+            return self.tail[code]
+        if code in visiting:
+            return 0
+        visiting.add(code)
+        dependents = [c for c in self.courses if code in self.depends[c]]
+        self.tail[code] = 1 + max((self._tail(c, visiting) for c in dependents), default=0)
+        return self.tail[code]
+
+
+def _schedule(problem: _Problem, terms: list[tuple[str, str]], max_uoc: int, completed_uoc: int):
+    """List-schedule the courses; returns (term rows, unscheduled courses)."""
+    done = set(problem.completed)
+    earned = completed_uoc
+    remaining = set(problem.courses)
+    rows = []
+    for label, term in terms:
+        taken, load, dropped = [], 0, set()
+        candidates = sorted(
+            (c for c in remaining if problem.depends[c] <= done and term in problem.offerings[c] and earned >= problem.min_uoc[c]),
+            key=lambda c: (-problem.tail[c], len(problem.offerings[c]), c),
+        )
+        changed = True
+        while changed:
+            changed = False
+            for code in candidates:
+                if code in taken or code in dropped or load + problem.uoc[code] > max_uoc:
+                    continue
+                taken.append(code)
+                load += problem.uoc[code]
+                changed = True
+            # A co-requisite may be taken in the same term; drop courses whose co-requisite is
+            # still missing and refill their UOC on the next pass
+            taken_set = set(taken)
+            for code in list(taken):
+                coreq = problem.corequisites[code]
+                if coreq is not None and not is_satisfied(coreq, done | taken_set):
+                    taken.remove(code)
+                    load -= problem.uoc[code]
+                    dropped.add(code)
+                    changed = True
+        rows.append((label, sorted(taken), load))
+        done |= set(taken)
+        earned += load
+        remaining -= set(taken)
+        if not remaining:
+            break
+    return rows, remaining
+
+
+def _explain(problem: _Problem, unscheduled: set[str], terms: list[tuple[str, str]], max_uoc: int, completed_uoc: int) -> list[str]:
+    """Reasons the unscheduled courses do not fit."""
+    problems = []
+    planned_terms = {term for _, term in terms}
+    total_uoc = sum(problem.uoc[c] for c in problem.courses)
+    if total_uoc > max_uoc * len(terms):
+        problems.append(
+            f"{total_uoc} UOC of courses do not fit in {len(terms)} term(s) at {max_uoc} UOC per term "
+            f"(needs at least {math.ceil(total_uoc / max_uoc)} terms)"
+        )
+    longest = max((problem.tail[c] for c in problem.courses), default=0)
+    if longest > len(terms):
+        chain_start = max(problem.courses, key=lambda c: problem.tail[c])
+        problems.append(f"the prerequisite chain starting at {chain_start} needs {longest} consecutive terms")
+    _, cyclic = problem.graph.study_order(sorted(problem.courses), problem.completed)
+    if cyclic:
+        problems.append(f"prerequisite cycle between {', '.join(cyclic)}")
+    scheduled = problem.completed | (problem.courses - unscheduled)
+    for code in sorted(unscheduled):
+        coreq = problem.corequisites[code]
+        if coreq is not None and not is_satisfied(coreq, scheduled):
+            missing = sorted(requirement_codes(coreq) - scheduled)
+            if not requirement_codes(coreq) & (problem.courses | problem.completed):
+                problems.append(f"{code} needs its co-requisite {format_requirement(coreq)}, which is not in the plan")
+            else:
+                problems.append(
+                    f"{code} needs its co-requisite {format_requirement(coreq)} in the same or an earlier term, "
+                    f"but {', '.join(missing)} could not be placed by then"
+                )
+        if not problem.offerings[code] & planned_terms:
+            problems.append(f"{code} is only offered in {', '.join(sorted(problem.offerings[code]))}, outside the planned terms")
+        if problem.min_uoc[code] and problem.min_uoc[code] > completed_uoc + total_uoc - problem.uoc[code]:
+            problems.append(f"{code} requires {problem.min_uoc[code]} UOC completed first, more than this plan reaches")
+    if not problems:
+        problems.append(
+            f"could not place {', '.join(sorted(unscheduled))}: their prerequisites and term offerings "
+            "do not line up within the planned terms (try more terms or a higher UOC cap)"
+        )
+    return problems
+
+
+def _cheapest_combinations(ranked: list[str], size: int, cost: dict[str, int]):
+    """Yield the `size`-combinations of `ranked` (sorted by cost) in order of total cost."""
+    if size > len(ranked):
+        return
+    if size == 0:
+        yield ()
+        return
+    start = tuple(range(size))
+    heap = [(sum(cost[ranked[i]] for i in start), start)]
+    seen = {start}
+    while heap:
+        _, indices = heapq.heappop(heap)
+        yield tuple(ranked[i] for i in indices)
+        # Successors move one index up by one; costs are sorted, so totals never decrease
+        for position in range(size):
+            following = indices[position + 1] if position + 1 < size else len(ranked)
+            if indices[position] + 1 < following:
+                successor = indices[:position] + (indices[position] + 1,) + indices[position + 1:]
+                if successor not in seen:
+                    seen.add(successor)
+                    heapq.heappush(heap, (sum(cost[ranked[i]] for i in successor), successor))
+
+
+def solve_plan(
+    graph: PrerequisiteGraph,
+    core_courses: list[str],
+    elective_courses: list[str] | None = None,
+    electives_required: int = 0,
+    num_terms: int = 6,
+    max_uoc_per_term: int = 18,
+    start_term: str = "T1",
+    completed: list[str] | None = None,
+) -> DegreePlan:
+    """Build a term-by-term plan for a program.
+
+    Args:
+        graph: Prerequisite graph with the courses' rules, UOC and terms
+        core_courses: Courses the program requires
+        elective_courses: Pool of electives to choose from
+        electives_required: How many electives from the pool must be taken
+        num_terms: Number of consecutive main terms (T1-T3) available
+        max_uoc_per_term: UOC cap per term
+        start_term: First term of the plan ("T1", "T2" or "T3")
+        completed: Courses already passed
+
+    Returns:
+        DegreePlan with the term rows, or the problems that make the plan impossible
+    """
+    completed_set = set(completed or [])
+    completed_uoc = sum((graph.courses[c].uoc if c in graph.courses else DEFAULT_UOC) for c in completed_set)
+    terms = term_sequence(start_term, num_terms)
+    core = [c for c in dict.fromkeys(core_courses) if c not in completed_set]
+
+    excluded = set()
+    for code in list(completed_set) + core:
+        if code in graph.courses:
+            excluded |= graph.courses[code].exclusions
+    pool = [c for c in dict.fromkeys(elective_courses or []) if c not in completed_set and c not in core and c not in excluded]
+    assumptions = []
+    if electives_required > len(pool):
+        return DegreePlan(
+            feasible=False,
+            problems=[f"{electives_required} elective(s) required but only {len(pool)} eligible in the pool"],
+        )
+
+    def _cost(choice):
+        courses = graph.plan_courses(core + list(choice), completed_set)
+        return len(courses), sum(len(graph.courses[c].terms) == 0 for c in choice if c in graph.courses)
+
+    # Cheapest elective sets first: fewest courses added beyond the core plan
+    core_plan = graph.plan_courses(core, completed_set)
+    extra = {c: len(graph.plan_courses([c], completed_set | core_plan)) for c in pool}
+    combinations = itertools.islice(
+        _cheapest_combinations(sorted(pool, key=lambda c: (extra[c], c)), electives_required, extra),
+        MAX_ELECTIVE_COMBINATIONS,
+    )
+    choices = sorted(combinations, key=_cost)
+
+    first_failure = None
+    for choice in choices or [()]:
+        courses = graph.plan_courses(core + list(choice), completed_set)
+        conflicts = sorted(
+            f"{a} and {b} exclude each other"
+            for a in courses for b in courses
+            if a < b and a in graph.courses and b in graph.courses[a].exclusions
+        )
+        problem = _Problem(graph, courses, completed_set)
+        if conflicts:
+            first_failure = first_failure or DegreePlan(False, problems=conflicts, assumptions=problem.assumptions)
+            continue
+        rows, unscheduled = _schedule(problem, terms, max_uoc_per_term, completed_uoc)
+        if not unscheduled:
+            added = sorted(courses - set(core) - set(choice))
+            if added:
+                assumptions.append(f"prerequisites and co-requisites added to the plan: {', '.join(added)}")
+            return DegreePlan(True, terms=rows, electives=sorted(choice), assumptions=problem.assumptions + assumptions)
+        first_failure = first_failure or DegreePlan(
+            False,
+            problems=_explain(problem, unscheduled, terms, max_uoc_per_term, completed_uoc),
+            assumptions=problem.assumptions,
+        )
+    return first_failure
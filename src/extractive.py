@@ -0,0 +1,165 @@
+"""Local extractive page summarizer.
+
+The LLM summary of a fetched page costs a model round trip per page, which is
+most of the latency budget of a Simple question. `extractive_summary` builds
+the same `Summary` shape (file name + short summary) in milliseconds: it
+splits the page into sentences, ranks them with TextRank over TF-IDF sentence
+vectors (NumPy), and keeps the best-ranked, non-redundant sentences in page
+order.
+
+`summary_method` decides per page which summarizer runs: the LLM for
+Difficult requests, the extractive summarizer for Simple ones, and for other
+or unknown tiers the LLM unless the page is very large.
+"""
+
+import re
+from collections import Counter
+
+import numpy as np
+
+from src.fingerprint import COURSE_CODE_RE, STOPWORDS
+
+# Words kept in an extractive summary (the LLM summary is kept under 150)
+SUMMARY_WORDS = 120
+# Sentences ranked per page; later ones are ignored (the ranking is quadratic)
+MAX_SENTENCES = 300
+# Shorter lines are navigation and labels; "Units of credit: 6" still counts
+MIN_SENTENCE_WORDS = 3
+# A candidate this similar (cosine) to a chosen sentence adds nothing new
+REDUNDANCY_THRESHOLD = 0.7
+DAMPING = 0.85
+
+# Pages above this size get the extractive summary unless the request is Difficult
+LARGE_PAGE_CHARS = 50000
+LLM_TIERS = frozenset({"Difficult"})
+EXTRACTIVE_TIERS = frozenset({"Simple"})
+
+_LINK_RE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_MARKUP_RE = re.compile(r"^[#>*\-+|\s]+|[*_`|]+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9'\-]*")
+_HEADING_RE = re.compile(r"^#{1,3}\s+(.+)$", re.MULTILINE)
+
+
+def summary_method(difficulty: str | None, content_length: int) -> str:
+    """Which summarizer a page gets: "llm" or "extractive".
+
+    Args:
+        difficulty: Difficulty tier of the request ("Simple", "Moderate", "Difficult"), if known
+        content_length: Page size in characters
+    """
+    if difficulty in LLM_TIERS:
+        return "llm"
+    if difficulty in EXTRACTIVE_TIERS or content_length > LARGE_PAGE_CHARS:
+        return "extractive"
+    return "llm"
+
+
+def split_sentences(text: str) -> list[str]:
+    """Plain-text sentences of a markdown page (links unwrapped, markup dropped)."""
+    text = _LINK_RE.sub(r"\1", text)
+    sentences = []
+    for line in text.splitlines():
+        line = _MARKUP_RE.sub(" ", line).strip()
+        if not line:
+            continue
+        for sentence in _SENTENCE_RE.split(line):
+            sentence = " ".join(sentence.split())
+            if len(sentence.split()) >= MIN_SENTENCE_WORDS:
+                sentences.append(sentence)
+    return sentences
+
+
+def _tokens(sentence: str) -> list[str]:
+    return [t for t in _WORD_RE.findall(sentence.lower()) if t not in STOPWORDS]
+
+
+def tfidf_matrix(sentences: list[str]) -> np.ndarray:
+    """Row-normalized TF-IDF vectors of the sentences (one row each)."""
+    counts = [Counter(_tokens(s)) for s in sentences]
+    vocabulary = {term: i for i, term in enumerate(sorted({t for c in counts for t in c}))}
+    matrix = np.zeros((len(sentences), len(vocabulary)))
+    for row, count in enumerate(counts):
+        for term, n in count.items():
+            matrix[row, vocabulary[term]] = 1 + np.log(n)
+    document_frequency = np.count_nonzero(matrix, axis=0)
+    matrix *= np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def textrank(similarity: np.ndarray, damping: float = DAMPING, iterations: int = 50) -> np.ndarray:
+    """PageRank scores of the sentence similarity graph."""
+    n = similarity.shape[0]
+    weights = similarity.copy()
+    np.fill_diagonal(weights, 0)
+    totals = weights.sum(axis=1, keepdims=True)
+    # Sentences sharing no words with any other link to every sentence equally
+    transition = np.where(totals > 0, weights / np.where(totals == 0, 1, totals), 1 / n)
+    scores = np.full(n, 1 / n)
+    for _ in range(iterations):
+        updated = (1 - damping) / n + damping * transition.T @ scores
+        if np.abs(updated - scores).sum() < 1e-6:
+            return updated
+        scores = updated
+    return scores
+
+
+def rank_sentences(vectors: np.ndarray) -> list[int]:
+    """Sentence indices (rows of the TF-IDF matrix) from most to least central."""
+    scores = textrank(vectors @ vectors.T)
+    # Earlier sentences get a small boost: pages lead with what they are about
+    scores = scores * (1 + 0.5 / (1 + np.arange(vectors.shape[0])))
+    return list(np.argsort(-scores, kind="stable"))
+
+
+def select_sentences(sentences: list[str], max_words: int = SUMMARY_WORDS) -> list[str]:
+    """Best-ranked non-redundant sentences up to max_words, in page order."""
+    if not sentences:
+        return []
+    vectors = tfidf_matrix(sentences)
+    chosen, words = [], 0
+    for i in rank_sentences(vectors):
+        length = len(sentences[i].split())
+        if chosen and words + length > max_words:
+            continue
+        if any(vectors[i] @ vectors[j] > REDUNDANCY_THRESHOLD for j in chosen):
+            continue
+        chosen.append(i)
+        words += length
+        if words >= max_words:
+            break
+    return [sentences[i] for i in sorted(chosen)]
+
+
+def summary_filename(text: str) -> str:
+    """Descriptive file name from the page's course code and first heading."""
+    match = _HEADING_RE.search(text)
+    heading = _LINK_RE.sub(r"\1", match.group(1)) if match else ""
+    code = COURSE_CODE_RE.search(heading or text[:500])
+    words = _WORD_RE.findall(heading.lower())[:6]
+    if code:
+        prefix = f"{code.group(1)}{code.group(2)}".lower()
+        words = [prefix] + [w for w in words if w != prefix and w != code.group(1).lower() and w != code.group(2)]
+    slug = re.sub(r"[^a-z0-9]+", "_", "_".join(words)).strip("_")[:50]
+    return f"{slug or 'page'}_summary.md"
+
+
+def extractive_summary(text: str, max_words: int = SUMMARY_WORDS) -> dict:
+    """Summarize a page locally.
+
+    Args:
+        text: Page content (markdown)
+        max_words: Approximate summary length in words
+
+    Returns:
+        {"filename", "summary"} in the shape of the LLM Summary schema
+    """
+    sentences = split_sentences(text)[:MAX_SENTENCES]
+    chosen = select_sentences(sentences, max_words)
+    if chosen:
+        summary = " ".join(chosen)
+    else:
+        # No full sentences (e.g. a table-only page): keep the opening words
+        summary = " ".join(_LINK_RE.sub(r"\1", text).split()[:max_words])
+    return {"filename": summary_filename(text), "summary": summary}
@@ -84,11 +84,10 @@ def write_file(
     Returns:
         Command to update agent state with new file content
     """
-    files = state.get("files", {})
-    files[file_path] = content
+    # Only the written file is returned; the files reducer merges it into state
     return Command(
         update={
-            "files": files,
+            "files": {file_path: content},
             "messages": [
                 ToolMessage(f"Updated file {file_path}", tool_call_id=tool_call_id)
             ],
@@ -0,0 +1,252 @@
+"""Text normalization and near-duplicate fingerprinting.
+
+This module provides the local (no external embedding service) building blocks
+used to recognise near-identical text:
+- Query normalization that folds common student phrasings together
+- Course/program code extraction so different codes never collide
+- Shingling and MinHash signatures with an LSH index for fast candidate lookup
+"""
+
+import hashlib
+import re
+import struct
+
+# Course codes look like COMP9021, program codes are four digits (e.g. 8543)
+COURSE_CODE_RE = re.compile(r"\b([A-Za-z]{4})\s?(\d{4})\b")
+PROGRAM_CODE_RE = re.compile(r"(?<![A-Za-z\d])(\d{4})(?![A-Za-z\d])")
+
+# Abbreviations and variants students commonly use for the same concept
+SYNONYMS = {
+    "prereq": "prerequisite",
+    "prereqs": "prerequisite",
+    "prerequisites": "prerequisite",
+    "pre-requisite": "prerequisite",
+    "pre-requisites": "prerequisite",
+    "coreq": "corequisite",
+    "coreqs": "corequisite",
+    "corequisites": "corequisite",
+    "req": "requirement",
+    "reqs": "requirement",
+    "requirements": "requirement",
+    "courses": "course",
+    "subjects": "course",
+    "subject": "course",
+    "programs": "program",
+    "programme": "program",
+    "programmes": "program",
+    "degrees": "degree",
+    "masters": "master",
+    "master's": "master",
+    "uoc": "units",
+    "visas": "visa",
+    "jobs": "job",
+    "careers": "career",
+    "intl": "international",
+}
+
+# Filler words that do not change what is being asked
+STOPWORDS = frozenset(
+    """a an the and or of for to in on at by with about is are was were be do does
+    did can could would should will what whats what's which who how i me my we our
+    you your please tell give show need want know explain list some any unsw it
+    this that there their them than then also just info information detail details""".split()
+)
+
+# Words that make the order of the codes around them part of the question
+# ("COMP9021 before COMP9020" is not "COMP9020 before COMP9021")
+ORDER_WORDS = frozenset({"before", "after", "prior", "following", "followed", "until", "precede", "precedes"})
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9'\-]*")
+
+# Mersenne prime used for the universal hash family in MinHash
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def extract_codes(text: str) -> list[str]:
+    """Extract normalized course and program codes from free text.
+
+    Args:
+        text: Raw user text
+
+    Returns:
+        Sorted, de-duplicated codes (e.g. ["8543", "COMP9021"])
+    """
+    codes = {f"{prefix.upper()}{number}" for prefix, number in COURSE_CODE_RE.findall(text)}
+    stripped = COURSE_CODE_RE.sub(" ", text)
+    codes.update(PROGRAM_CODE_RE.findall(stripped))
+    return sorted(codes)
+
+
+def normalize_query(text: str) -> list[str]:
+    """Normalize a query into a canonical list of content tokens.
+
+    Lowercases, merges split course codes ("COMP 9021" -> "comp9021"), maps
+    synonyms onto one spelling and drops stopwords and punctuation.
+
+    Args:
+        text: Raw user text
+
+    Returns:
+        List of normalized tokens in their original order
+    """
+    text = COURSE_CODE_RE.sub(lambda m: f"{m.group(1)}{m.group(2)}", text.lower())
+    tokens = []
+    for token in _TOKEN_RE.findall(text):
+        token = token.strip("'-")
+        token = SYNONYMS.get(token, token)
+        if token and token not in STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def _ordered_tokens(tokens: list[str]) -> list[str]:
+    """Codes and order words of an order-sensitive query, in their original order.
+
+    A query is order-sensitive when it names two or more codes ("Is COMP9021 a
+    prerequisite for COMP9024?") or has an order word ("before", "after", ...).
+    """
+    ordered = [t for t in tokens if t in ORDER_WORDS or COURSE_CODE_RE.fullmatch(t) or PROGRAM_CODE_RE.fullmatch(t)]
+    codes = {t for t in ordered if t not in ORDER_WORDS}
+    if len(codes) < 2 and not ORDER_WORDS.intersection(ordered):
+        return []
+    return ordered
+
+
+def canonical_key(text: str) -> str:
+    """Return an exact-match key for a query.
+
+    Word order is ignored, except that a query naming several codes or an
+    order word keeps the sequence of its codes and order words, so "Is
+    COMP9021 a prerequisite for COMP9024?" and "Is COMP9024 a prerequisite for
+    COMP9021?" never share a key.
+    """
+    tokens = normalize_query(text)
+    key = " ".join(sorted(set(tokens)))
+    ordered = _ordered_tokens(tokens)
+    return f"{key} | {' '.join(ordered)}" if ordered else key
+
+
+def code_key(text: str) -> tuple[str, ...]:
+    """Codes a near-duplicate of the query must share.
+
+    The codes of the query, in their original order (with any order words)
+    for order-sensitive queries (see canonical_key).
+    """
+    return tuple(_ordered_tokens(normalize_query(text))) or tuple(extract_codes(text))
+
+
+def shingles(tokens: list[str], char_ngram: int = 4) -> set[str]:
+    """Build an order-insensitive shingle set from normalized tokens.
+
+    Whole tokens are combined with character n-grams of each token so that
+    small spelling variations still share most of their shingles.
+
+    Args:
+        tokens: Normalized tokens
+        char_ngram: Character n-gram size (default: 4)
+
+    Returns:
+        Set of shingles
+    """
+    result = set()
+    for token in tokens:
+        result.add(f"w:{token}")
+        if len(token) > char_ngram:
+            for i in range(len(token) - char_ngram + 1):
+                result.add(f"c:{token[i:i + char_ngram]}")
+    return result
+
+
+def word_shingles(text: str, size: int = 5) -> set[str]:
+    """Build contiguous word shingles for longer documents.
+
+    Args:
+        text: Document text
+        size: Number of words per shingle (default: 5)
+
+    Returns:
+        Set of shingles (the whole text as one shingle if it is shorter than size)
+    """
+    words = _TOKEN_RE.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _hash64(value: str) -> int:
+    """Stable 64-bit hash (Python's hash() is salted per process)."""
+    return struct.unpack("<Q", hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest())[0]
+
+
+class MinHash:
+    """MinHash signature generator for Jaccard similarity estimation.
+
+    Signatures are deterministic across processes, so they can be persisted.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        self.num_perm = num_perm
+        # Parameters of the universal hash family h(x) = (a*x + b) mod p
+        self._params = []
+        for i in range(num_perm):
+            a = _hash64(f"a:{seed}:{i}") % (_MERSENNE_PRIME - 1) + 1
+            b = _hash64(f"b:{seed}:{i}") % _MERSENNE_PRIME
+            self._params.append((a, b))
+
+    def signature(self, shingle_set: set[str]) -> tuple[int, ...]:
+        """Compute the MinHash signature of a shingle set."""
+        if not shingle_set:
+            return tuple([_MAX_HASH] * self.num_perm)
+        hashes = [_hash64(s) for s in shingle_set]
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._params
+        )
+
+    @staticmethod
+    def similarity(sig_a: tuple[int, ...], sig_b: tuple[int, ...]) -> float:
+        """Estimate Jaccard similarity from two signatures of equal length."""
+        if not sig_a or len(sig_a) != len(sig_b):
+            return 0.0
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class MinHashLSH:
+    """Banded locality-sensitive hashing index over MinHash signatures.
+
+    Only keys sharing at least one band are returned as candidates, so lookups
+    stay fast no matter how many signatures are indexed.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: list[dict[tuple[int, ...], set[str]]] = [{} for _ in range(bands)]
+
+    def _band_keys(self, signature: tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def insert(self, key: str, signature: tuple[int, ...]) -> None:
+        """Index a signature under the given key."""
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band].setdefault(band_key, set()).add(key)
+
+    def remove(self, key: str, signature: tuple[int, ...]) -> None:
+        """Remove a previously indexed key."""
+        for band, band_key in self._band_keys(signature):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+    def query(self, signature: tuple[int, ...]) -> set[str]:
+        """Return keys that share at least one band with the signature."""
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        return candidates
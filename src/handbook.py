@@ -0,0 +1,364 @@
+"""Local full-text index of UNSW handbook pages.
+
+Course descriptions, UOC and program structures change at most once a year,
+yet every lookup used to be a Tavily search plus a page fetch and an LLM
+summary. `scripts/ingest_handbook.py` loads a snapshot of handbook pages
+(HTML, markdown or text files) into a SQLite FTS5 index; the course and
+program search tools consult it first and only go to the web when a page is
+missing or older than the maximum age. A page found by a free-text query
+(rather than by its code) only counts when it covers most of the query's
+terms, and most of them in its title, so a loosely related page never stands
+in for the one asked about.
+
+The index file defaults to data/handbook.sqlite and can be moved with
+ADVISOR_HANDBOOK_DB. Without an index file every lookup is a miss.
+"""
+
+import html
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+from markdownify import markdownify
+
+from src.fingerprint import COURSE_CODE_RE, PROGRAM_CODE_RE, STOPWORDS, extract_codes
+from src.tracing import annotate, span
+
+HANDBOOK_DB_ENV = "ADVISOR_HANDBOOK_DB"
+HANDBOOK_MAX_AGE_ENV = "ADVISOR_HANDBOOK_MAX_AGE_DAYS"
+DEFAULT_HANDBOOK_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "handbook.sqlite")
+DEFAULT_MAX_AGE_DAYS = 180
+
+# Words of page content kept as the summary of an index hit
+SUMMARY_WORDS = 120
+
+# Share of a free-text query's terms a page must contain, and contain in its title, to be a hit
+MIN_TERM_COVERAGE = 0.8
+MIN_TITLE_COVERAGE = 0.5
+
+# Upper-case abbreviations expanded before matching ("IT", but not the pronoun "it")
+ABBREVIATIONS = {"IT": "Information Technology", "CS": "Computer Science", "AI": "Artificial Intelligence"}
+_ABBREVIATION_RE = re.compile(r"\b(" + "|".join(ABBREVIATIONS) + r")\b")
+_TERM_RE = re.compile(r"[a-z0-9]+")
+# Filler words of a query; "information" names programs ("Master of Information Technology")
+QUERY_STOPWORDS = STOPWORDS - {"information"}
+
+# Words asking for a course's overview page as such, answered by any indexed course page
+OVERVIEW_TERMS = frozenset(
+    "course courses subject overview handbook description summary prerequisite prerequisites".split()
+)
+
+# Full-text table; the porter stemmer lets "requirements" match "requirement"
+_FTS_SQL = "CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(title, content, code, tokenize='porter unicode61')"
+
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+_CANONICAL_RE = re.compile(
+    r"<link[^>]+rel=[\"']canonical[\"'][^>]+href=[\"']([^\"']+)|<meta[^>]+property=[\"']og:url[\"'][^>]+content=[\"']([^\"']+)",
+    re.IGNORECASE,
+)
+_HEADING_RE = re.compile(r"^#+\s*(.+)$", re.MULTILINE)
+_SCRIPT_RE = re.compile(r"<(head|script|style)[^>]*>.*?</\1>", re.IGNORECASE | re.DOTALL)
+
+PAGE_EXTENSIONS = (".html", ".htm", ".md", ".markdown", ".txt")
+
+
+@dataclass
+class HandbookPage:
+    """One indexed handbook page."""
+
+    url: str
+    code: str
+    kind: str
+    title: str
+    content: str
+    fetched_at: float
+
+    def as_search_result(self) -> dict:
+        """The page in the shape returned by process_search_results."""
+        words = self.content.split()
+        summary = " ".join(words[:SUMMARY_WORDS]) + (" ..." if len(words) > SUMMARY_WORDS else "")
+        slug = (self.code or re.sub(r"[^a-z0-9]+", "_", self.title.lower()).strip("_")[:40] or "page").lower()
+        return {
+            "url": self.url,
+            "title": self.title,
+            "summary": summary,
+            "filename": f"handbook_{slug}.md",
+            "raw_content": self.content,
+        }
+
+
+def parse_page(path: str, text: str) -> HandbookPage:
+    """Parse a handbook page file into a HandbookPage (url, code, kind, title, markdown).
+
+    The course or program code is taken from the file name, then the title,
+    then the first code in the page.
+    """
+    is_html = path.lower().endswith((".html", ".htm"))
+    title = ""
+    url = ""
+    if is_html:
+        match = _TITLE_RE.search(text)
+        title = html.unescape(match.group(1)).strip() if match else ""
+        match = _CANONICAL_RE.search(text)
+        url = (match.group(1) or match.group(2)) if match else ""
+        content = markdownify(_SCRIPT_RE.sub("", text))
+    else:
+        content = text
+    content = re.sub(r"\n{3,}", "\n\n", content).strip()
+    if not title:
+        match = _HEADING_RE.search(content)
+        title = match.group(1).strip() if match else os.path.splitext(os.path.basename(path))[0]
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    code, kind = "", "page"
+    # Four-digit program codes are only trusted in the file name or title (page bodies hold years)
+    for candidate, allow_program in ((stem, True), (title, True), (content[:2000], False)):
+        course = COURSE_CODE_RE.search(candidate)
+        if course:
+            code, kind = f"{course.group(1).upper()}{course.group(2)}", "course"
+            break
+        program = PROGRAM_CODE_RE.search(candidate)
+        if program and allow_program:
+            code, kind = program.group(1), "program"
+            break
+
+    return HandbookPage(
+        url=url or f"file://{os.path.abspath(path)}",
+        code=code,
+        kind=kind,
+        title=title,
+        content=content,
+        fetched_at=os.path.getmtime(path),
+    )
+
+
+def query_terms(query: str) -> list[str]:
+    """The query's own words (abbreviations expanded, stopwords dropped), de-duplicated in order."""
+    expanded = _ABBREVIATION_RE.sub(lambda m: ABBREVIATIONS[m.group(1)], query)
+    return list(dict.fromkeys(t for t in _TERM_RE.findall(expanded.lower()) if t not in QUERY_STOPWORDS))
+
+
+def _stem(term: str) -> str:
+    """Crude stem, enough to match "fees" against "fee" or "offered" against "offering"."""
+    if len(term) > 4 and term.endswith("ies"):
+        return term[:-3] + "y"
+    if len(term) > 5 and term.endswith(("ed", "ing")):
+        return term[:-3] if term.endswith("ing") else term[:-2]
+    if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+        return term[:-1]
+    return term
+
+
+def answers_query(results: list[dict], query: str) -> bool:
+    """Whether indexed or prefetched course results answer a query.
+
+    True when the query asks only for the course overview, or every other
+    word of it (e.g. "assessment", "fees", "term 3") appears in a result.
+    """
+    terms = [t for t in query_terms(COURSE_CODE_RE.sub(" ", query)) if t not in OVERVIEW_TERMS]
+    if not terms:
+        return True
+    content = " ".join(f"{r.get('title', '')} {r.get('raw_content') or r.get('summary', '')}" for r in results).lower()
+    return all(re.search(rf"\b{re.escape(_stem(term))}", content) for term in terms)
+
+
+def _match_expression(terms: list[str]) -> str | None:
+    """FTS5 expression matching pages with any of the terms (ranked by bm25)."""
+    return " OR ".join(f'"{t}"' for t in terms) if terms else None
+
+
+class HandbookIndex:
+    """SQLite FTS5 index of handbook pages."""
+
+    def __init__(self, path: str, max_age_days: float = DEFAULT_MAX_AGE_DAYS):
+        """Open (and create if needed) the index.
+
+        Args:
+            path: SQLite database file
+            max_age_days: Pages fetched longer ago than this count as stale (a miss)
+        """
+        self.path = path
+        self.max_age = max_age_days * 24 * 60 * 60
+        self._local = threading.local()
+        self.stats = Counter()
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, code TEXT NOT NULL, kind TEXT NOT NULL, title TEXT NOT NULL,"
+            " content TEXT NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS pages_code ON pages (code)")
+        row = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'pages_fts'").fetchone()
+        if row is not None and "porter" not in row[0]:
+            # Index built before stemming: rebuild the full-text table from the pages
+            conn.execute("DROP TABLE pages_fts")
+            conn.execute(_FTS_SQL)
+            conn.execute("INSERT INTO pages_fts (rowid, title, content, code) SELECT rowid, title, content, code FROM pages")
+        conn.execute(_FTS_SQL)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads; one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, page: HandbookPage) -> None:
+        """Insert or replace a page (matched by URL)."""
+        conn = self._connection()
+        conn.execute("BEGIN")
+        try:
+            row = conn.execute("SELECT rowid FROM pages WHERE url = ?", (page.url,)).fetchone()
+            if row is not None:
+                conn.execute("DELETE FROM pages_fts WHERE rowid = ?", (row[0],))
+                conn.execute("DELETE FROM pages WHERE rowid = ?", (row[0],))
+            rowid = conn.execute(
+                "INSERT INTO pages (url, code, kind, title, content, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (page.url, page.code, page.kind, page.title, page.content, page.fetched_at),
+            ).lastrowid
+            conn.execute(
+                "INSERT INTO pages_fts (rowid, title, content, code) VALUES (?, ?, ?, ?)",
+                (rowid, page.title, page.content, page.code),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _fresh(self, rows: list) -> list[HandbookPage]:
+        pages = [HandbookPage(*row) for row in rows]
+        fresh = [p for p in pages if time.time() - p.fetched_at <= self.max_age]
+        self.stats["stale"] += len(pages) - len(fresh)
+        return fresh
+
+    def get(self, code: str) -> HandbookPage | None:
+        """The fresh page of a course or program code, or None."""
+        rows = self._connection().execute(
+            "SELECT url, code, kind, title, content, fetched_at FROM pages WHERE code = ? ORDER BY fetched_at DESC",
+            (code.replace(" ", "").upper(),),
+        ).fetchall()
+        fresh = self._fresh(rows)
+        self.stats["hits" if fresh else "misses"] += 1
+        return fresh[0] if fresh else None
+
+    def _coverage(self, rowid: int, terms: list[str]) -> tuple[float, float]:
+        """Shares of the terms found in a page, and in its title."""
+        conn = self._connection()
+        found = titled = 0
+        for term in terms:
+            sql = "SELECT 1 FROM pages_fts WHERE pages_fts MATCH ? AND rowid = ?"
+            if conn.execute(sql, (f'"{term}"', rowid)).fetchone():
+                found += 1
+                titled += conn.execute(sql, (f'title : "{term}"', rowid)).fetchone() is not None
+        return found / len(terms), titled / len(terms)
+
+    def search(self, query: str, kind: str | None = None, limit: int = 3) -> list[HandbookPage]:
+        """Fresh pages that answer a free-text query, best (bm25) first.
+
+        Pages covering less than MIN_TERM_COVERAGE of the query's terms, or
+        less than MIN_TITLE_COVERAGE of them in their title, are not returned.
+        """
+        terms = query_terms(query)
+        expression = _match_expression(terms)
+        if expression is None:
+            return []
+        sql = (
+            "SELECT f.rowid, p.url, p.code, p.kind, p.title, p.content, p.fetched_at FROM pages_fts f"
+            " JOIN pages p ON p.rowid = f.rowid WHERE pages_fts MATCH ?"
+            + (" AND p.kind = ?" if kind else "")
+            + " ORDER BY bm25(pages_fts, 5.0, 1.0, 10.0) LIMIT ?"
+        )
+        params = (expression, kind, limit) if kind else (expression, limit)
+        try:
+            rows = self._connection().execute(sql, params).fetchall()
+            covered = []
+            for rowid, *row in rows:
+                coverage, title_coverage = self._coverage(rowid, terms)
+                if coverage >= MIN_TERM_COVERAGE and title_coverage >= MIN_TITLE_COVERAGE:
+                    covered.append(row)
+                else:
+                    self.stats["weak_matches"] += 1
+        except sqlite3.OperationalError:
+            # Unparseable expression: treat as a miss and let the web search handle it
+            covered = []
+        fresh = self._fresh(covered)
+        self.stats["hits" if fresh else "misses"] += 1
+        return fresh
+
+    def pages(self, kind: str | None = None) -> list[HandbookPage]:
+        """Every fresh page, optionally of one kind."""
+        sql = "SELECT url, code, kind, title, content, fetched_at FROM pages" + (" WHERE kind = ?" if kind else "")
+        return self._fresh(self._connection().execute(sql, (kind,) if kind else ()).fetchall())
+
+    def count(self) -> int:
+        """Number of indexed pages."""
+        return self._connection().execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+
+# Shared index instance - initialize lazily on first use
+_index = None
+_index_checked = False
+
+
+def get_handbook_index() -> HandbookIndex | None:
+    """Get the handbook index, or None when no index file exists."""
+    global _index, _index_checked
+    if not _index_checked:
+        _index_checked = True
+        path = os.environ.get(HANDBOOK_DB_ENV, DEFAULT_HANDBOOK_DB)
+        if os.path.exists(path):
+            _index = HandbookIndex(path, float(os.environ.get(HANDBOOK_MAX_AGE_ENV, DEFAULT_MAX_AGE_DAYS)))
+    return _index
+
+
+def reset_handbook_index() -> None:
+    """Drop the shared index instance so the next lookup reopens it."""
+    global _index, _index_checked
+    _index, _index_checked = None, False
+
+
+def lookup_course(course_code: str) -> list[dict]:
+    """Index results for a course code, in process_search_results shape ([] on a miss)."""
+    index = get_handbook_index()
+    if index is None:
+        return []
+    with span("handbook.lookup", **{"handbook.code": course_code}):
+        page = index.get(course_code)
+        annotate({"cache.hit": page is not None})
+    return [page.as_search_result()] if page else []
+
+
+def lookup_programs(query: str, limit: int = 1) -> list[dict]:
+    """Index results for a program query, by program code when it has one ([] on a miss)."""
+    index = get_handbook_index()
+    if index is None:
+        return []
+    with span("handbook.lookup", **{"handbook.query": query}):
+        codes = [c for c in extract_codes(query) if c.isdigit()]
+        if codes:
+            pages = [page for page in (index.get(code) for code in codes[:limit]) if page]
+        else:
+            pages = index.search(query, kind="program", limit=limit)
+        annotate({"cache.hit": bool(pages)})
+    return [page.as_search_result() for page in pages]
+
+
+def ingest_directory(index: HandbookIndex, directory: str) -> Counter:
+    """Index every page file under a directory; returns counts by page kind."""
+    counts = Counter()
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if not name.lower().endswith(PAGE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, encoding="utf-8", errors="replace") as f:
+                page = parse_page(path, f.read())
+            index.add(page)
+            counts[page.kind] += 1
+    return counts
@@ -0,0 +1,156 @@
+"""Per-host fetch latency tracking and circuit breakers.
+
+`process_search_results` fetches every result page, and one slow or failing
+site used to stall the whole turn. Each page download is recorded here by
+host. A host that fails several times in a row has its breaker opened and is
+skipped (the search result's own content is used instead) until a cooldown
+passes, after which a single trial fetch decides whether it closes again.
+
+The recorded latencies also set the hedge delay: once a fetch has run longer
+than the host's usual (90th percentile) latency, the caller stops waiting and
+answers from the search result while the fetch finishes in the background.
+"""
+
+import threading
+import time
+from collections import Counter, deque
+from urllib.parse import urlsplit
+
+# Consecutive failures that open a host's breaker, and how long it stays open (seconds)
+FAILURE_THRESHOLD = 3
+COOLDOWN_SECONDS = 60.0
+
+# Latency percentile after which a fetch is hedged, and the bounds of that delay (seconds)
+HEDGE_PERCENTILE = 0.9
+MIN_HEDGE_DELAY = 1.0
+MAX_HEDGE_DELAY = 8.0
+DEFAULT_HEDGE_DELAY = 4.0
+# Latency samples kept per host, and needed before a host's own percentile is trusted
+WINDOW = 50
+MIN_SAMPLES = 5
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+def host_of(url: str) -> str:
+    """Host name of a URL ("" when it has none)."""
+    return (urlsplit(url).hostname or "").lower()
+
+
+def percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty sequence."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class HostState:
+    """Recent latencies and breaker state of one host."""
+
+    def __init__(self):
+        self.latencies = deque(maxlen=WINDOW)
+        self.failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.trial_running = False
+        self.stats = Counter()
+
+
+class HostMonitor:
+    """Thread-safe per-host latency windows and circuit breakers."""
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, cooldown: float = COOLDOWN_SECONDS):
+        """Create the monitor.
+
+        Args:
+            failure_threshold: Consecutive failures that open a host's breaker
+            cooldown: Seconds a breaker stays open before a trial fetch
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._hosts: dict[str, HostState] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host: str) -> HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState()
+        return state
+
+    def allow(self, host: str) -> bool:
+        """Whether a fetch from the host may run now (False while its breaker is open).
+
+        Every allowed fetch must be followed by `record`, also when it raises:
+        a half-open host lets no other fetch through until its trial is recorded.
+        """
+        with self._lock:
+            state = self._host(host)
+            if state.state == OPEN and time.time() - state.opened_at >= self.cooldown:
+                state.state = HALF_OPEN
+            if state.state == CLOSED:
+                return True
+            if state.state == HALF_OPEN and not state.trial_running:
+                # One trial fetch decides whether the breaker closes
+                state.trial_running = True
+                return True
+            state.stats["skipped"] += 1
+            return False
+
+    def record(self, host: str, latency: float, ok: bool) -> None:
+        """Record a finished fetch and update the host's breaker."""
+        with self._lock:
+            state = self._host(host)
+            state.trial_running = False
+            state.stats["fetches"] += 1
+            if ok:
+                state.latencies.append(latency)
+                state.failures = 0
+                state.state = CLOSED
+                return
+            state.stats["failures"] += 1
+            state.failures += 1
+            if state.state == HALF_OPEN or state.failures >= self.failure_threshold:
+                if state.state != OPEN:
+                    state.stats["opened"] += 1
+                state.state = OPEN
+                state.opened_at = time.time()
+
+    def hedge_delay(self, host: str) -> float:
+        """Seconds to wait for a fetch from the host before answering without it."""
+        with self._lock:
+            samples = self._hosts[host].latencies if host in self._hosts else ()
+            if len(samples) < MIN_SAMPLES:
+                # Too little history for this host: use every host's latencies
+                samples = [latency for state in self._hosts.values() for latency in state.latencies]
+            if len(samples) < MIN_SAMPLES:
+                return DEFAULT_HEDGE_DELAY
+            delay = percentile(samples, HEDGE_PERCENTILE)
+        return min(MAX_HEDGE_DELAY, max(MIN_HEDGE_DELAY, delay))
+
+    def note(self, host: str, event: str) -> None:
+        """Count an event (e.g. "hedged") against a host."""
+        with self._lock:
+            self._host(host).stats[event] += 1
+
+    def report(self) -> dict:
+        """Per-host breaker state, latency percentiles and counters."""
+        with self._lock:
+            report = {}
+            for host, state in sorted(self._hosts.items()):
+                entry = {"state": state.state, **state.stats}
+                if state.latencies:
+                    entry["p50"] = round(percentile(state.latencies, 0.5), 3)
+                    entry["p90"] = round(percentile(state.latencies, 0.9), 3)
+                report[host] = entry
+            return report
+
+
+# Shared monitor instance - initialize lazily on first use
+_monitor = None
+
+
+def get_host_monitor() -> HostMonitor:
+    """Get the process-wide host monitor, initializing it if needed."""
+    global _monitor
+    if _monitor is None:
+        _monitor = HostMonitor()
+    return _monitor
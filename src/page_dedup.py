@@ -0,0 +1,184 @@
+"""Near-duplicate page detection before summarization.
+
+Search results often include mirrors, syndicated copies and near-identical
+UNSW subpages. Each used to be summarized by its own LLM call and saved as
+its own file. `PageFingerprintStore` keeps a MinHash signature of every
+summarized page's content. A page whose content is a near-duplicate of a
+known one reuses that page's summary and file name instead, and a
+near-duplicate within the same search is dropped.
+
+Pages mentioning different course codes never match, however similar their
+text is (handbook course pages share most of their template).
+
+Signatures are kept in memory; with ADVISOR_FINGERPRINT_DB set they are also
+written to that SQLite file and reloaded at startup. A fingerprint is matched
+no longer than the summary it points to stays cached.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from src.cache import DEFAULT_TTLS
+from src.fingerprint import COURSE_CODE_RE, MinHash, MinHashLSH, word_shingles
+
+FINGERPRINT_DB_ENV = "ADVISOR_FINGERPRINT_DB"
+
+# Only the start of a page is fingerprinted; mirrors differ, if at all, in their chrome
+MAX_FINGERPRINT_CHARS = 20000
+# Pages shorter than this many words are too generic to match reliably
+MIN_WORDS = 50
+
+
+@dataclass
+class PageFingerprint:
+    """A summarized page and the signature of its content."""
+
+    url: str
+    summary: str
+    filename: str
+    created_at: float
+    signature: tuple[int, ...] = field(repr=False)
+    codes: tuple[str, ...] = ()
+
+
+@dataclass
+class PageMatch:
+    """A known page the looked-up content is a near-duplicate of."""
+
+    page: PageFingerprint
+    similarity: float
+
+
+def page_codes(content: str) -> tuple[str, ...]:
+    """Sorted course codes mentioned in the fingerprinted part of a page."""
+    text = content[:MAX_FINGERPRINT_CHARS]
+    return tuple(sorted({f"{prefix.upper()}{number}" for prefix, number in COURSE_CODE_RE.findall(text)}))
+
+
+class PageFingerprintStore:
+    """Thread-safe MinHash/LSH index of summarized page contents."""
+
+    def __init__(
+        self,
+        path: str | None = None,
+        similarity_threshold: float = 0.85,
+        max_entries: int = 5000,
+        max_age_seconds: float = DEFAULT_TTLS["summary"],
+        num_perm: int = 64,
+        bands: int = 16,
+    ):
+        """Create the store.
+
+        Args:
+            path: SQLite file the fingerprints are persisted to (None: memory only)
+            similarity_threshold: Minimum estimated Jaccard similarity of a near-duplicate
+            max_entries: Maximum stored pages before the oldest are evicted
+            max_age_seconds: Older pages are never matched (their summaries may be outdated);
+                capped at the summary cache TTL
+            num_perm: MinHash signature length
+            bands: Number of LSH bands (must divide num_perm)
+        """
+        self.path = path
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        # A page is not reused past the TTL of the summary it shares
+        self.max_age_seconds = min(max_age_seconds, DEFAULT_TTLS["summary"])
+        self._minhash = MinHash(num_perm=num_perm)
+        self._lsh = MinHashLSH(num_perm=num_perm, bands=bands)
+        self._entries: dict[str, PageFingerprint] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats = Counter()
+        if path:
+            self._connection().execute(
+                "CREATE TABLE IF NOT EXISTS fingerprints ("
+                " url TEXT PRIMARY KEY, summary TEXT NOT NULL, filename TEXT NOT NULL,"
+                " created_at REAL NOT NULL, signature TEXT NOT NULL, codes TEXT NOT NULL)"
+            )
+            self._load()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads; one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _load(self) -> None:
+        rows = self._connection().execute(
+            "SELECT url, summary, filename, created_at, signature, codes FROM fingerprints"
+            " WHERE created_at >= ? ORDER BY created_at DESC LIMIT ?",
+            (time.time() - self.max_age_seconds, self.max_entries),
+        ).fetchall()
+        for url, summary, filename, created_at, signature, codes in reversed(rows):
+            self._insert(PageFingerprint(url, summary, filename, created_at, tuple(json.loads(signature)), tuple(json.loads(codes))))
+
+    def _insert(self, page: PageFingerprint) -> None:
+        self._remove(page.url)
+        self._entries[page.url] = page
+        self._lsh.insert(page.url, page.signature)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, url: str) -> None:
+        page = self._entries.pop(url, None)
+        if page is not None:
+            self._lsh.remove(url, page.signature)
+
+    def signature(self, content: str) -> tuple[int, ...] | None:
+        """MinHash signature of a page's content, or None when it is too short to match."""
+        shingle_set = word_shingles(content[:MAX_FINGERPRINT_CHARS])
+        if len(shingle_set) < MIN_WORDS:
+            return None
+        return self._minhash.signature(shingle_set)
+
+    def find(self, signature: tuple[int, ...], codes: tuple[str, ...]) -> PageMatch | None:
+        """Most similar known page that is a near-duplicate, or None.
+
+        Args:
+            signature: Signature of the page's content (see signature())
+            codes: Course codes of the page (see page_codes())
+        """
+        now = time.time()
+        best = None
+        with self._lock:
+            for url in self._lsh.query(signature):
+                page = self._entries[url]
+                if page.codes != codes or now - page.created_at > self.max_age_seconds:
+                    continue
+                similarity = MinHash.similarity(signature, page.signature)
+                if similarity >= self.similarity_threshold and (best is None or similarity > best.similarity):
+                    best = PageMatch(page, similarity)
+        self.stats["near_duplicates" if best else "unique"] += 1
+        return best
+
+    def add(self, url: str, signature: tuple[int, ...], codes: tuple[str, ...], summary: str, filename: str) -> None:
+        """Record a summarized page so later near-duplicates can reuse its summary."""
+        page = PageFingerprint(url, summary, filename, time.time(), signature, codes)
+        with self._lock:
+            self._insert(page)
+        if self.path:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO fingerprints (url, summary, filename, created_at, signature, codes)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, summary, filename, page.created_at, json.dumps(signature), json.dumps(codes)),
+            )
+
+
+# Shared store instance - initialize lazily on first use
+_store = None
+
+
+def get_fingerprint_store() -> PageFingerprintStore:
+    """Get the process-wide page fingerprint store (persisted when ADVISOR_FINGERPRINT_DB is set)."""
+    global _store
+    if _store is None:
+        _store = PageFingerprintStore(os.environ.get(FINGERPRINT_DB_ENV) or None)
+    return _store
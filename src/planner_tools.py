@@ -0,0 +1,152 @@
+"""Deterministic course-planning tools for the course-planner sub-agent.
+
+These answer prerequisite questions from the parsed rules in src.prereq_graph,
+and build term-by-term plans with src.degree_planner, in one call instead of
+the sub-agent searching, reading files and reasoning over prerequisite chains
+turn by turn.
+"""
+
+from typing import Annotated, Literal
+
+from langchain_core.tools import tool
+from langgraph.prebuilt import InjectedState
+
+from src.degree_planner import TERMS, solve_plan
+from src.fingerprint import COURSE_CODE_RE
+from src.prereq_graph import format_requirement, graph_with_files
+from src.state import DeepAgentState
+
+
+def _normalize_codes(codes: list[str] | None) -> list[str]:
+    """Upper-case course codes without inner spaces, dropping anything that is not a code."""
+    normalized = []
+    for code in codes or []:
+        match = COURSE_CODE_RE.search(code)
+        if match:
+            normalized.append(f"{match.group(1).upper()}{match.group(2)}")
+    return list(dict.fromkeys(normalized))
+
+
+@tool(parse_docstring=True)
+def course_prerequisites(
+    course_codes: list[str],
+    question: Literal["prerequisites", "study_order", "unlocks"],
+    state: Annotated[DeepAgentState, InjectedState],
+    completed_courses: list[str] | None = None,
+) -> str:
+    """Answer prerequisite questions from parsed UNSW handbook rules in one call.
+
+    Uses the enrolment rules of courses in the local handbook index and of course
+    pages already fetched into files. Prefer this over reading pages and tracing
+    prerequisite chains yourself. Courses without a known page are listed so you
+    can fetch them with search_course_details and call this tool again.
+
+    Args:
+        course_codes: Course codes to ask about (e.g. ["COMP3311", "COMP3900"])
+        question: "prerequisites" for each course's rule and every course needed before it, "study_order" for an order of the courses and their prerequisites in successive terms, or "unlocks" for the courses each one opens up
+        state: Injected agent state whose fetched course pages are parsed as well
+        completed_courses: Courses the student has already passed, if known
+
+    Returns:
+        Plain-text answer listing rules, orders or unlocked courses
+    """
+    codes = _normalize_codes(course_codes)
+    completed = set(_normalize_codes(completed_courses))
+    if not codes:
+        return "No valid course codes given (expected codes like COMP3311)."
+    graph = graph_with_files(state.get("files", {}))
+
+    lines = []
+    if question == "prerequisites":
+        for code in codes:
+            node = graph.courses.get(code)
+            if node is None:
+                continue
+            required = graph.required_courses(code, completed)
+            lines.append(node.title if code in node.title else f"{code} {node.title}".strip())
+            lines.append(f"  Prerequisite rule: {format_requirement(node.prerequisite)}")
+            if node.min_uoc:
+                lines.append(f"  Also requires completion of {node.min_uoc} UOC")
+            if node.corequisite is not None:
+                lines.append(f"  Co-requisite: {format_requirement(node.corequisite)}")
+            if node.exclusions:
+                lines.append(f"  Exclusions: {', '.join(sorted(node.exclusions))}")
+            lines.append(f"  Still needed first: {', '.join(sorted(required)) or 'nothing'}")
+            lines.append(f"  All courses in its prerequisite tree: {', '.join(sorted(graph.prerequisite_tree(code))) or 'none'}")
+    elif question == "study_order":
+        layers, unresolved = graph.study_order(codes, completed)
+        for i, layer in enumerate(layers, start=1):
+            lines.append(f"Step {i}: {', '.join(layer)}")
+        if unresolved:
+            lines.append(f"Prerequisite cycle, cannot order: {', '.join(unresolved)}")
+    else:
+        for code in codes:
+            unlocked, partial = graph.unlocks(code, completed)
+            lines.append(f"{code} unlocks: {', '.join(unlocked) or 'no further known courses'}")
+            if partial:
+                lines.append(f"  Also counts towards (other prerequisites still missing): {', '.join(partial)}")
+
+    # Only courses on the chosen path matter; unknown alternatives are skipped
+    unknown = graph.unknown(graph.plan_courses(codes, completed) | set(codes))
+    if unknown:
+        lines.append(
+            f"No handbook page known for: {', '.join(unknown)}. Their own prerequisites are not included; "
+            "fetch them with search_course_details if they matter."
+        )
+    return "\n".join(lines)
+
+
+@tool(parse_docstring=True)
+def plan_degree(
+    core_courses: list[str],
+    state: Annotated[DeepAgentState, InjectedState],
+    elective_courses: list[str] | None = None,
+    electives_required: int = 0,
+    num_terms: int = 6,
+    max_uoc_per_term: int = 18,
+    start_term: Literal["T1", "T2", "T3"] = "T1",
+    completed_courses: list[str] | None = None,
+) -> str:
+    """Build a valid term-by-term study plan for a program, or explain why none exists.
+
+    Schedules the core courses, the chosen electives and every prerequisite they
+    need, respecting prerequisite order, term offerings, UOC thresholds and the
+    UOC cap per term. Use this for "plan my degree over N terms" questions and
+    narrate its result instead of planning term by term yourself.
+
+    Args:
+        core_courses: Course codes the program requires (from the program's handbook page)
+        state: Injected agent state whose fetched course pages are parsed as well
+        elective_courses: Pool of elective course codes to choose from
+        electives_required: How many electives from the pool must be taken
+        num_terms: Number of consecutive main terms available (default 6, i.e. two years)
+        max_uoc_per_term: UOC cap per term (default 18, a full-time load)
+        start_term: Term the plan starts in
+        completed_courses: Courses the student has already passed, if known
+
+    Returns:
+        The plan, one line per term, or the constraints that make it impossible
+    """
+    core = _normalize_codes(core_courses)
+    if not core and not electives_required:
+        return "No valid core course codes given (expected codes like COMP9020)."
+    graph = graph_with_files(state.get("files", {}))
+    plan = solve_plan(
+        graph,
+        core,
+        _normalize_codes(elective_courses),
+        electives_required=max(0, electives_required),
+        num_terms=max(1, num_terms),
+        max_uoc_per_term=max(6, max_uoc_per_term),
+        start_term=start_term if start_term in TERMS else "T1",
+        completed=_normalize_codes(completed_courses),
+    )
+    lines = [plan.format()]
+    courses = set(core) | set(plan.electives) | {c for _, row, _ in plan.terms for c in row}
+    unknown = graph.unknown(courses)
+    if unknown:
+        lines.append(
+            f"No handbook page known for: {', '.join(unknown)} (assumed 6 UOC, every term, no prerequisites); "
+            "fetch them with search_course_details for an exact plan."
+        )
+    return "\n".join(lines)
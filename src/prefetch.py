@@ -0,0 +1,191 @@
+"""Entry-stage prefetch of course and program pages.
+
+Most course questions name their codes ("Can I take COMP9020 and COMP9021?"),
+yet the agent only fetches them after classification and a planning turn. As
+soon as a turn starts, `prefetch_message` detects the course and program codes
+in the user's message and starts fetching each one in the background through
+the normal pipeline (handbook index, then Tavily search, page fetch and
+summary, all behind the shared cache).
+
+The course and program search tools ask the prefetcher first: a finished
+prefetch is returned directly and one still in flight is waited on, so the
+same code is never fetched twice in a turn.
+"""
+
+import contextvars
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from src.complexity_classifier import get_classifier
+from src.fingerprint import COURSE_CODE_RE, extract_codes
+from src.handbook import lookup_course, lookup_programs
+from src.tavilys import process_search_results, run_tavily_search
+from src.tracing import annotate, span
+
+# Query templates; parallel_course_details uses the same course query so both share cache entries
+COURSE_BASE_QUERY = "UNSW handbook course overview prerequisites"
+PROGRAM_QUERY = "UNSW program {code} handbook structure"
+
+# Upper bound on codes prefetched per message
+MAX_PREFETCH_CODES = 8
+# Prefetched results are reused for this long (seconds)
+PREFETCH_TTL = 10 * 60
+# Longest a tool waits for an in-flight prefetch before fetching on its own
+PREFETCH_WAIT_SECONDS = 60.0
+# Four-digit numbers in this range are years ("T1 2026"), not program codes
+YEAR_RANGE = range(1900, 2100)
+
+
+def normalize_code(code: str) -> str:
+    """Canonical form of a course or program code ("comp 9020" -> "COMP9020")."""
+    return code.replace(" ", "").upper()
+
+
+def fetch_course(code: str, difficulty: str | None = None) -> list[dict]:
+    """Results for a course code: the handbook index, else the web search pipeline."""
+    results = lookup_course(code)
+    if not results:
+        results = process_search_results(run_tavily_search(f"{code} {COURSE_BASE_QUERY}", 1, True), difficulty)
+    return results
+
+
+def fetch_program(code: str, difficulty: str | None = None) -> list[dict]:
+    """Results for a program code: the handbook index, else the web search pipeline."""
+    results = lookup_programs(code)
+    if not results:
+        results = process_search_results(run_tavily_search(PROGRAM_QUERY.format(code=code), 1, True), difficulty)
+    return results
+
+
+class CodePrefetcher:
+    """Background fetches of course and program pages keyed by code."""
+
+    def __init__(self, max_workers: int = 4, ttl: float = PREFETCH_TTL):
+        """Create the prefetcher.
+
+        Args:
+            max_workers: Concurrent fetches (bounds load on Tavily and the LLM)
+            ttl: Seconds a prefetched result stays usable
+        """
+        self.ttl = ttl
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._entries: dict[str, tuple[float, Future]] = {}
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def prefetch(self, codes: list[str], difficulty: str | None = None) -> list[str]:
+        """Start fetching codes that are not already fetched or in flight.
+
+        Args:
+            codes: Course codes (COMP9020) and program codes (8543)
+            difficulty: Expected difficulty tier, which picks the page summarizer
+
+        Returns:
+            Codes for which a fetch was started
+        """
+        started = []
+        now = time.time()
+        with self._lock:
+            for code in dict.fromkeys(normalize_code(c) for c in codes):
+                entry = self._entries.get(code)
+                if entry is not None and now - entry[0] <= self.ttl and not self._failed(entry[1]):
+                    self.stats["reused"] += 1
+                    continue
+                fetch = fetch_course if COURSE_CODE_RE.fullmatch(code) else fetch_program
+                # Copy the context so the fetch spans nest under the turn that started them
+                future = self._pool.submit(contextvars.copy_context().run, self._fetch, fetch, code, difficulty)
+                self._entries[code] = (now, future)
+                self.stats["started"] += 1
+                started.append(code)
+        return started
+
+    def _fetch(self, fetch, code: str, difficulty: str | None) -> list[dict]:
+        with span("prefetch.fetch", **{"prefetch.code": code}):
+            results = fetch(code, difficulty)
+            annotate({"prefetch.results": len(results)})
+        return results
+
+    @staticmethod
+    def _failed(future: Future) -> bool:
+        return future.done() and (future.cancelled() or future.exception() is not None)
+
+    def get(self, code: str, timeout: float = PREFETCH_WAIT_SECONDS) -> list[dict] | None:
+        """Prefetched results for a code, waiting for an in-flight fetch.
+
+        Args:
+            code: Course or program code
+            timeout: Longest wait for a fetch still running
+
+        Returns:
+            The results, or None when the code was not prefetched, the fetch
+            failed or did not finish in time (the caller then fetches itself)
+        """
+        code = normalize_code(code)
+        with self._lock:
+            entry = self._entries.get(code)
+            if entry is not None and time.time() - entry[0] > self.ttl:
+                del self._entries[code]
+                entry = None
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        future = entry[1]
+        self.stats["hits" if future.done() else "waits"] += 1
+        try:
+            results = future.result(timeout=timeout)
+        except FutureTimeout:
+            self.stats["timeouts"] += 1
+            return None
+        except Exception:
+            self.stats["failures"] += 1
+            return None
+        return results or None
+
+    def clear(self) -> None:
+        """Forget every prefetched result."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared prefetcher instance - initialize lazily on first use
+_prefetcher = None
+
+
+def get_prefetcher() -> CodePrefetcher:
+    """Get the process-wide prefetcher, initializing it if needed."""
+    global _prefetcher
+    if _prefetcher is None:
+        _prefetcher = CodePrefetcher()
+    return _prefetcher
+
+
+def prefetch_message(user_message: str) -> list[str]:
+    """Start background fetches for the course and program codes in a message.
+
+    Args:
+        user_message: Raw user question
+
+    Returns:
+        Codes for which a fetch was started
+    """
+    codes = [c for c in extract_codes(user_message) if not (c.isdigit() and int(c) in YEAR_RANGE)]
+    # Course codes first: they are what most questions are about
+    codes = sorted(codes, key=lambda c: not COURSE_CODE_RE.fullmatch(c))[:MAX_PREFETCH_CODES]
+    if not codes:
+        return []
+    # The LLM classification runs concurrently; the local prediction picks the summarizer
+    difficulty = get_classifier().predict_local(user_message)[0].get("difficulty")
+    with span("prefetch.start", **{"prefetch.codes": ",".join(codes)}):
+        started = get_prefetcher().prefetch(codes, difficulty)
+        annotate({"prefetch.started": len(started)})
+    return started
+
+
+def prefetched(code: str) -> list[dict] | None:
+    """Prefetched results for a code, or None (see CodePrefetcher.get)."""
+    with span("prefetch.get", **{"prefetch.code": normalize_code(code)}):
+        results = get_prefetcher().get(code)
+        annotate({"cache.hit": results is not None})
+    return results
@@ -0,0 +1,441 @@
+"""Course prerequisite graph built from handbook pages.
+
+The course planner used to work out prerequisite chains by searching, reading
+files and reasoning over them in the LLM. Here the enrolment rules of every
+known course page (the handbook index plus pages fetched into the agent's
+files) are parsed once into a graph:
+- prerequisites and co-requisites as and/or expressions over course codes
+  (e.g. "COMP1511 and (MATH1081 or MATH1131)"), plus any UOC threshold
+- exclusions, units of credit and offering terms
+
+and answered directly: transitive prerequisites, a term-by-term study order,
+and which courses a course unlocks.
+"""
+
+import re
+import threading
+from dataclasses import dataclass, field
+
+from src.fingerprint import COURSE_CODE_RE
+from src.handbook import get_handbook_index
+
+# Requirement expressions: a course code, or ("and" | "or", [sub-expressions])
+Requirement = str | tuple | None
+
+_SECTION_RE = re.compile(
+    r"(?P<kind>pre-?requisites?|co-?requisites?|exclu(?:sions?|ded courses?))\s*(?:\(s\))?\s*[:\-]\s*"
+    r"(?P<body>.+?)(?=(?:pre-?requisites?|co-?requisites?|exclu(?:sions?|ded courses?)|equivalents?)\s*[:\-]|\n\s*\n|$)",
+    re.IGNORECASE | re.DOTALL,
+)
+_TOKEN_RE = re.compile(r"([A-Za-z]{4})\s?(\d{4})|(\()|(\))|\b(and|or)\b|(,|;|&|/)", re.IGNORECASE)
+_COURSE_CODE_LINE_RE = re.compile(r"\*\*Course Code:\*\*\s*([A-Za-z]{4})\s?(\d{4})")
+_MIN_UOC_RE = re.compile(r"(\d{2,3})\s*(?:units of credit|uoc)", re.IGNORECASE)
+_UOC_RE = re.compile(r"(?:units of credit\s*[:\-]?\s*(\d{1,2})\b|\b(\d{1,2})\s*(?:units of credit|uoc)\b)", re.IGNORECASE)
+_TERMS_LINE_RE = re.compile(r"(?:offering terms?|terms? offered|offered in|offering)\s*[:\-]?\s*([^\n]{0,120})", re.IGNORECASE)
+_TERM_RE = re.compile(r"\b(?:term\s*([123])|t([123]))\b|\b(summer)\b", re.IGNORECASE)
+
+# Requirement bodies longer than this are prose, not rules
+MAX_RULE_LENGTH = 400
+
+# Token separating top-level clauses (", and", "; and", ";"), which bind loosest
+_CLAUSE = "<clause>"
+
+
+def parse_requirement(text: str) -> Requirement:
+    """Parse an enrolment rule ("COMP1511 and (MATH1081 or MATH1131)") into an expression.
+
+    Clauses separated by ", and", "; and" or ";" are all required and bind
+    loosest, as in the handbook's "COMP1511 or DPST1091, and COMP1521 or
+    DPST1092". Within a clause "and" binds tighter than "or"; other commas and
+    adjacent codes mean "and"; words other than codes, parentheses and
+    conjunctions are ignored.
+
+    Returns:
+        A course code, ("and" | "or", [expressions]), or None if the text names no course
+    """
+    raw = []
+    for prefix, number, open_, close, conjunction, separator in _TOKEN_RE.findall(text):
+        if prefix:
+            raw.append(f"{prefix.upper()}{number}")
+        elif open_ or close:
+            raw.append(open_ or close)
+        elif conjunction:
+            raw.append(conjunction.lower())
+        elif separator == "/":
+            raw.append("or")
+        elif separator == "&":
+            raw.append("and")
+        else:
+            raw.append(separator)
+    tokens = []
+    for i, token in enumerate(raw):
+        following = raw[i + 1] if i + 1 < len(raw) else None
+        if token == ";" or (token == "," and following == "and"):
+            tokens.append(_CLAUSE)
+        elif token == "and" and tokens and tokens[-1] == _CLAUSE:
+            continue  # the "and" of ", and" / "; and"
+        elif token == ",":
+            # ", or" is just "or"; any other comma joins with "and"
+            if following != "or":
+                tokens.append("and")
+        else:
+            tokens.append(token)
+    position = 0
+
+    def _peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def _factor():
+        nonlocal position
+        token = _peek()
+        if token == "(":
+            position += 1
+            inner = _clauses()
+            if _peek() == ")":
+                position += 1
+            return inner
+        if token is not None and token not in ("and", "or", ")", _CLAUSE):
+            position += 1
+            return token
+        return None
+
+    def _combine(op, parts):
+        parts = [p for p in parts if p is not None]
+        if not parts:
+            return None
+        return parts[0] if len(parts) == 1 else (op, parts)
+
+    def _and():
+        nonlocal position
+        parts = [_factor()]
+        while _peek() not in (None, "or", ")", _CLAUSE):
+            if _peek() == "and":
+                position += 1
+            parts.append(_factor())
+        return _combine("and", parts)
+
+    def _or():
+        nonlocal position
+        parts = [_and()]
+        while _peek() == "or":
+            position += 1
+            parts.append(_and())
+        return _combine("or", parts)
+
+    def _clauses():
+        nonlocal position
+        parts = [_or()]
+        while _peek() == _CLAUSE:
+            position += 1
+            parts.append(_or())
+        return _combine("and", parts)
+
+    result = []
+    while position < len(tokens):
+        before = position
+        result.append(_clauses())
+        if position == before:
+            position += 1  # stray ")" or conjunction
+    return _flatten(_combine("and", result))
+
+
+def _flatten(expr: Requirement) -> Requirement:
+    """Merge nested operators of the same kind (and[a, and[b, c]] -> and[a, b, c])."""
+    if expr is None or isinstance(expr, str):
+        return expr
+    op, parts = expr
+    flat = []
+    for part in (_flatten(p) for p in parts):
+        if isinstance(part, tuple) and part[0] == op:
+            flat.extend(part[1])
+        else:
+            flat.append(part)
+    return (op, flat)
+
+
+def requirement_codes(expr: Requirement) -> set[str]:
+    """Every course code mentioned in an expression."""
+    if expr is None:
+        return set()
+    if isinstance(expr, str):
+        return {expr}
+    return set().union(*(requirement_codes(part) for part in expr[1]))
+
+
+def is_satisfied(expr: Requirement, completed: set[str]) -> bool:
+    """Whether the completed courses satisfy an expression."""
+    if expr is None:
+        return True
+    if isinstance(expr, str):
+        return expr in completed
+    results = (is_satisfied(part, completed) for part in expr[1])
+    return all(results) if expr[0] == "and" else any(results)
+
+
+def format_requirement(expr: Requirement) -> str:
+    """Human-readable form of an expression."""
+    if expr is None:
+        return "none"
+    if isinstance(expr, str):
+        return expr
+    joined = f" {expr[0]} ".join(
+        f"({format_requirement(p)})" if isinstance(p, tuple) else format_requirement(p) for p in expr[1]
+    )
+    return joined
+
+
+@dataclass
+class CourseNode:
+    """Enrolment rules of one course."""
+
+    code: str
+    title: str = ""
+    uoc: int = 6
+    terms: set[str] = field(default_factory=set)
+    prerequisite: Requirement = None
+    corequisite: Requirement = None
+    exclusions: set[str] = field(default_factory=set)
+    min_uoc: int = 0
+
+
+def parse_course_page(code: str, title: str, content: str) -> CourseNode:
+    """Extract a course's enrolment rules, UOC and terms from its page text."""
+    node = CourseNode(code=code, title=title)
+    for match in _SECTION_RE.finditer(content):
+        body = match.group("body")[:MAX_RULE_LENGTH]
+        kind = match.group("kind").lower()
+        if kind.startswith("pre"):
+            expr = parse_requirement(body)
+            # A page may list the rule twice (summary and enrolment section)
+            node.prerequisite = node.prerequisite or expr
+            uoc = _MIN_UOC_RE.search(body)
+            if uoc:
+                node.min_uoc = max(node.min_uoc, int(uoc.group(1)))
+        elif kind.startswith("co"):
+            node.corequisite = node.corequisite or parse_requirement(body)
+        else:
+            node.exclusions |= requirement_codes(parse_requirement(body)) - {code}
+    if node.prerequisite is not None:
+        node.prerequisite = _without(node.prerequisite, code)
+    # Course sizes are at most 12 UOC; larger numbers are completion thresholds
+    for labelled, bare in _UOC_RE.findall(content):
+        if 0 < int(labelled or bare) <= 12:
+            node.uoc = int(labelled or bare)
+            break
+    for line in _TERMS_LINE_RE.findall(content):
+        for number_a, number_b, summer in _TERM_RE.findall(line):
+            node.terms.add("Summer" if summer else f"T{number_a or number_b}")
+    return node
+
+
+def _without(expr: Requirement, code: str) -> Requirement:
+    """Drop a (self-)reference from an expression."""
+    if expr is None or expr == code:
+        return None
+    if isinstance(expr, str):
+        return expr
+    parts = [p for p in (_without(part, code) for part in expr[1]) if p is not None]
+    if not parts:
+        return None
+    return parts[0] if len(parts) == 1 else (expr[0], parts)
+
+
+class PrerequisiteGraph:
+    """Courses and their enrolment rules with transitive queries."""
+
+    def __init__(self, courses: dict[str, CourseNode] | None = None):
+        self.courses: dict[str, CourseNode] = dict(courses or {})
+
+    def add_page(self, title: str, content: str, code: str | None = None) -> CourseNode | None:
+        """Parse a course page and add it (a page with rules replaces one without)."""
+        if code is None:
+            match = COURSE_CODE_RE.search(title) or COURSE_CODE_RE.search(content[:400])
+            if not match:
+                return None
+            code = f"{match.group(1).upper()}{match.group(2)}"
+        node = parse_course_page(code, title, content)
+        existing = self.courses.get(code)
+        if existing is None or (node.prerequisite or node.terms) or not (existing.prerequisite or existing.terms):
+            self.courses[code] = node
+        return self.courses[code]
+
+    def copy(self) -> "PrerequisiteGraph":
+        """Shallow copy that pages can be added to without touching this graph."""
+        return PrerequisiteGraph(self.courses)
+
+    def unknown(self, codes) -> list[str]:
+        """Codes without a parsed page."""
+        return sorted(c for c in codes if c not in self.courses)
+
+    def prerequisite_tree(self, code: str) -> set[str]:
+        """Every course mentioned anywhere in the transitive prerequisites (all alternatives)."""
+        seen: set[str] = set()
+        stack = [code]
+        while stack:
+            node = self.courses.get(stack.pop())
+            if node is None:
+                continue
+            for prereq in requirement_codes(node.prerequisite):
+                if prereq not in seen:
+                    seen.add(prereq)
+                    stack.append(prereq)
+        seen.discard(code)
+        return seen
+
+    def _choose(self, expr: Requirement, completed: set[str], visiting: frozenset, planned: frozenset) -> set[str]:
+        """Cheapest set of not-yet-completed courses (with their own prerequisites) satisfying expr.
+
+        Alternatives are ranked by how many of their courses have no known page
+        (unknown prerequisites, often a discontinued course), directly and then
+        transitively, and then by the courses they add beyond `planned`.
+        """
+        if expr is None or is_satisfied(expr, completed):
+            return set()
+        if isinstance(expr, str):
+            if expr in visiting:
+                return {expr}
+            node = self.courses.get(expr)
+            inner = self._choose(node.prerequisite, completed, visiting | {expr}, planned) if node else set()
+            return {expr} | inner
+        options = [self._choose(part, completed, visiting, planned) for part in expr[1]]
+        if expr[0] == "and":
+            return set().union(*options)
+        ranked = min(
+            zip(expr[1], options),
+            key=lambda item: (
+                len(self.unknown(requirement_codes(item[0]))),
+                len(self.unknown(item[1])),
+                len(item[1] - planned),
+                len(item[1]),
+                sorted(item[1]),
+            ),
+        )
+        return ranked[1]
+
+    def required_courses(self, code: str, completed=(), planned=()) -> set[str]:
+        """Smallest set of courses to take before `code`, picking the cheapest alternative of each "or".
+
+        Args:
+            code: Target course
+            completed: Courses already passed
+            planned: Courses taken anyway, preferred when an "or" offers them
+        """
+        node = self.courses.get(code)
+        if node is None:
+            return set()
+        return self._choose(node.prerequisite, set(completed), frozenset({code}), frozenset(planned)) - {code}
+
+    def plan_courses(self, targets: list[str], completed=()) -> set[str]:
+        """Targets plus the prerequisites and co-requisites they need.
+
+        Courses are shared between targets where an "or" allows; a co-requisite
+        not already planned is added with its own prerequisites.
+        """
+        completed = set(completed)
+        needed = {t for t in targets if t not in completed}
+        for target in sorted(needed):
+            needed |= self.required_courses(target, completed)
+        needed |= self._missing_corequisites(needed, completed, frozenset(needed))
+        # Second pass: re-pick alternatives now that the courses taken anyway are known
+        planned = frozenset(needed)
+        needed = {t for t in targets if t not in completed}
+        for target in sorted(needed):
+            needed |= self.required_courses(target, completed, planned)
+        needed |= self._missing_corequisites(needed, completed, planned)
+        return needed
+
+    def _missing_corequisites(self, needed: set[str], completed: set[str], planned: frozenset) -> set[str]:
+        """Co-requisites of the needed courses (transitively) not yet planned, with their prerequisites."""
+        added: set[str] = set()
+        pending = sorted(needed)
+        while pending:
+            node = self.courses.get(pending.pop())
+            if node is None or node.corequisite is None:
+                continue
+            extra = self._choose(node.corequisite, completed | needed | added, frozenset({node.code}), planned)
+            extra -= needed | added
+            added |= extra
+            pending.extend(sorted(extra))
+        return added
+
+    def chosen_prerequisites(self, code: str, available: set[str], completed=()) -> set[str]:
+        """The prerequisites of `code` it will be taken with, drawn from `available` where possible."""
+        node = self.courses.get(code)
+        if node is None or node.prerequisite is None:
+            return set()
+        chosen = self._choose(node.prerequisite, set(completed), frozenset({code}), frozenset(available))
+        return chosen & available
+
+    def study_order(self, targets: list[str], completed=()) -> tuple[list[list[str]], list[str]]:
+        """Group the targets and their required prerequisites into successive layers.
+
+        Every course in a layer has its chosen prerequisites in earlier layers
+        (or already completed), so a layer can be taken in one term.
+
+        Returns:
+            (layers, unresolved) where unresolved lists courses caught in a prerequisite cycle
+        """
+        completed = set(completed)
+        needed = self.plan_courses(targets, completed)
+        depends = {code: self.chosen_prerequisites(code, needed, completed) for code in needed}
+
+        layers, done = [], set()
+        remaining = set(needed)
+        while remaining:
+            layer = sorted(c for c in remaining if depends[c] <= done)
+            if not layer:
+                break
+            layers.append(layer)
+            done |= set(layer)
+            remaining -= set(layer)
+        return layers, sorted(remaining)
+
+    def unlocks(self, code: str, completed=()) -> tuple[list[str], list[str]]:
+        """Courses whose prerequisites mention `code`.
+
+        Returns:
+            (unlocked, partial): courses whose prerequisites become satisfied by
+            adding `code` to the completed courses, and those still missing something
+        """
+        completed = set(completed)
+        after = completed | {code}
+        unlocked, partial = [], []
+        for other, node in sorted(self.courses.items()):
+            if other == code or code not in requirement_codes(node.prerequisite):
+                continue
+            if is_satisfied(node.prerequisite, after) and not is_satisfied(node.prerequisite, completed):
+                unlocked.append(other)
+            elif not is_satisfied(node.prerequisite, after):
+                partial.append(other)
+        return unlocked, partial
+
+
+# Graph of the handbook index - built lazily on first use
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_prerequisite_graph() -> PrerequisiteGraph:
+    """Get the graph of every course page in the handbook index (empty without an index)."""
+    global _graph
+    with _graph_lock:
+        if _graph is None:
+            graph = PrerequisiteGraph()
+            index = get_handbook_index()
+            if index is not None:
+                for page in index.pages(kind="course"):
+                    graph.add_page(page.title, page.content, code=page.code)
+            _graph = graph
+        return _graph
+
+
+def graph_with_files(files: dict[str, str]) -> PrerequisiteGraph:
+    """The handbook graph plus the course pages fetched into the agent's files."""
+    graph = get_prerequisite_graph().copy()
+    for content in files.values():
+        head = content[:400]
+        # parallel_course_details records the code it searched for; other files name it in the title
+        match = _COURSE_CODE_LINE_RE.search(head) or COURSE_CODE_RE.search(head)
+        if match:
+            graph.add_page(content.split("\n", 1)[0], content, code=f"{match.group(1).upper()}{match.group(2)}")
+    return graph
@@ -0,0 +1,201 @@
+"""Per-turn CPU and memory profiling.
+
+`TurnProfiler.profile_turn()` wraps one advisor turn and writes, per turn:
+- `<name>.folded`: sampled stacks of every thread in folded format
+  ("frame;frame;frame count"), loadable by flamegraph.pl, speedscope or
+  inferno. Sampling covers the executor threads that run tools, which
+  cProfile alone would miss.
+- `<name>.prof`: a cProfile dump of the calling thread (open with pstats or snakeviz).
+- `<name>.txt`: a top-N summary of hot functions (overall and in the focus
+  files: research tools, file tools and the state reducers) and of the
+  allocations that grew during the turn (tracemalloc).
+
+Used by `--profile` in the CLI; the same context manager can wrap any call.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+# Modules whose hot paths are reported separately
+FOCUS_FILES = ("src/research_tools.py", "src/tavilys.py", "src/file_tools.py", "src/state.py")
+
+# Leaf frames of threads that are waiting rather than working
+_IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get"),
+    ("base_events.py", "_run_once"),
+    ("selector_events.py", "_read_from_self"),
+}
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(_REPO_ROOT):
+        return os.path.relpath(filename, _REPO_ROOT)
+    return os.path.basename(filename)
+
+
+class StackSampler:
+    """Background thread sampling the Python stacks of all other threads."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(frames))] += 1
+                self.samples += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        """Stacks in folded format, one "stack count" line each."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def hot_functions(self, top_n: int, focus: tuple[str, ...] = ()) -> tuple[list, list]:
+        """Return ([(frame, self samples)], [(frame, inclusive samples)]) sorted by samples."""
+        self_counts: Counter = Counter()
+        inclusive: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            self_counts[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+        if focus:
+            self_counts = Counter({f: c for f, c in self_counts.items() if any(p in f for p in focus)})
+            inclusive = Counter({f: c for f, c in inclusive.items() if any(p in f for p in focus)})
+        return self_counts.most_common(top_n), inclusive.most_common(top_n)
+
+
+class TurnProfiler:
+    """Capture CPU profiles and memory snapshots per advisor turn."""
+
+    def __init__(
+        self,
+        output_dir: str = "profiles",
+        sample_interval: float = 0.005,
+        top_n: int = 20,
+        focus_files: tuple[str, ...] = FOCUS_FILES,
+        trace_memory: bool = True,
+    ):
+        """Create a profiler.
+
+        Args:
+            output_dir: Directory receiving the per-turn profile files
+            sample_interval: Seconds between stack samples
+            top_n: Rows per table in the summary
+            focus_files: Repository paths whose functions get their own tables
+            trace_memory: Also record tracemalloc snapshots (slower)
+        """
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.top_n = top_n
+        self.focus_files = focus_files
+        self.trace_memory = trace_memory
+        self.turns = 0
+        os.makedirs(output_dir, exist_ok=True)
+
+    @contextmanager
+    def profile_turn(self, label: str = "turn"):
+        """Profile the enclosed block; yields a dict that receives the output paths."""
+        self.turns += 1
+        name = f"{label}-{self.turns:03d}-{time.strftime('%Y%m%d-%H%M%S')}"
+        base = os.path.join(self.output_dir, name)
+        result = {"folded": f"{base}.folded", "cprofile": f"{base}.prof", "summary": f"{base}.txt"}
+
+        started_tracemalloc = False
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            started_tracemalloc = True
+        before = tracemalloc.take_snapshot() if self.trace_memory else None
+
+        sampler = StackSampler(self.sample_interval)
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        sampler.start()
+        profile.enable()
+        try:
+            yield result
+        finally:
+            profile.disable()
+            sampler.stop()
+            elapsed = time.perf_counter() - start
+            after = tracemalloc.take_snapshot() if self.trace_memory else None
+            if started_tracemalloc:
+                tracemalloc.stop()
+
+            with open(result["folded"], "w", encoding="utf-8") as f:
+                f.write(sampler.folded())
+            profile.dump_stats(result["cprofile"])
+            with open(result["summary"], "w", encoding="utf-8") as f:
+                f.write(self._summary(name, elapsed, sampler, profile, before, after))
+
+    def _summary(self, name, elapsed, sampler, profile, before, after) -> str:
+        out = io.StringIO()
+        out.write(f"Profile {name}: {elapsed:.2f}s wall, {sampler.samples} busy-thread samples "
+                  f"every {self.sample_interval * 1000:.0f}ms\n")
+
+        def _table(title, rows, unit="samples"):
+            out.write(f"\n== {title} ==\n")
+            if not rows:
+                out.write("  (none)\n")
+            for frame, count in rows:
+                out.write(f"  {count:>7} {unit}  {count * self.sample_interval * 1000:>8.0f}ms  {frame}\n")
+
+        self_rows, inclusive_rows = sampler.hot_functions(self.top_n)
+        _table("Hot functions, self time (all threads)", self_rows)
+        _table("Hot functions, inclusive time (all threads)", inclusive_rows)
+        focus_self, focus_inclusive = sampler.hot_functions(self.top_n, focus=self.focus_files)
+        _table(f"Focus files, self time ({', '.join(self.focus_files)})", focus_self)
+        _table("Focus files, inclusive time", focus_inclusive)
+
+        out.write("\n== cProfile, calling thread, by cumulative time ==\n")
+        stats = pstats.Stats(profile, stream=out)
+        stats.sort_stats("cumulative").print_stats(self.top_n)
+
+        if before is not None and after is not None:
+            diff = after.compare_to(before, "lineno")
+            out.write("\n== Memory growth during the turn (tracemalloc, by line) ==\n")
+            for stat in diff[: self.top_n]:
+                out.write(f"  {stat}\n")
+            focus_filters = [tracemalloc.Filter(True, f"*{path}") for path in self.focus_files]
+            focus_diff = after.filter_traces(focus_filters).compare_to(before.filter_traces(focus_filters), "lineno")
+            out.write("\n== Memory growth in focus files ==\n")
+            for stat in focus_diff[: self.top_n] or ["(none)"]:
+                out.write(f"  {stat}\n")
+            current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+            if peak:
+                out.write(f"\nTraced memory: {current / 1e6:.1f} MB current, {peak / 1e6:.1f} MB peak\n")
+        return out.getvalue()
@@ -0,0 +1,108 @@
+"""Stable prompt prefixes for provider-side prefix caching.
+
+Providers cache the KV state of a prompt prefix and bill / serve a repeated
+prefix cheaper and faster, but only when it is byte-identical. Every model call
+here therefore sends its static part first (tool schemas and system messages)
+and the variable part (date, task, page content) last.
+
+`PrefixStabilityMonitor` checks that this holds at runtime: for each caller
+(graph path plus run name) and tool set it hashes the static prefix of every
+model call and logs a warning when a caller's system prompt changes between
+calls, which means something variable has leaked into it.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import Counter, defaultdict
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage, SystemMessage
+
+logger = logging.getLogger(__name__)
+
+
+def static_prefix(messages: list[BaseMessage]) -> str:
+    """Text of the leading system messages of a prompt."""
+    parts = []
+    for message in messages:
+        if not isinstance(message, SystemMessage):
+            break
+        parts.append(message.content if isinstance(message.content, str) else json.dumps(message.content))
+    return "\n".join(parts)
+
+
+def prefix_hash(messages: list[BaseMessage], tools: list | None = None) -> str:
+    """Short hash of a prompt's static prefix (tool schemas plus leading system messages)."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(tools or [], sort_keys=True, default=str).encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(static_prefix(messages).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _caller(metadata: dict | None, run_name: str | None) -> str:
+    """Caller key without per-run ids, e.g. "agent|tools|course-planner|agent/ChatQwen"."""
+    namespace = (metadata or {}).get("langgraph_checkpoint_ns", "")
+    path = "|".join(part.split(":")[0] for part in namespace.split("|") if part)
+    return f"{path or 'root'}/{run_name or 'model'}"
+
+
+class PrefixStabilityMonitor(BaseCallbackHandler):
+    """Record static prefix hashes per caller and warn when a system prompt drifts."""
+
+    run_inline = True
+
+    def __init__(self):
+        # caller -> tools hash -> Counter of system prompt hashes
+        self.prefixes: dict[str, dict[str, Counter]] = defaultdict(lambda: defaultdict(Counter))
+        self.drifts = 0
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        caller = _caller(metadata, kwargs.get("name"))
+        tools = (kwargs.get("invocation_params") or {}).get("tools")
+        tools_hash = prefix_hash([], tools)
+        for batch in messages:
+            system_hash = prefix_hash(batch)
+            with self._lock:
+                seen = self.prefixes[caller][tools_hash]
+                drifted = bool(seen) and system_hash not in seen
+                seen[system_hash] += 1
+                self.drifts += drifted
+            if drifted:
+                logger.warning(
+                    "Static prompt prefix of %s changed (%d variants); provider prefix caching will miss",
+                    caller,
+                    len(seen),
+                )
+
+    def report(self) -> dict:
+        """Per caller: calls, tool-set variants and system-prompt variants (1 means stable)."""
+        with self._lock:
+            return {
+                caller: {
+                    "calls": sum(sum(c.values()) for c in by_tools.values()),
+                    "tool_sets": len(by_tools),
+                    "system_prompt_variants": max(len(c) for c in by_tools.values()),
+                }
+                for caller, by_tools in self.prefixes.items()
+            }
+
+
+# Shared monitor instance - initialize lazily on first use
+_monitor = None
+
+
+def get_prefix_monitor() -> PrefixStabilityMonitor:
+    """Get the process-wide prefix stability monitor."""
+    global _monitor
+    if _monitor is None:
+        _monitor = PrefixStabilityMonitor()
+    return _monitor
+
+
+def prefix_callbacks() -> list:
+    """Callbacks checking prompt prefix stability across requests."""
+    return [get_prefix_monitor()]
@@ -18,9 +18,19 @@ from pydantic import BaseModel, Field
 from tavily import TavilyClient
 from typing_extensions import Annotated, Literal
 
+from src.handbook import answers_query, lookup_course
+from src.prefetch import prefetched
 from src.prompts import SUMMARIZE_WEB_SEARCH
 from src.state import DeepAgentState
-from langchain_qwq import ChatQwen
+# Search, page fetch and summarization share one cached pipeline with src.tavilys
+from src.tavilys import (
+    Summary,
+    get_today_str,
+    process_search_results,
+    request_difficulty,
+    run_tavily_search,
+    summarize_webpage_content,
+)
 import asyncio
 import langchain
 
@@ -30,126 +40,6 @@ if not hasattr(langchain, 'debug'):
     langchain.debug = False
 if not hasattr(langchain, 'llm_cache'):
     langchain.llm_cache = False
-# Summarization model 
-summarization_model = ChatQwen(
-        model="qwen-flash", 
-        temperature=0.1
-    )
-tavily_client = TavilyClient()
-
-class Summary(BaseModel):
-    """Schema for webpage content summarization."""
-    filename: str = Field(description="Name of the file to store.")
-    summary: str = Field(description="Key learnings from the webpage.")
-
-def get_today_str() -> str:
-    """Get current date in a human-readable format."""
-    return datetime.now().strftime("%a %b %-d, %Y")
-
-def run_tavily_search(
-    search_query: str, 
-    max_results: int = 1, 
-    include_raw_content: bool = True, 
-    topic: str = "general"
-) -> dict:
-    """Perform search using Tavily API for a single query.
-
-    Args:
-        search_query: Search query to execute
-        max_results: Maximum number of results per query
-        topic: Topic filter for search results
-        include_raw_content: Whether to include raw webpage content
-
-    Returns:
-        Search results dictionary
-    """
-    result = tavily_client.search(
-        search_query,
-        max_results=max_results,
-        include_raw_content=include_raw_content,
-        topic=topic
-    )
-
-    return result
-
-def summarize_webpage_content(webpage_content: str) -> Summary:
-    """Summarize webpage content using the configured summarization model.
-
-    Args:
-        webpage_content: Raw webpage content to summarize
-
-    Returns:
-        Summary object with filename and summary
-    """
-    try:
-        # Set up structured output model for summarization
-        structured_model = summarization_model.with_structured_output(Summary)
-
-        # Generate summary
-        summary_and_filename = structured_model.invoke([
-            HumanMessage(content=SUMMARIZE_WEB_SEARCH.format(
-                webpage_content=webpage_content, 
-                date=get_today_str()
-            ))
-        ])
-
-        return summary_and_filename
-
-    except Exception:
-        # Return a basic summary object on failure
-        return Summary(
-            filename="search_result.md",
-            summary=webpage_content[:1000] + "..." if len(webpage_content) > 1000 else webpage_content
-        )
-
-def process_search_results(results: dict) -> list[dict]:
-    """Process search results by summarizing content where available.
-
-    Args:
-        results: Tavily search results dictionary
-
-    Returns:
-        List of processed results with summaries
-    """
-    processed_results = []
-
-    # Create a client for HTTP requests
-    HTTPX_CLIENT = httpx.Client()
-
-    for result in results.get('results', []):
-
-        # Get url 
-        url = result['url']
-
-        # Read url
-        response = HTTPX_CLIENT.get(url)
-
-        if response.status_code == 200:
-            # Convert HTML to markdown
-            raw_content = markdownify(response.text)
-            summary_obj = summarize_webpage_content(raw_content)
-        else:
-            # Use Tavily's generated summary
-            raw_content = result.get('raw_content', '')
-            summary_obj = Summary(
-                filename="URL_error.md",
-                summary=result.get('content', 'Error reading URL; try another search.')
-            )
-
-        # uniquify file names
-        uid = base64.urlsafe_b64encode(uuid.uuid4().bytes).rstrip(b"=").decode("ascii")[:8]
-        name, ext = os.path.splitext(summary_obj.filename)
-        summary_obj.filename = f"{name}_{uid}{ext}"
-
-        processed_results.append({
-            'url': result['url'],
-            'title': result['title'],
-            'summary': summary_obj.summary,
-            'filename': summary_obj.filename,
-            'raw_content': raw_content,
-        })
-
-    return processed_results
 
 @tool(parse_docstring=True)
 def tavily_search(
@@ -183,10 +73,10 @@ def tavily_search(
     ) 
 
     # Process and summarize results
-    processed_results = process_search_results(search_results)
+    processed_results = process_search_results(search_results, request_difficulty(state))
 
     # Save each result to a file and prepare summary
-    files = state.get("files", {})
+    files = {}
     saved_files = []
     summaries = []
 
@@ -267,13 +157,13 @@ def parallel_tavily_search(
     # Execute all queries concurrently
     results_per_query = asyncio.run(_run_all(queries)) if queries else []
 
-    files = state.get("files", {})
+    files = {}
     saved_files_all: list[str] = []
     summaries_all: list[str] = []
 
     # Process each query's results independently
     for q, raw_results in zip(queries, results_per_query):
-        processed = process_search_results(raw_results)
+        processed = process_search_results(raw_results, request_difficulty(state))
         for item in processed:
             filename = item['filename']
             file_content = f"""# Search Result: {item['title']}
@@ -334,12 +224,12 @@ def parallel_unsw_programs(
 
     results = asyncio.run(_run_all(queries)) if queries else []
 
-    files = state.get("files", {})
+    files = {}
     saved_files: list[str] = []
     summaries: list[str] = []
 
     for q, raw in results:
-        processed = process_search_results(raw)
+        processed = process_search_results(raw, request_difficulty(state))
         for item in processed:
             filename = item['filename']
             content = f"""# Search Result: {item['title']}
@@ -396,12 +286,12 @@ def parallel_career_opportunities(
 
     results = asyncio.run(_run_all(topics)) if topics else []
 
-    files = state.get("files", {})
+    files = {}
     saved_files: list[str] = []
     summaries: list[str] = []
 
     for topic, raw in results:
-        processed = process_search_results(raw)
+        processed = process_search_results(raw, request_difficulty(state))
         for item in processed:
             filename = item['filename']
             content = f"""# Career Search Result: {item['title']}
@@ -459,12 +349,12 @@ def parallel_international_info(
 
     results = asyncio.run(_run_all(aspects)) if aspects else []
 
-    files = state.get("files", {})
+    files = {}
     saved_files: list[str] = []
     summaries: list[str] = []
 
     for aspect, raw in results:
-        processed = process_search_results(raw)
+        processed = process_search_results(raw, request_difficulty(state))
         for item in processed:
             filename = item['filename']
             content = f"""# International Info Result: {item['title']}
@@ -514,6 +404,12 @@ def parallel_course_details(
         Command that saves per-course findings to files and returns a compact summary.
     """
 
+    # Prefetched courses and those in the local handbook index skip the web search entirely,
+    # unless the query asks for something their page does not cover
+    indexed = {code: prefetched(code) or lookup_course(code) for code in course_codes}
+    indexed = {code: results if results and answers_query(results, base_query) else [] for code, results in indexed.items()}
+    web_codes = [code for code in course_codes if not indexed[code]]
+
     async def _run_one(code: str):
         q = f"{code} {base_query}"
         return code, await asyncio.to_thread(
@@ -527,14 +423,14 @@ def parallel_course_details(
         tasks = [asyncio.create_task(_run_one(c)) for c in codes]
         return await asyncio.gather(*tasks, return_exceptions=False)
 
-    results = asyncio.run(_run_all(course_codes)) if course_codes else []
+    web_results = dict(asyncio.run(_run_all(web_codes))) if web_codes else {}
 
-    files = state.get("files", {})
+    files = {}
     saved_files_all: list[str] = []
     summaries_all: list[str] = []
 
-    for code, raw_results in results:
-        processed = process_search_results(raw_results)
+    for code in course_codes:
+        processed = indexed[code] or process_search_results(web_results[code], request_difficulty(state))
         for item in processed:
             filename = item['filename']
             file_content = f"""# Search Result: {item['title']}
@@ -0,0 +1,204 @@
+"""Near-duplicate response cache placed in front of the advisor graph.
+
+Students often ask the same question in different words ("COMP9021 prerequisites"
+vs "prereqs for COMP9021?"). This cache normalizes queries, detects near-duplicates
+locally with MinHash over shingles, and returns the stored final answer and files
+while they are still fresh, skipping the full classify → TODO → search loop.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+
+from src.fingerprint import MinHash, MinHashLSH, canonical_key, code_key, normalize_query, shingles
+
+
+@dataclass
+class CachedResponse:
+    """A stored final answer together with the files produced for it."""
+
+    query: str
+    answer: str
+    files: dict[str, str]
+    created_at: float
+    signature: tuple[int, ...] = field(repr=False)
+    codes: tuple[str, ...] = ()
+    hits: int = 0
+
+
+@dataclass
+class CacheHit:
+    """Result of a successful cache lookup."""
+
+    answer: str
+    files: dict[str, str]
+    matched_query: str
+    similarity: float
+    age_seconds: float
+    exact: bool
+
+
+class ResponseCache:
+    """Thread-safe near-duplicate cache of final advisor answers.
+
+    Entries are matched first by an exact canonical key and then by MinHash
+    similarity. Queries that mention different course or program codes never
+    match each other, however similar the rest of the wording is, and neither
+    do queries naming the same codes in a different order around "before" or
+    "after".
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 6 * 60 * 60,
+        similarity_threshold: float = 0.75,
+        max_entries: int = 2000,
+        num_perm: int = 64,
+        bands: int = 16,
+    ):
+        """Create a response cache.
+
+        Args:
+            ttl_seconds: Freshness window; older entries are never served (default: 6h)
+            similarity_threshold: Minimum estimated Jaccard similarity for a near-duplicate hit
+            max_entries: Maximum stored answers before the oldest are evicted
+            num_perm: MinHash signature length
+            bands: Number of LSH bands (must divide num_perm)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self._minhash = MinHash(num_perm=num_perm)
+        self._lsh = MinHashLSH(num_perm=num_perm, bands=bands)
+        self._entries: dict[str, CachedResponse] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "lookups": 0,
+            "exact_hits": 0,
+            "near_hits": 0,
+            "misses": 0,
+            "stale_rejections": 0,
+            "evictions": 0,
+            "stores": 0,
+        }
+        self._served_age_total = 0.0
+        self._served_age_max = 0.0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._lsh.remove(key, entry.signature)
+
+    def lookup(self, query: str) -> CacheHit | None:
+        """Find a fresh cached answer for the query or a near-duplicate of it.
+
+        Args:
+            query: Raw user question
+
+        Returns:
+            CacheHit if a fresh matching answer exists, otherwise None
+        """
+        key = canonical_key(query)
+        codes = code_key(query)
+        now = time.time()
+
+        with self._lock:
+            self._stats["lookups"] += 1
+            if not key:
+                self._stats["misses"] += 1
+                return None
+
+            candidates: list[tuple[float, str]] = []
+            if key in self._entries:
+                candidates.append((1.0, key))
+            else:
+                signature = self._minhash.signature(shingles(normalize_query(query)))
+                for other in self._lsh.query(signature):
+                    entry = self._entries[other]
+                    if entry.codes != codes:
+                        continue
+                    similarity = MinHash.similarity(signature, entry.signature)
+                    if similarity >= self.similarity_threshold:
+                        candidates.append((similarity, other))
+
+            for similarity, other in sorted(candidates, reverse=True):
+                entry = self._entries[other]
+                age = now - entry.created_at
+                if age > self.ttl_seconds:
+                    # Expired entries are dropped rather than served
+                    self._stats["stale_rejections"] += 1
+                    self._remove(other)
+                    continue
+
+                exact = other == key
+                self._stats["exact_hits" if exact else "near_hits"] += 1
+                self._served_age_total += age
+                self._served_age_max = max(self._served_age_max, age)
+                entry.hits += 1
+                return CacheHit(
+                    answer=entry.answer,
+                    files=dict(entry.files),
+                    matched_query=entry.query,
+                    similarity=similarity,
+                    age_seconds=age,
+                    exact=exact,
+                )
+
+            self._stats["misses"] += 1
+            return None
+
+    def store(self, query: str, answer: str, files: dict[str, str] | None = None) -> None:
+        """Store the final answer for a query.
+
+        Args:
+            query: Raw user question
+            answer: Final assistant answer
+            files: Virtual files produced while answering
+        """
+        key = canonical_key(query)
+        if not key or not answer:
+            return
+
+        entry = CachedResponse(
+            query=query,
+            answer=answer,
+            files=dict(files or {}),
+            created_at=time.time(),
+            signature=self._minhash.signature(shingles(normalize_query(query))),
+            codes=code_key(query),
+        )
+        with self._lock:
+            self._remove(key)
+            while len(self._entries) >= self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k].created_at)
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+            self._entries[key] = entry
+            self._lsh.insert(key, entry.signature)
+            self._stats["stores"] += 1
+
+    def invalidate(self, query: str | None = None) -> None:
+        """Drop one query's cached answer, or everything when query is None."""
+        with self._lock:
+            if query is None:
+                for key in list(self._entries):
+                    self._remove(key)
+            else:
+                self._remove(canonical_key(query))
+
+    def metrics(self) -> dict:
+        """Return hit-rate and staleness metrics.
+
+        Returns:
+            Dict with lookup counters, hit_rate, entry count and the
+            average/maximum age (seconds) of answers served from cache
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            hits = stats["exact_hits"] + stats["near_hits"]
+            stats["hits"] = hits
+            stats["hit_rate"] = hits / stats["lookups"] if stats["lookups"] else 0.0
+            stats["entries"] = len(self._entries)
+            stats["avg_served_age_seconds"] = self._served_age_total / hits if hits else 0.0
+            stats["max_served_age_seconds"] = self._served_age_max
+            return stats
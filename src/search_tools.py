@@ -4,6 +4,9 @@ import os
 from langgraph.types import Command
 from dotenv import load_dotenv
 from src.tavilys import *
+from src.fingerprint import extract_codes
+from src.handbook import answers_query, lookup_course, lookup_programs
+from src.prefetch import prefetched
 
 load_dotenv()
 
@@ -47,18 +50,24 @@ def search_unsw_programs(query: str,
     tool_call_id: Annotated[str, InjectedToolCallId],
     max_results: Annotated[int, InjectedToolArg] = 1) -> Command:
     """Search UNSW programs and course information."""
-    search_results = run_tavily_search(
-        query,
-        max_results=max_results,
-        include_raw_content=True,
-        topic="general"
-    ) 
-
-    # Process and summarize results
-    processed_results = process_search_results(search_results)
+    # Programs prefetched at request entry, then the local handbook index, answer without a web search
+    program_codes = [code for code in extract_codes(query) if code.isdigit()][:max_results]
+    processed_results = [result for code in program_codes for result in prefetched(code) or []]
+    if not processed_results:
+        processed_results = lookup_programs(query, limit=max_results)
+    if not processed_results:
+        search_results = run_tavily_search(
+            query,
+            max_results=max_results,
+            include_raw_content=True,
+            topic="general"
+        ) 
+
+        # Process and summarize results
+        processed_results = process_search_results(search_results, request_difficulty(state))
     
     # Save each result to a file and prepare summary
-    files = state.get("files", {})
+    files = {}
     saved_files = []
     
     for i, result in enumerate(processed_results):
@@ -89,18 +98,24 @@ def search_course_details(query: str, course_code: str,
     tool_call_id: Annotated[str, InjectedToolCallId],
     max_results: Annotated[int, InjectedToolArg] = 1) -> Command:
     """Search a specific course's detailed information."""
-    search_results = run_tavily_search(
-        query,
-        max_results=max_results,
-        include_raw_content=True,
-        topic="general"
-    ) 
-
-    # Process and summarize results
-    processed_results = process_search_results(search_results)
+    # A prefetch started at request entry, then the local handbook index, answer without a web search
+    # when the query asks for the overview or the page covers it (not, say, a course's fees)
+    processed_results = prefetched(course_code) or lookup_course(course_code)
+    if processed_results and not answers_query(processed_results, query):
+        processed_results = []
+    if not processed_results:
+        search_results = run_tavily_search(
+            query,
+            max_results=max_results,
+            include_raw_content=True,
+            topic="general"
+        ) 
+
+        # Process and summarize results
+        processed_results = process_search_results(search_results, request_difficulty(state))
     
     # Save each result to a file and prepare summary
-    files = state.get("files", {})
+    files = {}
     saved_files = []
 
     for i, result in enumerate(processed_results):
@@ -139,10 +154,10 @@ def search_career_opportunities(query: str,
         topic="general"
     ) 
     
-    processed_results = process_search_results(search_results)
+    processed_results = process_search_results(search_results, request_difficulty(state))
     
     # Save each result to a file and prepare summary
-    files = state.get("files", {})
+    files = {}
     saved_files = []
 
     for i, result in enumerate(processed_results):
@@ -180,10 +195,10 @@ def search_international_student_info(query: str,
         topic="general"
     ) 
     
-    processed_results = process_search_results(search_results)
+    processed_results = process_search_results(search_results, request_difficulty(state))
     
     # Save each result to a file and prepare summary
-    files = state.get("files", {})
+    files = {}
     saved_files = []
 
     for i, result in enumerate(processed_results):
@@ -0,0 +1,271 @@
+"""Multi-session HTTP server streaming advisor answers over Server-Sent Events.
+
+The advisor graph is built once and shared by every session on one event loop.
+Each session is a LangGraph thread (conversation memory lives in the
+checkpointer), and admission control keeps the process responsive under load:
+- At most `max_concurrent_runs` turns execute at once; further turns wait in a
+  bounded queue and are told their queue position.
+- When the queue is full the request is rejected with 503 and Retry-After.
+- A session may only run `max_runs_per_session` turns at a time (429 otherwise).
+
+Endpoints:
+- POST /chat  {"session_id": "...", "message": "..."} -> text/event-stream
+- GET  /health                                        -> JSON load metrics
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+
+from aiohttp import web
+from langchain_core.messages import HumanMessage
+
+from src.cache import get_cache, get_refresher
+from src.host_health import get_host_monitor
+from src.page_dedup import get_fingerprint_store
+from src.prefetch import get_prefetcher
+from src.tracing import tracing_callbacks
+from src.usage import get_usage_ledger, usage_callbacks
+from src.prompt_prefix import get_prefix_monitor, prefix_callbacks
+from src.utils import TurnTimings, iter_agent_events
+
+logger = logging.getLogger(__name__)
+
+AGENT_KEY = web.AppKey("agent", object)
+SERVER_KEY = web.AppKey("advisor_server", object)
+
+
+class AdmissionError(Exception):
+    """Raised when a turn cannot be admitted; carries the HTTP status to return."""
+
+    def __init__(self, status: int, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+@dataclass
+class Ticket:
+    """An admitted turn; `queued` stays True until it leaves the wait queue."""
+
+    session_id: str
+    queued: bool = True
+
+
+class AdvisorServer:
+    """Admission control and SSE streaming around one compiled advisor graph."""
+
+    def __init__(
+        self,
+        agent,
+        max_concurrent_runs: int = 8,
+        max_queue: int = 32,
+        max_runs_per_session: int = 1,
+        queue_timeout: float = 60.0,
+        recursion_limit: int = 100,
+    ):
+        """Create the server state.
+
+        Args:
+            agent: Compiled advisor graph (compiled with a checkpointer for multi-turn sessions)
+            max_concurrent_runs: Turns allowed to execute at the same time
+            max_queue: Turns allowed to wait for a slot before new ones are rejected
+            max_runs_per_session: Concurrent turns allowed per session
+            queue_timeout: Seconds a queued turn waits for a slot before giving up
+            recursion_limit: Graph recursion limit per turn
+        """
+        self.agent = agent
+        self.max_concurrent_runs = max_concurrent_runs
+        self.max_queue = max_queue
+        self.max_runs_per_session = max_runs_per_session
+        self.queue_timeout = queue_timeout
+        self.recursion_limit = recursion_limit
+        self._slots = asyncio.Semaphore(max_concurrent_runs)
+        self._waiting = 0
+        self._running = 0
+        self._session_runs: Counter = Counter()
+        self._avg_turn_seconds = 10.0
+        self.stats = Counter()
+
+    def retry_after(self) -> float:
+        """Rough seconds until a queue slot frees up, for the Retry-After header."""
+        return max(1.0, self._avg_turn_seconds * (self._waiting + 1) / self.max_concurrent_runs)
+
+    def admit(self, session_id: str) -> Ticket:
+        """Reserve a place for a turn or raise AdmissionError (no awaiting here)."""
+        if self._session_runs[session_id] >= self.max_runs_per_session:
+            self.stats["rejected_session_limit"] += 1
+            raise AdmissionError(429, "This session already has a question in progress.", retry_after=1.0)
+        # Admitted turns that have not started yet count as queued
+        if self._running + self._waiting >= self.max_concurrent_runs + self.max_queue:
+            self.stats["rejected_overload"] += 1
+            raise AdmissionError(503, "The advisor is busy, please retry shortly.", retry_after=self.retry_after())
+        self._session_runs[session_id] += 1
+        self._waiting += 1
+        return Ticket(session_id)
+
+    def _leave_queue(self, ticket: Ticket) -> None:
+        if ticket.queued:
+            ticket.queued = False
+            self._waiting -= 1
+
+    def release(self, ticket: Ticket) -> None:
+        """Return a ticket's reservations, whether or not its turn ever ran."""
+        self._leave_queue(ticket)
+        self._session_runs[ticket.session_id] -= 1
+        if self._session_runs[ticket.session_id] <= 0:
+            del self._session_runs[ticket.session_id]
+
+    async def run_turn(self, ticket: Ticket, message: str):
+        """Yield SSE events for one admitted turn; waits for an execution slot first.
+
+        Yields:
+            (event name, JSON-serializable payload) pairs
+        """
+        session_id = ticket.session_id
+        if self._slots.locked():
+            yield "queued", {"position": self._waiting}
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._leave_queue(ticket)
+            self.stats["queue_timeouts"] += 1
+            yield "error", {"status": 503, "message": "Timed out waiting for a free slot."}
+            return
+        self._leave_queue(ticket)
+        self._running += 1
+
+        timings = TurnTimings()
+        request_id = uuid.uuid4().hex
+        config = {
+            "recursion_limit": self.recursion_limit,
+            "configurable": {"thread_id": session_id},
+            "callbacks": [*tracing_callbacks(), *usage_callbacks(request_id), *prefix_callbacks()],
+        }
+        try:
+            final_state = None
+            async for event in iter_agent_events(
+                self.agent, {"messages": [HumanMessage(content=message)]}, config=config, timings=timings
+            ):
+                if event["type"] == "final":
+                    final_state = event["state"] or {}
+                else:
+                    yield event["type"], {k: v for k, v in event.items() if k != "type"}
+
+            answer = final_state["messages"][-1].content if final_state.get("messages") else ""
+            self.stats["completed"] += 1
+            self._avg_turn_seconds = 0.8 * self._avg_turn_seconds + 0.2 * timings.total
+            yield "done", {
+                "answer": answer,
+                "timings": timings.as_dict(),
+                "budget_usage": final_state.get("budget_usage"),
+                "token_usage": get_usage_ledger().report(request_id),
+            }
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.exception("Turn failed for session %s", session_id)
+            yield "error", {"status": 500, "message": str(e)}
+        finally:
+            get_usage_ledger().finish(request_id)
+            self._running -= 1
+            self._slots.release()
+
+    def metrics(self) -> dict:
+        return {
+            "running": self._running,
+            "waiting": self._waiting,
+            "active_sessions": len(self._session_runs),
+            "max_concurrent_runs": self.max_concurrent_runs,
+            "max_queue": self.max_queue,
+            "avg_turn_seconds": round(self._avg_turn_seconds, 3),
+            **self.stats,
+        }
+
+
+def _sse(event: str, data) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n".encode("utf-8")
+
+
+async def handle_chat(request: web.Request) -> web.StreamResponse:
+    """Stream one advisor turn as Server-Sent Events."""
+    server: AdvisorServer = request.app[SERVER_KEY]
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        return web.json_response({"error": "Request body must be JSON."}, status=400)
+    if not isinstance(body, dict):
+        return web.json_response({"error": "Request body must be a JSON object."}, status=400)
+    message = body.get("message")
+    if not isinstance(message, str) or not message.strip():
+        return web.json_response({"error": "'message' is required and must be a string."}, status=400)
+    message = message.strip()
+    session_id = body.get("session_id")
+    if session_id is not None and not isinstance(session_id, str):
+        return web.json_response({"error": "'session_id' must be a string."}, status=400)
+    session_id = session_id or uuid.uuid4().hex
+
+    try:
+        ticket = server.admit(session_id)
+    except AdmissionError as e:
+        headers = {"Retry-After": str(int(e.retry_after + 0.999))} if e.retry_after else None
+        return web.json_response({"error": str(e)}, status=e.status, headers=headers)
+
+    response = web.StreamResponse(
+        headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache", "X-Session-Id": session_id}
+    )
+    turn = server.run_turn(ticket, message)
+    try:
+        await response.prepare(request)
+        await response.write(_sse("session", {"session_id": session_id}))
+        async for event, data in turn:
+            await response.write(_sse(event, data))
+    except (ConnectionResetError, asyncio.CancelledError):
+        # Client went away: stop the turn and free its slot
+        server.stats["disconnected"] += 1
+        raise
+    finally:
+        await turn.aclose()
+        server.release(ticket)
+    await response.write_eof()
+    return response
+
+
+async def handle_health(request: web.Request) -> web.Response:
+    return web.json_response({
+        "status": "ok",
+        "pid": os.getpid(),
+        "time": time.time(),
+        **request.app[SERVER_KEY].metrics(),
+        "cache": dict(get_cache().stats),
+        "cache_refresh": dict(get_refresher().stats),
+        "hosts": get_host_monitor().report(),
+        "page_dedup": dict(get_fingerprint_store().stats),
+        "prefetch": dict(get_prefetcher().stats),
+        "token_usage": {k: v for k, v in get_usage_ledger().report().items() if k != "by_source"},
+        "prompt_prefixes": get_prefix_monitor().report(),
+    })
+
+
+def create_app(agent, **server_options) -> web.Application:
+    """Create the aiohttp application serving the given advisor graph.
+
+    Args:
+        agent: Compiled advisor graph
+        **server_options: Passed to AdvisorServer (max_concurrent_runs, max_queue, ...)
+    """
+    app = web.Application()
+    app[AGENT_KEY] = agent
+    app[SERVER_KEY] = AdvisorServer(agent, **server_options)
+    app.router.add_post("/chat", handle_chat)
+    app.router.add_get("/health", handle_health)
+    return app
+
+
+def run_server(agent, host: str = "127.0.0.1", port: int = 8000, quiet: bool = False, **server_options) -> None:
+    """Serve the advisor until interrupted (quiet suppresses the startup banner)."""
+    web.run_app(create_app(agent, **server_options), host=host, port=port, print=None if quiet else print)
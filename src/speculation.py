@@ -0,0 +1,193 @@
+"""Speculative pre-agent stage.
+
+The agent normally calls `classify_task_complexity`, waits for it, and only then
+plans and searches, adding a serial LLM round trip to every request. This stage
+runs before the agent and executes, concurrently:
+- the task classification, and
+- a speculative first search derived from the user's message: the course
+  details when it names course codes, otherwise the search tool of its topic
+  (programs, careers, international students) when the local classifier is
+  confident about it. Other messages (small talk, general questions) get no
+  speculative search.
+
+Before either starts, every course and program code in the message is handed
+to the background prefetcher (src.prefetch), so codes beyond the speculative
+search are usually loaded by the time the agent asks for them.
+
+Both results are injected into state as regular tool call / tool result
+messages, so the agent starts with them already available.
+"""
+
+import asyncio
+import contextvars
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.types import Command
+
+from src.budget import SPECULATIVE_ID_PREFIX
+from src.complexity_classifier import get_classifier
+from src.fingerprint import COURSE_CODE_RE, extract_codes, normalize_query
+from src.prefetch import COURSE_BASE_QUERY, YEAR_RANGE, prefetch_message
+from src.research_tools import parallel_course_details
+from src.search_tools import search_career_opportunities, search_international_student_info, search_unsw_programs
+from src.todo_tools import classify_task_complexity
+
+# Upper bound on course codes prefetched speculatively
+MAX_SPECULATIVE_CODES = 3
+
+# Search tool (and query template) speculated for each confidently predicted topic
+TOPIC_SEARCHES = {
+    "Program Info": (search_unsw_programs, "UNSW {message}"),
+    "Career Advice": (search_career_opportunities, "{message}"),
+    "International Support": (search_international_student_info, "UNSW {message}"),
+}
+# Degree names and the word "program" mark a program question the classifier is unsure about
+_PROGRAM_NAME_RE = re.compile(
+    r"\b(master|bachelor|doctor) of\b|\bgraduate (certificate|diploma)\b|\bprogram(me)?\b", re.IGNORECASE
+)
+SPECULATIVE_TOOLS = {
+    t.name: t for t in (parallel_course_details, *(search for search, _ in TOPIC_SEARCHES.values()))
+}
+
+
+def _latest_user_message(state: dict) -> str:
+    """Return the content of the most recent human message in state."""
+    for message in reversed(state.get("messages", [])):
+        if isinstance(message, HumanMessage):
+            return message.content if isinstance(message.content, str) else str(message.content)
+    return ""
+
+
+def plan_speculative_search(user_message: str) -> dict | None:
+    """Derive the speculative first search from the user's message.
+
+    Args:
+        user_message: Raw user question
+
+    Returns:
+        Tool call dict (name, args, id) to run speculatively, or None when the
+        message is not clearly about a course, program, career or
+        international-student topic
+    """
+    codes = extract_codes(user_message)
+    course_codes = [code for code in codes if COURSE_CODE_RE.fullmatch(code)]
+    program_codes = [code for code in codes if code.isdigit() and int(code) not in YEAR_RANGE]
+    call_id = f"{SPECULATIVE_ID_PREFIX}{uuid.uuid4().hex[:12]}"
+    if course_codes:
+        return {
+            "name": parallel_course_details.name,
+            "args": {"course_codes": course_codes[:MAX_SPECULATIVE_CODES], "base_query": COURSE_BASE_QUERY},
+            "id": call_id,
+            "type": "tool_call",
+        }
+    if len(normalize_query(user_message)) < 2:
+        return None
+    classifier = get_classifier()
+    task_type, confidence = classifier.predict_task_type(user_message)
+    if task_type not in TOPIC_SEARCHES or confidence < classifier.confidence_threshold:
+        # A program code or degree name makes a program search worthwhile whatever the wording
+        if not (program_codes or _PROGRAM_NAME_RE.search(user_message)):
+            return None
+        task_type = "Program Info"
+    search, template = TOPIC_SEARCHES[task_type]
+    return {
+        "name": search.name,
+        "args": {"query": template.format(message=user_message)},
+        "id": call_id,
+        "type": "tool_call",
+    }
+
+
+def _run_classification(user_message: str, config: RunnableConfig | None) -> dict:
+    try:
+        return classify_task_complexity.invoke({"user_request": user_message}, config=config)
+    except Exception:
+        # LLM fallback unavailable; the local prediction is still a usable label
+        return get_classifier().predict_local(user_message)[0]
+
+
+def _run_search(tool_call: dict, state: dict, config: RunnableConfig | None) -> Command | None:
+    tool_ = SPECULATIVE_TOOLS[tool_call["name"]]
+    try:
+        return tool_.invoke({**tool_call, "args": {**tool_call["args"], "state": state}}, config=config)
+    except Exception:
+        # Speculation is best-effort; the agent can still search on its own
+        return None
+
+
+def _build_update(
+    user_message: str, classification: dict, tool_call: dict | None, search: Command | None, started_at: float
+) -> dict:
+    """Turn speculative results into a state update with injected tool messages."""
+    classify_call = {
+        "name": classify_task_complexity.name,
+        "args": {"user_request": user_message},
+        "id": f"{SPECULATIVE_ID_PREFIX}{uuid.uuid4().hex[:12]}",
+        "type": "tool_call",
+    }
+    tool_calls = [classify_call]
+    results = [
+        ToolMessage(str(classification), name=classify_call["name"], tool_call_id=classify_call["id"]),
+    ]
+    files = {}
+    if tool_call is not None and isinstance(search, Command) and search.update:
+        tool_calls.append(tool_call)
+        files = search.update.get("files", {})
+        for message in search.update.get("messages", []):
+            results.append(ToolMessage(message.content, name=tool_call["name"], tool_call_id=tool_call["id"]))
+
+    update = {
+        "task_classification": classification,
+        "turn_started_at": started_at,
+        "messages": [AIMessage(content="", tool_calls=tool_calls), *results],
+    }
+    if files:
+        update["files"] = files
+    return update
+
+
+def speculate(state: dict, config: RunnableConfig | None = None) -> dict:
+    """Run classification and the speculative search concurrently (sync graphs)."""
+    started_at = time.time()
+    user_message = _latest_user_message(state)
+    if not user_message:
+        return {"turn_started_at": started_at}
+    prefetch_message(user_message)
+    tool_call = plan_speculative_search(user_message)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        # Copy the context so tracing spans opened in the workers nest under this node
+        classification_future = pool.submit(
+            contextvars.copy_context().run, _run_classification, user_message, config
+        )
+        search_future = (
+            pool.submit(contextvars.copy_context().run, _run_search, tool_call, state, config)
+            if tool_call else None
+        )
+        classification = classification_future.result()
+        search = search_future.result() if search_future else None
+    return _build_update(user_message, classification, tool_call, search, started_at)
+
+
+async def aspeculate(state: dict, config: RunnableConfig | None = None) -> dict:
+    """Run classification and the speculative search concurrently (async graphs)."""
+    started_at = time.time()
+    user_message = _latest_user_message(state)
+    if not user_message:
+        return {"turn_started_at": started_at}
+    prefetch_message(user_message)
+    tool_call = plan_speculative_search(user_message)
+    jobs = [asyncio.to_thread(_run_classification, user_message, config)]
+    if tool_call:
+        jobs.append(asyncio.to_thread(_run_search, tool_call, state, config))
+    results = await asyncio.gather(*jobs)
+    return _build_update(user_message, results[0], tool_call, results[1] if tool_call else None, started_at)
+
+
+def create_speculation_node() -> RunnableLambda:
+    """Create the pre-agent graph node (works with both invoke and astream)."""
+    return RunnableLambda(speculate, afunc=aspeculate, name="speculate")
@@ -6,6 +6,7 @@ This module defines the extended agent state structure that supports:
 - Efficient state merging with reducer functions
 """
 
+from collections.abc import Mapping
 from typing import Annotated, Literal, NotRequired
 from typing_extensions import TypedDict
 
@@ -24,11 +25,56 @@ class Todo(TypedDict):
     status: Literal["pending", "in_progress", "completed"]
 
 
+class ScopedFiles(Mapping):
+    """Copy-on-write view of the virtual file system for a sub-agent.
+
+    Reads resolve lazily against the local write layer first and then against
+    the parent's files, which are referenced rather than copied and never
+    modified. Writes only ever land in the local layer, so after the sub-agent
+    finishes `local` holds exactly its new or changed files.
+
+    Attributes:
+        parent: The parent's files (read-only)
+        local: Files written by the sub-agent
+    """
+
+    def __init__(self, parent: Mapping[str, str] | None = None, local: dict[str, str] | None = None):
+        self.parent = parent if parent is not None else {}
+        self.local = local if local is not None else {}
+
+    def __getitem__(self, key: str) -> str:
+        if key in self.local:
+            return self.local[key]
+        return self.parent[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self.local or key in self.parent
+
+    def __iter__(self):
+        yield from self.local
+        for key in self.parent:
+            if key not in self.local:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self.local) + sum(1 for key in self.parent if key not in self.local)
+
+    def with_writes(self, files: Mapping[str, str]) -> "ScopedFiles":
+        """Return a new view with files added to the local layer."""
+        return ScopedFiles(self.parent, {**self.local, **files})
+
+    def __repr__(self) -> str:
+        return f"ScopedFiles(local={list(self.local)}, parent={len(self.parent)} files)"
+
+
 def file_reducer(left, right):
     """Merge two file dictionaries, with right side taking precedence.
 
     Used as a reducer function for the files field in agent state,
-    allowing incremental updates to the virtual file system.
+    allowing incremental updates to the virtual file system. Tools return
+    only the files they created or changed. When the state holds a
+    ScopedFiles view (sub-agents), updates go to its write layer and the
+    parent's files are never copied.
 
     Args:
         left: Left side dictionary (existing files)
@@ -41,6 +87,13 @@ def file_reducer(left, right):
         return right
     elif right is None:
         return left
+    elif isinstance(right, ScopedFiles) and not left:
+        # Initial input of a scoped sub-agent run: adopt the view as-is
+        return right
+    elif isinstance(left, ScopedFiles):
+        if right is left:
+            return left
+        return left.with_writes(right)
     else:
         return {**left, **right}
 
@@ -51,7 +104,14 @@ class DeepAgentState(AgentState):
     Inherits from LangGraph's AgentState and adds:
     - todos: List of Todo items for task planning and progress tracking
     - files: Virtual file system stored as dict mapping filenames to content
+    - task_classification: task_type/difficulty of the current request, filled
+      in before the agent starts by the speculative pre-agent stage
+    - turn_started_at: Wall-clock start (epoch seconds) of the current turn
+    - budget_usage: How close the last finished turn came to its tier budget
     """
 
     todos: NotRequired[list[Todo]]
     files: Annotated[NotRequired[dict[str, str]], file_reducer]
+    task_classification: NotRequired[dict[str, str]]
+    turn_started_at: NotRequired[float]
+    budget_usage: NotRequired[dict]
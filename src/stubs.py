@@ -0,0 +1,304 @@
+"""Offline stand-ins for the chat model, Tavily and HTTP backends.
+
+Used to exercise the advisor end to end without API keys or network access
+(server mode, load tests, local debugging). The stub model behaves like a
+minimal tool-calling agent: when tools are bound it issues one search per turn,
+then answers from the tool results; answers are streamed token by token.
+
+Each backend's latency is a fixed number of seconds or a `LatencyDistribution`
+("uniform:0.1,0.5", "lognormal:0.3,0.6", "exp:0.2"), and each can fail a
+share of its calls (`error_rate`) to rehearse degraded dependencies. Every
+backend draws its failures from its own seedable random generator, so a seeded
+run injects the same errors whatever the other backends do.
+"""
+
+import json
+import math
+import os
+import random
+import time
+import uuid
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import PrivateAttr
+
+from src.fingerprint import COURSE_CODE_RE
+
+# Tools the stub model prefers, in order, when they are bound
+_PREFERRED_TOOLS = (
+    "search_course_details",
+    "search_unsw_programs",
+    "search_career_opportunities",
+    "search_international_student_info",
+)
+
+
+class StubBackendError(RuntimeError):
+    """Injected failure of a stub backend."""
+
+
+class LatencyDistribution:
+    """Random latency in seconds, parsed from a spec string.
+
+    Specs: "0.2" (constant), "uniform:LOW,HIGH", "lognormal:MEDIAN,SIGMA",
+    "exp:MEAN".
+    """
+
+    KINDS = ("constant", "uniform", "lognormal", "exp")
+
+    def __init__(self, kind: str, params: tuple[float, ...], seed: int | None = None):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution {kind!r} (expected one of {', '.join(self.KINDS)})")
+        self.kind = kind
+        self.params = params
+        self._random = random.Random(seed)
+
+    @classmethod
+    def parse(cls, spec, seed: int | None = None) -> "LatencyDistribution":
+        """Build a distribution from a spec string or a number of seconds."""
+        if isinstance(spec, LatencyDistribution):
+            return spec
+        if isinstance(spec, (int, float)):
+            return cls("constant", (float(spec),), seed)
+        kind, _, params = str(spec).partition(":")
+        if not params:
+            return cls("constant", (float(kind),), seed)
+        return cls(kind.strip().lower(), tuple(float(p) for p in params.split(",")), seed)
+
+    def sample(self) -> float:
+        """Draw one latency (never negative)."""
+        if self.kind == "constant":
+            return max(0.0, self.params[0])
+        if self.kind == "uniform":
+            return self._random.uniform(*self.params[:2])
+        if self.kind == "lognormal":
+            median, sigma = self.params[:2]
+            return self._random.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        return self._random.expovariate(1 / self.params[0]) if self.params[0] > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return f"{self.kind}:{','.join(f'{p:g}' for p in self.params)}"
+
+
+def _wait(latency) -> None:
+    """Sleep for a fixed latency or one drawn from a LatencyDistribution."""
+    seconds = latency.sample() if isinstance(latency, LatencyDistribution) else latency
+    if seconds:
+        time.sleep(seconds)
+
+
+def _fails(error_rate: float, rng: random.Random) -> bool:
+    return error_rate > 0 and rng.random() < error_rate
+
+
+def _text(message) -> str:
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+class StubChatModel(BaseChatModel):
+    """Deterministic chat model with configurable latency and failure rate."""
+
+    # Seconds, or a LatencyDistribution
+    latency: Any = 0.0
+    token_latency: float = 0.0
+    error_rate: float = 0.0
+    # Seed of the failure draws (None: unseeded)
+    seed: int | str | None = None
+    tool_names: tuple[str, ...] = ()
+
+    _random: random.Random = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._random = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def bind_tools(self, tools, **kwargs):
+        names = tuple(getattr(t, "name", None) or t.get("name") for t in tools)
+        return self.model_copy(update={"tool_names": names})
+
+    def with_structured_output(self, schema, **kwargs):
+        # Goes through the model so callbacks (tracing, token usage) see the call
+        def _structured(message):
+            return schema(filename="stub_summary.md", summary=_text(message)[-300:].strip())
+
+        return self | RunnableLambda(_structured)
+
+    def _respond(self, messages: list) -> AIMessage:
+        # Only the current turn matters: messages after the last human message
+        turn = []
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage) and message.name is None:
+                question = _text(message)
+                break
+            turn.append(message)
+        else:
+            question = ""
+
+        searched = any(isinstance(m, ToolMessage) and m.name in _PREFERRED_TOOLS for m in turn)
+        tool = next((name for name in _PREFERRED_TOOLS if name in self.tool_names), None)
+        if tool and not searched:
+            args = {"query": f"UNSW {question}"}
+            if tool == "search_course_details":
+                match = COURSE_CODE_RE.search(question)
+                if not match:
+                    tool = next((n for n in _PREFERRED_TOOLS[1:] if n in self.tool_names), None)
+                else:
+                    args["course_code"] = f"{match.group(1).upper()}{match.group(2)}"
+            if tool:
+                call_id = f"stub_{uuid.uuid4().hex[:12]}"
+                return AIMessage(content="", tool_calls=[{"name": tool, "args": args, "id": call_id}])
+
+        findings = [_text(m).splitlines()[0] for m in turn if isinstance(m, ToolMessage)]
+        answer = f"Here is what I found about: {question}"
+        if findings:
+            answer += "\n" + "\n".join(f"- {line}" for line in findings[-3:])
+        return AIMessage(content=answer)
+
+    def _call_backend(self) -> None:
+        _wait(self.latency)
+        if _fails(self.error_rate, self._random):
+            raise StubBackendError("stub model error")
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self._call_backend()
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        self._call_backend()
+        message = self._respond(messages)
+        if message.tool_calls:
+            call = message.tool_calls[0]
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": 0}
+                    ],
+                )
+            )
+            return
+        for i, word in enumerate(message.content.split(" ")):
+            if i and self.token_latency:
+                time.sleep(self.token_latency)
+            token = word if i == 0 else f" {word}"
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+
+class StubTavilyClient:
+    """Tavily client returning one handbook-like result per query."""
+
+    def __init__(self, latency=0.0, error_rate: float = 0.0, seed: int | str | None = None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+    def search(self, query: str, max_results: int = 1, **kwargs: Any) -> dict:
+        _wait(self.latency)
+        if _fails(self.error_rate, self._random):
+            raise StubBackendError("stub search error")
+        slug = "-".join(query.lower().split())[:60]
+        return {
+            "query": query,
+            "results": [
+                {
+                    "url": f"https://www.handbook.unsw.edu.au/stub/{slug}/{i}",
+                    "title": f"{query} ({i + 1})",
+                    "content": f"Handbook summary for {query}.",
+                    "raw_content": f"Handbook page for {query}.",
+                }
+                for i in range(max_results)
+            ],
+        }
+
+
+class _StubResponse:
+    def __init__(self, url: str, status_code: int = 200):
+        self.url = url
+        self.status_code = status_code
+        self.text = f"<h1>{url}</h1><p>Stub page content for {url}.</p>" if status_code == 200 else "Service Unavailable"
+
+
+class StubHttpClient:
+    """Minimal httpx.Client stand-in serving a small HTML page for any URL (or a 503)."""
+
+    def __init__(self, latency=0.0, error_rate: float = 0.0, seed: int | str | None = None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+    def get(self, url: str, **kwargs: Any) -> _StubResponse:
+        _wait(self.latency)
+        return _StubResponse(url, 503 if _fails(self.error_rate, self._random) else 200)
+
+    def close(self) -> None:
+        pass
+
+
+def install_stub_backends(
+    model_latency=None,
+    search_latency=None,
+    fetch_latency=None,
+    model_error_rate: float | None = None,
+    search_error_rate: float | None = None,
+    fetch_error_rate: float | None = None,
+    seed: int | None = None,
+) -> StubChatModel:
+    """Point the search and summarization tools at the stub backends.
+
+    Latencies default to the STUB_MODEL_LATENCY, STUB_SEARCH_LATENCY and
+    STUB_FETCH_LATENCY environment variables, error rates to STUB_MODEL_ERROR_RATE,
+    STUB_SEARCH_ERROR_RATE and STUB_FETCH_ERROR_RATE, or 0.
+
+    Args:
+        model_latency: Delay before every model response (seconds or a LatencyDistribution spec)
+        search_latency: Delay of every Tavily search
+        fetch_latency: Delay of every page fetch
+        model_error_rate: Share of model calls that raise StubBackendError
+        search_error_rate: Share of searches that raise StubBackendError
+        fetch_error_rate: Share of page fetches answered with a 503
+        seed: Seeds the model, search and fetch latencies (seed, seed + 1, seed + 2, unless
+            given as LatencyDistribution objects) and each backend's own failure draws
+
+    Returns:
+        A StubChatModel to build the advisor with
+    """
+    import src.tavilys as tavilys
+    import src.todo_tools as todo_tools
+
+    def _latency(value, env, offset):
+        spec = os.environ.get(env, 0.0) if value is None else value
+        return LatencyDistribution.parse(spec, None if seed is None else seed + offset)
+
+    def _error_seed(backend):
+        # Distinct from the latency seeds, so failures and latencies are independent draws
+        return None if seed is None else f"{seed}/{backend}-errors"
+
+    def _rate(value, env):
+        return float(os.environ.get(env, 0.0)) if value is None else value
+
+    model = StubChatModel(
+        latency=_latency(model_latency, "STUB_MODEL_LATENCY", 0),
+        error_rate=_rate(model_error_rate, "STUB_MODEL_ERROR_RATE"),
+        seed=_error_seed("model"),
+    )
+    tavilys.tavily_client = StubTavilyClient(
+        latency=_latency(search_latency, "STUB_SEARCH_LATENCY", 1),
+        error_rate=_rate(search_error_rate, "STUB_SEARCH_ERROR_RATE"),
+        seed=_error_seed("search"),
+    )
+    tavilys.http_client = StubHttpClient(
+        latency=_latency(fetch_latency, "STUB_FETCH_LATENCY", 2),
+        error_rate=_rate(fetch_error_rate, "STUB_FETCH_ERROR_RATE"),
+        seed=_error_seed("fetch"),
+    )
+    tavilys.summarization_model = model
+    todo_tools.classification_model = model
+    return model
@@ -5,16 +5,18 @@ with isolated contexts. Sub-agents prevent context clash by operating with clean
 context windows containing only their specific task description.
 """
 
+import asyncio
 from typing import Annotated, NotRequired
 from typing_extensions import TypedDict
 
-from langchain_core.messages import ToolMessage
-from langchain_core.tools import BaseTool, InjectedToolCallId, tool
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import BaseTool, InjectedToolCallId, StructuredTool, tool
 from langgraph.prebuilt import InjectedState, create_react_agent
 from langgraph.types import Command
 
-from src.prompts import TASK_DESCRIPTION_PREFIX
-from src.state import DeepAgentState
+from src.prompts import PARALLEL_TASK_DESCRIPTION, TASK_DESCRIPTION_PREFIX
+from src.state import DeepAgentState, ScopedFiles
+from src.tracing import annotate, span
 
 
 class SubAgent(TypedDict):
@@ -26,11 +28,122 @@ class SubAgent(TypedDict):
     tools: NotRequired[list[str]]
 
 
-def _create_task_tool(tools, subagents: list[SubAgent], model, state_schema):
-    """Create a task delegation tool that enables context isolation through sub-agents.
+class SubAgentTask(TypedDict):
+    """One unit of work for batch delegation."""
 
-    This function implements the core pattern for spawning specialized sub-agents with
-    isolated contexts, preventing context clash and confusion in complex multi-step tasks.
+    description: str
+    subagent_type: str
+
+
+# Wall-clock deadline (seconds) for one sub-agent run, per difficulty tier
+SUBAGENT_DEADLINES = {"Simple": 30.0, "Moderate": 120.0, "Difficult": 180.0}
+DEFAULT_SUBAGENT_DEADLINE = 120.0
+
+
+def subagent_deadline(state: dict) -> float:
+    """Return the sub-agent deadline for the current request's difficulty tier."""
+    difficulty = (state.get("task_classification") or {}).get("difficulty")
+    return SUBAGENT_DEADLINES.get(difficulty, DEFAULT_SUBAGENT_DEADLINE)
+
+
+async def _run_subagent_with_deadline(sub_agent, sub_state: dict, deadline: float) -> tuple[dict, bool]:
+    """Run a sub-agent asynchronously, cancelling it when the deadline passes.
+
+    The run is consumed as a stream of state snapshots (the same execution as
+    ainvoke) so that, on timeout, the last snapshot still holds every file the
+    sub-agent saved before it was cancelled. Cancelling the stream stops the
+    sub-agent graph and its async steps, but a sync tool already running in an
+    executor thread (a Tavily search, page fetch or summary) cannot be
+    interrupted: it runs to completion in the background, still fills the
+    shared caches, and its result is discarded.
+
+    Args:
+        sub_agent: Compiled sub-agent graph
+        sub_state: Input state for the sub-agent
+        deadline: Wall-clock budget in seconds
+
+    Returns:
+        (last known sub-agent state, whether the deadline was hit)
+    """
+    latest = sub_state
+    with span(f"subagent {sub_agent.name}", **{"subagent.deadline_s": deadline}):
+        try:
+            async with asyncio.timeout(deadline):
+                async for snapshot in sub_agent.astream(sub_state, stream_mode="values"):
+                    latest = snapshot
+        except TimeoutError:
+            annotate({"subagent.timed_out": True})
+            return latest, True
+        annotate({"subagent.timed_out": False})
+        return latest, False
+
+
+def _written_files(result: dict) -> dict[str, str]:
+    """Return only the files a sub-agent created or changed."""
+    files = result.get("files", {})
+    if isinstance(files, ScopedFiles):
+        return files.local
+    return dict(files)
+
+
+def _run_coroutine(coro):
+    """Run a coroutine to completion from synchronous code.
+
+    Unlike asyncio.run, closing the loop does not wait for executor threads, so a
+    cancelled sub-agent's blocking tool call cannot hold the parent past its
+    deadline (the call itself keeps running until it returns).
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+def _subagent_state(description: str, state: dict, parent_files: dict | None = None) -> dict:
+    """Build the isolated input state of one sub-agent run.
+
+    The sub-agent sees only its task description (no parent history), the
+    parent's files through a read-only scoped view, and the parent's
+    classification, which lets its tools pick the summarizer for the
+    request's tier.
+
+    Args:
+        description: Task for the sub-agent
+        state: Parent agent state
+        parent_files: Parent files to expose (default: state["files"])
+    """
+    return {
+        "messages": [{"role": "user", "content": description}],
+        "files": ScopedFiles(state.get("files", {}) if parent_files is None else parent_files),
+        "task_classification": state.get("task_classification") or {},
+    }
+
+
+def _subagent_report(subagent_type: str, result: dict, timed_out: bool, deadline: float) -> str:
+    """Build the parent-facing report for a finished or timed-out sub-agent."""
+    last = result["messages"][-1] if result.get("messages") else None
+    saved = list(_written_files(result))
+    if not timed_out:
+        if last is not None and last.content:
+            return last.content
+        return (
+            f"⚠️ Sub-agent {subagent_type} finished without producing an answer.\n"
+            + f"Files it saved: {', '.join(saved) if saved else 'none'}\n"
+            + "💡 Use read_file() on these files, or answer without this sub-agent's findings."
+        )
+    partial = last.content if isinstance(last, AIMessage) and last.content else ""
+    return (
+        f"⏱️ Sub-agent {subagent_type} hit its {deadline:.0f}s deadline and was cancelled.\n"
+        + (f"Last progress note: {partial}\n" if partial else "")
+        + f"Partial findings saved to files: {', '.join(saved) if saved else 'none'}\n"
+        + "💡 Use read_file() on these files and answer with what is available."
+    )
+
+
+def _create_subagent_registry(tools, subagents: list[SubAgent], model, state_schema) -> dict:
+    """Build the compiled sub-agents, keyed by name.
 
     Args:
         tools: List of available tools that can be assigned to sub-agents
@@ -39,7 +152,7 @@ def _create_task_tool(tools, subagents: list[SubAgent], model, state_schema):
         state_schema: The state schema (typically DeepAgentState)
 
     Returns:
-        A 'task' tool that can delegate work to specialized sub-agents
+        Dict mapping sub-agent name to its compiled ReAct agent
     """
     # Create agent registry
     agents = {}
@@ -59,17 +172,38 @@ def _create_task_tool(tools, subagents: list[SubAgent], model, state_schema):
         else:
             # Default to all tools
             _tools = tools
+        # Sub-agent runs are ephemeral: never checkpoint (and so never copy) their state
         agents[_agent["name"]] = create_react_agent(
-            model, prompt=_agent["prompt"], tools=_tools, state_schema=state_schema
+            model,
+            prompt=_agent["prompt"],
+            tools=_tools,
+            state_schema=state_schema,
+            checkpointer=False,
+            name=_agent["name"],
         )
 
+    return agents
+
+
+def _create_task_tool(agents: dict, subagents: list[SubAgent]):
+    """Create a task delegation tool that enables context isolation through sub-agents.
+
+    This function implements the core pattern for spawning specialized sub-agents with
+    isolated contexts, preventing context clash and confusion in complex multi-step tasks.
+
+    Args:
+        agents: Compiled sub-agents keyed by name (see _create_subagent_registry)
+        subagents: List of specialized sub-agent configurations
+
+    Returns:
+        A 'task' tool that can delegate work to specialized sub-agents
+    """
     # Generate description of available sub-agents for the tool description
     other_agents_string = [
         f"- {_agent['name']}: {_agent['description']}" for _agent in subagents
     ]
 
-    @tool(description=TASK_DESCRIPTION_PREFIX.format(other_agents=other_agents_string))
-    def task(
+    async def atask(
         description: str,
         subagent_type: str,
         state: Annotated[DeepAgentState, InjectedState],
@@ -79,6 +213,7 @@ def _create_task_tool(tools, subagents: list[SubAgent], model, state_schema):
 
         This creates a fresh context for the sub-agent containing only the task description,
         preventing context pollution from the parent agent's conversation history.
+        The sub-agent runs under a wall-clock deadline derived from the difficulty tier.
         """
         # Validate requested agent type exists
         if subagent_type not in agents:
@@ -88,23 +223,159 @@ def _create_task_tool(tools, subagents: list[SubAgent], model, state_schema):
         sub_agent = agents[subagent_type]
 
         # Create isolated context with only the task description
-        # This is the key to context isolation - no parent history
-        state["messages"] = [{"role": "user", "content": description}]
+        # This is the key to context isolation - no parent history.
+        # The parent's files are shared through a read-only scoped view, not copied.
+        sub_state = _subagent_state(description, state)
 
-        # Execute the sub-agent in isolation
-        result = sub_agent.invoke(state)
+        # Execute the sub-agent in isolation, bounded by the deadline
+        deadline = subagent_deadline(state)
+        result, timed_out = await _run_subagent_with_deadline(sub_agent, sub_state, deadline)
 
         # Return results to parent agent via Command state update
         return Command(
             update={
-                "files": result.get("files", {}),  # Merge any file changes
+                "files": _written_files(result),  # Merge only new or changed files
                 "messages": [
                     # Sub-agent result becomes a ToolMessage in parent context
                     ToolMessage(
-                        result["messages"][-1].content, tool_call_id=tool_call_id
+                        _subagent_report(subagent_type, result, timed_out, deadline),
+                        tool_call_id=tool_call_id,
                     )
                 ],
             }
         )
 
+    def task(
+        description: str,
+        subagent_type: str,
+        state: Annotated[DeepAgentState, InjectedState],
+        tool_call_id: Annotated[str, InjectedToolCallId],
+    ):
+        """Delegate a task to a specialized sub-agent with isolated context."""
+        return _run_coroutine(atask(description, subagent_type, state, tool_call_id))
+
+    # Both entry points: invoke() runs the coroutine on its own loop, ainvoke() awaits it
+    task = StructuredTool.from_function(
+        func=task,
+        coroutine=atask,
+        name="task",
+        description=TASK_DESCRIPTION_PREFIX.format(other_agents=other_agents_string),
+    )
+
     return task
+
+
+def _merge_subagent_files(
+    parent_files: dict[str, str], results: list[tuple[str, dict[str, str]]]
+) -> tuple[dict[str, str], list[str]]:
+    """Merge file updates from concurrently run sub-agents.
+
+    Files identical to the parent's are skipped. When two
+    sub-agents wrote different content under the same name, later writers keep
+    their content under a name prefixed with their agent type instead of
+    silently overwriting the earlier one.
+
+    Args:
+        parent_files: The parent's files before delegation
+        results: (subagent_type, written files) pairs in task order
+
+    Returns:
+        (merged file updates, list of files renamed because of a conflict)
+    """
+    merged: dict[str, str] = {}
+    renamed: list[str] = []
+    for subagent_type, files in results:
+        for name, content in files.items():
+            if parent_files.get(name) == content:
+                continue
+            if name in merged and merged[name] != content:
+                base = f"{subagent_type}_{name}"
+                alt, n = base, 1
+                while alt in merged or alt in parent_files:
+                    n += 1
+                    alt = f"{subagent_type}_{n}_{name}"
+                merged[alt] = content
+                renamed.append(alt)
+            else:
+                merged[name] = content
+    return merged, renamed
+
+
+def _create_parallel_task_tool(agents: dict, subagents: list[SubAgent], max_concurrency: int = 3):
+    """Create a batch delegation tool that runs several sub-agent tasks concurrently.
+
+    Args:
+        agents: Compiled sub-agents keyed by name (see _create_subagent_registry)
+        subagents: List of specialized sub-agent configurations
+        max_concurrency: Maximum number of sub-agents running at the same time
+
+    Returns:
+        A 'parallel_task' tool that fans out work to specialized sub-agents
+    """
+    other_agents_string = [
+        f"- {_agent['name']}: {_agent['description']}" for _agent in subagents
+    ]
+
+    async def aparallel_task(
+        tasks: list[SubAgentTask],
+        state: Annotated[DeepAgentState, InjectedState],
+        tool_call_id: Annotated[str, InjectedToolCallId],
+    ):
+        """Delegate several independent tasks to sub-agents and run them concurrently."""
+        invalid = [t["subagent_type"] for t in tasks if t["subagent_type"] not in agents]
+        if invalid:
+            return f"Error: invoked agent of type {invalid}, the only allowed types are {[f'`{k}`' for k in agents]}"
+        if not tasks:
+            return "Error: no tasks provided"
+
+        parent_files = state.get("files", {})
+        deadline = subagent_deadline(state)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _run_one(task_: SubAgentTask):
+            async with semaphore:
+                # Each sub-agent gets its own isolated context and its own write layer
+                sub_state = _subagent_state(task_["description"], state, parent_files)
+                return await _run_subagent_with_deadline(agents[task_["subagent_type"]], sub_state, deadline)
+
+        results = await asyncio.gather(*(_run_one(t) for t in tasks), return_exceptions=True)
+
+        sections = []
+        file_results = []
+        for i, (task_, outcome) in enumerate(zip(tasks, results), 1):
+            header = f"## [{i}] {task_['subagent_type']}: {task_['description']}"
+            if isinstance(outcome, Exception):
+                sections.append(f"{header}\n❌ Sub-agent failed: {outcome}")
+                continue
+            result, timed_out = outcome
+            sections.append(f"{header}\n{_subagent_report(task_['subagent_type'], result, timed_out, deadline)}")
+            file_results.append((task_["subagent_type"], _written_files(result)))
+
+        files, renamed = _merge_subagent_files(parent_files, file_results)
+        combined = "\n\n".join(sections)
+        if renamed:
+            combined += f"\n\nRenamed conflicting files: {', '.join(renamed)}"
+
+        return Command(
+            update={
+                "files": files,
+                "messages": [ToolMessage(combined, tool_call_id=tool_call_id)],
+            }
+        )
+
+    def parallel_task(
+        tasks: list[SubAgentTask],
+        state: Annotated[DeepAgentState, InjectedState],
+        tool_call_id: Annotated[str, InjectedToolCallId],
+    ):
+        """Delegate several independent tasks to sub-agents and run them concurrently."""
+        return _run_coroutine(aparallel_task(tasks, state, tool_call_id))
+
+    parallel_task = StructuredTool.from_function(
+        func=parallel_task,
+        coroutine=aparallel_task,
+        name="parallel_task",
+        description=PARALLEL_TASK_DESCRIPTION.format(other_agents=other_agents_string, max_concurrency=max_concurrency),
+    )
+
+    return parallel_task
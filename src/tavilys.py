@@ -3,13 +3,16 @@
 This module provides search and content processing utilities for the research agent,
 including web search capabilities and content summarization tools.
 """
+import contextvars
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 import uuid, base64
 
 import httpx
 from langchain.chat_models import init_chat_model
-from langchain_core.messages import HumanMessage, ToolMessage
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
 from langchain_core.tools import InjectedToolArg, InjectedToolCallId, tool
 from langgraph.prebuilt import InjectedState
 from langgraph.types import Command
@@ -18,13 +21,26 @@ from pydantic import BaseModel, Field
 from tavily import TavilyClient
 from typing_extensions import Annotated, Literal
 
-from src.prompts import SUMMARIZE_WEB_SEARCH
+from src.cache import get_cache, get_or_load, make_key
+from src.fingerprint import MinHash
+from src.extractive import extractive_summary, summary_method
+from src.host_health import get_host_monitor, host_of
+from src.page_dedup import get_fingerprint_store, page_codes
+from src.prompts import SUMMARIZE_WEB_SEARCH, SUMMARIZE_WEB_SEARCH_INPUT
+from src.tracing import SPAN_KIND_CLIENT, annotate, span
 from src.state import DeepAgentState
 from langchain_qwq import ChatQwen
 
+# Per-request timeout of a page download (seconds); hedging usually answers well before it
+FETCH_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
+# Concurrent page downloads shared by all searches
+FETCH_WORKERS = 8
+
 # Summarization model - initialize lazily to avoid import issues
 summarization_model = None
 tavily_client = None
+http_client = None
+fetch_pool = None
 
 def get_summarization_model():
     """Get the summarization model, initializing it if needed."""
@@ -43,6 +59,24 @@ def get_tavily_client():
         tavily_client = TavilyClient()
     return tavily_client
 
+def get_http_client():
+    """Get the shared HTTP client for page fetches, initializing it if needed."""
+    global http_client
+    if http_client is None:
+        # One pooled client reuses connections across fetches and threads
+        http_client = httpx.Client(follow_redirects=True, timeout=FETCH_TIMEOUT)
+    return http_client
+
+def get_fetch_pool():
+    """Get the shared page-download thread pool, initializing it if needed."""
+    global fetch_pool
+    if fetch_pool is None:
+        fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="page-fetch")
+    return fetch_pool
+
+# File name of the plain-excerpt summary used when summarization fails
+FALLBACK_SUMMARY_FILENAME = "search_result.md"
+
 class Summary(BaseModel):
     """Schema for webpage content summarization."""
     filename: str = Field(description="Name of the file to store.")
@@ -68,14 +102,61 @@ def run_tavily_search(
     Returns:
         Search results dictionary
     """
-    result = get_tavily_client().search(
-        search_query,
-        max_results=max_results,
-        include_raw_content=include_raw_content,
-        topic="general"
-    )
+    with span("tavily.search", kind=SPAN_KIND_CLIENT, **{"search.query": search_query, "search.max_results": max_results}):
+        cache_key = make_key(search_query, max_results, include_raw_content)
+        result, status = get_or_load(
+            "search",
+            cache_key,
+            lambda: get_tavily_client().search(
+                search_query,
+                max_results=max_results,
+                include_raw_content=include_raw_content,
+                topic="general"
+            ),
+        )
+        annotate({"cache.hit": status != "miss", "cache.status": status})
+        return result
 
-    return result
+def fetch_page_markdown(url: str) -> str | None:
+    """Fetch a page and convert it to markdown, using the shared page cache.
+
+    Args:
+        url: Page URL
+
+    Returns:
+        Markdown content, or None if the page could not be read
+    """
+    with span("page.fetch", kind=SPAN_KIND_CLIENT, **{"url.full": url}):
+        content, status = get_or_load("page", make_key(url), lambda: _download_page_markdown(url))
+        annotate({"cache.hit": status != "miss", "cache.status": status})
+    return content
+
+def _download_page_markdown(url: str) -> str | None:
+    host = host_of(url)
+    monitor = get_host_monitor()
+    if not monitor.allow(host):
+        # Breaker open: the host kept failing, skip it until its cooldown passes
+        annotate({"host.breaker_open": True})
+        return None
+    started = time.perf_counter()
+    ok = False
+    try:
+        response = get_http_client().get(url)
+        # Server errors count against the host; a 404 is a fast, healthy answer
+        ok = response.status_code < 500
+    except httpx.HTTPError:
+        return None
+    finally:
+        # Recorded whatever the fetch raised (InvalidURL, decode errors...), so a trial fetch
+        # of a half-open host always ends and the host is not blocked for good
+        monitor.record(host, time.perf_counter() - started, ok=ok)
+    annotate({"http.response.status_code": response.status_code})
+    if response.status_code != 200:
+        return None
+
+    # Convert HTML to markdown
+    with span("page.markdownify", **{"html.length": len(response.text)}):
+        return markdownify(response.text)
 
 def summarize_webpage_content(webpage_content: str) -> Summary:
     """Summarize webpage content using the configured summarization model.
@@ -86,53 +167,123 @@ def summarize_webpage_content(webpage_content: str) -> Summary:
     Returns:
         Summary object with filename and summary
     """
+    # Summaries depend only on the page content, so identical pages share one
+    with span("summarize", **{"content.length": len(webpage_content)}):
+        return _summarize_webpage_content(webpage_content)
+
+def _summarize_webpage_content(webpage_content: str) -> Summary:
+    cached, status = get_or_load("summary", make_key(webpage_content), lambda: _generate_summary(webpage_content))
+    annotate({"cache.hit": status != "miss", "cache.status": status})
+    if cached is not None:
+        return Summary(**cached)
+
+    # Return a basic summary object on failure
+    return Summary(
+        filename=FALLBACK_SUMMARY_FILENAME,
+        summary=webpage_content[:1000] + "..." if len(webpage_content) > 1000 else webpage_content
+    )
+
+def _generate_summary(webpage_content: str) -> dict | None:
     try:
         # Set up structured output model for summarization
         structured_model = get_summarization_model().with_structured_output(Summary)
         
         # Generate summary
         summary_and_filename = structured_model.invoke([
-            HumanMessage(content=SUMMARIZE_WEB_SEARCH.format(
+            SystemMessage(content=SUMMARIZE_WEB_SEARCH),
+            HumanMessage(content=SUMMARIZE_WEB_SEARCH_INPUT.format(
                 webpage_content=webpage_content, 
                 date=get_today_str()
             ))
-        ])
-        
-        return summary_and_filename
+        ], config={"run_name": "summarize_webpage_content"})
+        return summary_and_filename.model_dump()
         
     except Exception:
-        # Return a basic summary object on failure
-        return Summary(
-            filename="search_result.md",
-            summary=webpage_content[:1000] + "..." if len(webpage_content) > 1000 else webpage_content
-        )
+        # Failures are not cached; the caller falls back to a plain excerpt
+        return None
+
+def request_difficulty(state: dict) -> str | None:
+    """Difficulty tier of the request an agent state belongs to, if classified."""
+    return (state.get("task_classification") or {}).get("difficulty")
+
+def summarize_page(webpage_content: str, difficulty: str | None = None) -> tuple[Summary, str]:
+    """Summarize a page with the summarizer its request tier calls for.
 
-def process_search_results(results: dict) -> list[dict]:
+    Args:
+        webpage_content: Page content
+        difficulty: Difficulty tier of the request, if known
+
+    Returns:
+        (summary, method) where method is "llm" or "extractive"
+    """
+    if summary_method(difficulty, len(webpage_content)) == "llm":
+        return summarize_webpage_content(webpage_content), "llm"
+    # An LLM summary of the same content is free and better when one is cached
+    cached = get_cache().get("summary", make_key(webpage_content))
+    if cached is not None:
+        return Summary(**cached), "llm"
+    with span("summarize.extractive", **{"content.length": len(webpage_content)}):
+        return Summary(**extractive_summary(webpage_content)), "extractive"
+
+def process_search_results(results: dict, difficulty: str | None = None) -> list[dict]:
     """Process search results by summarizing content where available.
     
     Args:
         results: Tavily search results dictionary
+        difficulty: Difficulty tier of the request; Simple requests (and very large
+            pages) get the local extractive summary instead of an LLM call
         
     Returns:
         List of processed results with summaries
     """
     processed_results = []
-
-    # Create a client for HTTP requests
-    HTTPX_CLIENT = httpx.Client()
-    
-    for result in results.get('results', []):
-        
-        # Get url 
-        url = result['url']
-        
-        # Read url
-        response = HTTPX_CLIENT.get(url)
-
-        if response.status_code == 200:
-            # Convert HTML to markdown
-            raw_content = markdownify(response.text)
-            summary_obj = summarize_webpage_content(raw_content)
+    items = results.get('results', [])
+    store = get_fingerprint_store()
+    # (signature, codes) of the pages already kept in this batch
+    kept = []
+
+    # Fetch every page at once (cached as markdown); each is waited on only up to its host's hedge delay
+    started = time.monotonic()
+    fetches = [
+        get_fetch_pool().submit(contextvars.copy_context().run, fetch_page_markdown, result['url'])
+        for result in items
+    ]
+
+    for result, fetch in zip(items, fetches):
+        host = host_of(result['url'])
+        remaining = get_host_monitor().hedge_delay(host) - (time.monotonic() - started)
+        wait([fetch], timeout=max(0.0, remaining))
+        if not fetch.done():
+            # Hedge: answer from Tavily's content; the fetch still fills the cache for next time
+            get_host_monitor().note(host, "hedged")
+            annotate({"fetch.hedged": True})
+            page_content = None
+        else:
+            page_content = fetch.result() if fetch.exception() is None else None
+
+        reused = False
+        if page_content is not None:
+            raw_content = page_content
+            signature = store.signature(page_content)
+            codes = page_codes(page_content)
+            if signature is not None and any(
+                codes == other_codes and MinHash.similarity(signature, other) >= store.similarity_threshold
+                for other, other_codes in kept
+            ):
+                # Mirror of a page already in this batch: one summary and file are enough
+                store.stats["batch_duplicates"] += 1
+                annotate({"page.duplicate": True})
+                continue
+            match = store.find(signature, codes) if signature is not None else None
+            if match is not None:
+                # Near-duplicate of a summarized page: reuse its summary and file instead of an LLM call
+                annotate({"page.duplicate_of": match.page.url})
+                summary_obj = Summary(filename=match.page.filename, summary=match.page.summary)
+                reused = True
+            else:
+                summary_obj, method = summarize_page(raw_content, difficulty)
+            if signature is not None:
+                kept.append((signature, codes))
         else:
             # Use Tavily's generated summary
             raw_content = result.get('raw_content', '')
@@ -141,10 +292,15 @@ def process_search_results(results: dict) -> list[dict]:
                 summary=result.get('content', 'Error reading URL; try another search.')
             )
         
-        # uniquify file names
-        uid = base64.urlsafe_b64encode(uuid.uuid4().bytes).rstrip(b"=").decode("ascii")[:8]
-        name, ext = os.path.splitext(summary_obj.filename)
-        summary_obj.filename = f"{name}_{uid}{ext}"
+        if not reused:
+            # Only LLM summaries are offered to later near-duplicates
+            summarized = page_content is not None and method == "llm" and summary_obj.filename != FALLBACK_SUMMARY_FILENAME
+            # uniquify file names
+            uid = base64.urlsafe_b64encode(uuid.uuid4().bytes).rstrip(b"=").decode("ascii")[:8]
+            name, ext = os.path.splitext(summary_obj.filename)
+            summary_obj.filename = f"{name}_{uid}{ext}"
+            if summarized and signature is not None:
+                store.add(result['url'], signature, codes, summary_obj.summary, summary_obj.filename)
 
         processed_results.append({
             'url': result['url'],
@@ -188,10 +344,10 @@ def tavily_search(
     ) 
 
     # Process and summarize results
-    processed_results = process_search_results(search_results)
+    processed_results = process_search_results(search_results, request_difficulty(state))
     
     # Save each result to a file and prepare summary
-    files = state.get("files", {})
+    files = {}
     saved_files = []
     summaries = []
     
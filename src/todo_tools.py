@@ -5,6 +5,7 @@ that enable agents to plan complex workflows and track progress through
 multi-step operations.
 """
 
+import json
 from typing import Annotated
 
 from langchain_core.messages import ToolMessage
@@ -12,12 +13,13 @@ from langchain_core.tools import InjectedToolCallId, tool
 from langgraph.prebuilt import InjectedState
 from langgraph.types import Command
 
+from src.complexity_classifier import get_classifier
 from src.prompts import WRITE_TODOS_DESCRIPTION
 from src.state import DeepAgentState, Todo
 
 # Qwen model for classification
 from langchain_qwq import ChatQwen
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import HumanMessage, SystemMessage
 
 
 @tool(description=WRITE_TODOS_DESCRIPTION,parse_docstring=True)
@@ -73,25 +75,28 @@ def read_todos(
     return result.strip()
 
 
-@tool(parse_docstring=True)
-def classify_task_complexity(user_request: str) -> dict:
-    """Classify the user request for TODO complexity and type.
+# Classification model - initialize lazily, only ambiguous requests reach it
+classification_model = None
+
+
+def get_classification_model():
+    """Get the classification model, initializing it if needed."""
+    global classification_model
+    if classification_model is None:
+        classification_model = ChatQwen(model="qwen-flash", temperature=0.0)
+    return classification_model
+
+
+def classify_with_llm(user_request: str) -> dict | None:
+    """Classify a request with the LLM (slow path for ambiguous requests).
 
     Args:
         user_request: The raw user query to analyze.
 
     Returns:
-        dict: A JSON-compatible dict with exactly two keys:
-            - task_type: Task type (e.g., Course Planning / Program Info / Career Advice / International Support / Comparison / General Inquiry)
-            - difficulty: Difficulty level (Simple / Moderate / Difficult)
-
-    Example:
-        {
-          "task_type": "Comparison",
-          "difficulty": "Moderate"
-        }
+        dict with task_type and difficulty, or None if the response could not be parsed
     """
-    model = ChatQwen(model="qwen-flash", temperature=0.0)
+    model = get_classification_model()
 
     system_hint = (
         "You are a task classifier. Output valid JSON only, with no explanations. "
@@ -104,13 +109,14 @@ def classify_task_complexity(user_request: str) -> dict:
         "{\n  \"task_type\": \"<type>\",\n  \"difficulty\": \"<Simple/Moderate/Difficult>\"\n}"
     )
 
-    prompt = f"{system_hint}\n\nUser request:\n{user_request}\n\n{format_constraint}"
-
-    resp = model.invoke([HumanMessage(content=prompt)])
+    # Static instructions first so classification calls share a cacheable prefix
+    resp = model.invoke(
+        [SystemMessage(content=f"{system_hint}\n\n{format_constraint}"), HumanMessage(content=f"User request:\n{user_request}")],
+        config={"run_name": "classify_task_complexity"},
+    )
     content = resp.content if isinstance(resp.content, str) else str(resp.content)
 
-    # Best-effort parse; if parsing fails, return conservative default
-    import json
+    # Best-effort parse; the caller falls back to a default it does not cache
     try:
         data = json.loads(content)
         # minimal validation
@@ -119,4 +125,26 @@ def classify_task_complexity(user_request: str) -> dict:
     except Exception:
         pass
 
-    return {"task_type": "General Inquiry", "difficulty": "Moderate"}
+    return None
+
+
+@tool(parse_docstring=True)
+def classify_task_complexity(user_request: str) -> dict:
+    """Classify the user request for TODO complexity and type.
+
+    Args:
+        user_request: The raw user query to analyze.
+
+    Returns:
+        dict: A JSON-compatible dict with exactly two keys:
+            - task_type: Task type (e.g., Course Planning / Program Info / Career Advice / International Support / Comparison / General Inquiry)
+            - difficulty: Difficulty level (Simple / Moderate / Difficult)
+
+    Example:
+        {
+          "task_type": "Comparison",
+          "difficulty": "Moderate"
+        }
+    """
+    # Confident cases are answered locally; only ambiguous ones call the LLM
+    return get_classifier().classify(user_request, llm_fallback=classify_with_llm)
@@ -0,0 +1,354 @@
+"""Local latency tracing with nested spans exported as OpenTelemetry-style JSONL.
+
+Spans come from two sources and nest into one tree per turn:
+- `span()` wraps pipeline steps explicitly (Tavily search, page fetch,
+  markdown conversion, summarization, sub-agent runs). The active span
+  is tracked in a context variable, which follows asyncio tasks and
+  `asyncio.to_thread` calls.
+- `TracingCallbackHandler` turns LangChain callbacks into spans for the graph
+  run, every graph node, every tool call and every model call.
+
+Tracing is off until `configure_tracing()` is called (or ADVISOR_TRACE_PATH is
+set); while off, `span()` does nothing beyond a context-variable lookup.
+Each finished span is appended to the JSONL file as one OTLP/JSON export
+request ({"resourceSpans": [{"resource", "scopeSpans": [{"scope", "spans"}]}]}),
+the line format of the OpenTelemetry Collector's file exporter, so the file can
+be replayed into any OTLP/JSON-aware tool.
+"""
+
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+TRACE_PATH_ENV = "ADVISOR_TRACE_PATH"
+SERVICE_NAME = "unsw-advisor"
+SCOPE_NAME = "src.tracing"
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# OTLP status codes
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+@dataclass
+class Span:
+    """One timed operation in a trace."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: str | None = None
+    kind: int = SPAN_KIND_INTERNAL
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int | None = None
+    attributes: dict = field(default_factory=dict)
+    status_code: int = STATUS_UNSET
+    status_message: str = ""
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(span: Span) -> dict:
+    """Convert a span to an OTLP/JSON span object."""
+    data = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+        "status": {"code": span.status_code, **({"message": span.status_message} if span.status_message else {})},
+    }
+    if span.parent_span_id:
+        data["parentSpanId"] = span.parent_span_id
+    return data
+
+
+def to_otlp_request(spans: list[Span]) -> dict:
+    """Wrap spans in an OTLP/JSON export request with this service's resource and scope."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": SCOPE_NAME}, "spans": [to_otlp(s) for s in spans]}],
+            }
+        ]
+    }
+
+
+def iter_otlp_spans(request: dict):
+    """Yield the span objects of one OTLP/JSON export request (one line of a trace file)."""
+    for resource_spans in request.get("resourceSpans", []):
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            yield from scope_spans.get("spans", [])
+
+
+class JSONLSpanExporter:
+    """Append finished spans to a local JSONL file, one OTLP/JSON export request per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(to_otlp_request([span]), ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+_exporter: JSONLSpanExporter | None = None
+_current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar("advisor_current_span", default=None)
+
+
+def configure_tracing(path: str | None = None) -> JSONLSpanExporter | None:
+    """Enable tracing to a JSONL file (default: $ADVISOR_TRACE_PATH); None disables it."""
+    global _exporter
+    path = path or os.environ.get(TRACE_PATH_ENV)
+    _exporter = JSONLSpanExporter(path) if path else None
+    return _exporter
+
+
+def tracing_enabled() -> bool:
+    return _exporter is not None
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def annotate(attributes: dict) -> None:
+    """Add attributes to the current span (no-op while tracing is off)."""
+    span_ = _current_span.get()
+    if span_ is not None and _exporter is not None:
+        span_.attributes.update(attributes)
+
+
+def start_span(name: str, parent: Span | None = None, kind: int = SPAN_KIND_INTERNAL, **attributes) -> Span:
+    """Create a span under `parent` (default: the current span), without activating it."""
+    parent = parent if parent is not None else _current_span.get()
+    return Span(
+        name=name,
+        trace_id=parent.trace_id if parent else secrets.token_hex(16),
+        span_id=secrets.token_hex(8),
+        parent_span_id=parent.span_id if parent else None,
+        kind=kind,
+        attributes=attributes,
+    )
+
+
+def end_span(span: Span) -> None:
+    """Finish a span and export it."""
+    span.end_ns = time.time_ns()
+    if span.status_code == STATUS_UNSET:
+        span.status_code = STATUS_OK
+    if _exporter is not None:
+        _exporter.export(span)
+
+
+@contextmanager
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+    """Time the enclosed block as a child of the current span.
+
+    Yields the Span (or None while tracing is off) so callers can add attributes.
+    """
+    if _exporter is None:
+        yield None
+        return
+    span_ = start_span(name, kind=kind, **attributes)
+    token = _current_span.set(span_)
+    try:
+        yield span_
+    except BaseException as e:
+        span_.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        end_span(span_)
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Turn LangChain callbacks into spans for graph nodes, tools and model calls.
+
+    Only the outermost graph run and LangGraph node runs become chain spans; the
+    many internal runnables (channel writes, routers, sequences) are skipped and
+    their children attach to the nearest traced ancestor.
+    """
+
+    # Called in the caller's context so that spans opened here become the
+    # parent of explicit span() calls made inside tools
+    run_inline = True
+
+    def __init__(self):
+        self._spans: dict[UUID, Span] = {}
+        self._parents: dict[UUID, UUID | None] = {}
+        self._previous: dict[UUID, Span | None] = {}
+        self._own_span_ids: set[str] = set()
+        self._lock = threading.Lock()
+
+    def _ancestor_span(self, parent_run_id: UUID | None) -> Span | None:
+        with self._lock:
+            run_id = parent_run_id
+            while run_id is not None:
+                if run_id in self._spans:
+                    return self._spans[run_id]
+                run_id = self._parents.get(run_id)
+        return None
+
+    def _parent_span(self, parent_run_id: UUID | None) -> Span | None:
+        ancestor = self._ancestor_span(parent_run_id)
+        active = _current_span.get()
+        # An explicit span opened inside the traced ancestor (e.g. "summarize"
+        # inside a search tool) is the closer parent
+        if ancestor is None or (
+            active is not None
+            and active.trace_id == ancestor.trace_id
+            and active.start_ns >= ancestor.start_ns
+            and active.span_id not in self._own_span_ids
+        ):
+            return active
+        return ancestor
+
+    def _start(
+        self, run_id: UUID, parent_run_id: UUID | None, name: str, kind: int, attributes: dict, activate: bool = False
+    ) -> None:
+        span_ = start_span(name, parent=self._parent_span(parent_run_id), kind=kind, **attributes)
+        with self._lock:
+            self._spans[run_id] = span_
+            self._own_span_ids.add(span_.span_id)
+            if activate:
+                self._previous[run_id] = _current_span.get()
+        if activate:
+            _current_span.set(span_)
+
+    def _end(self, run_id: UUID, error: BaseException | None = None, **attributes) -> None:
+        with self._lock:
+            self._parents.pop(run_id, None)
+            span_ = self._spans.pop(run_id, None)
+            activated = run_id in self._previous
+            previous = self._previous.pop(run_id, None)
+        if span_ is None:
+            return
+        with self._lock:
+            self._own_span_ids.discard(span_.span_id)
+        if activated and _current_span.get() is span_:
+            _current_span.set(previous)
+        span_.attributes.update(attributes)
+        if error is not None:
+            span_.record_error(error)
+        end_span(span_)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        if _exporter is None:
+            return
+        metadata = metadata or {}
+        name = kwargs.get("name") or (serialized or {}).get("name", "chain")
+        node = metadata.get("langgraph_node")
+        ancestor = self._ancestor_span(parent_run_id)
+        # A node whose runnable carries the node's own name (e.g. RunnableLambda
+        # "speculate") would otherwise be traced twice
+        namespace = metadata.get("langgraph_checkpoint_ns", "")
+        is_node = node and name == node and not (
+            ancestor
+            and ancestor.attributes.get("langgraph.node") == node
+            and ancestor.attributes.get("langgraph.checkpoint_ns") == namespace
+        )
+        if parent_run_id is None:
+            self._start(run_id, None, f"graph {name}", SPAN_KIND_SERVER, {"langgraph.graph": name})
+        elif is_node:
+            self._start(
+                run_id, parent_run_id, f"node {node}", SPAN_KIND_INTERNAL,
+                {
+                    "langgraph.node": node,
+                    "langgraph.step": metadata.get("langgraph_step", -1),
+                    "langgraph.checkpoint_ns": namespace,
+                },
+            )
+        else:
+            with self._lock:
+                self._parents[run_id] = parent_run_id
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        if _exporter is None:
+            return
+        name = kwargs.get("name") or (serialized or {}).get("name", "tool")
+        # Tool spans become the current span while the tool body runs
+        self._start(run_id, parent_run_id, f"tool {name}", SPAN_KIND_INTERNAL, {"tool.name": name}, activate=True)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        if _exporter is None:
+            return
+        model = (metadata or {}).get("ls_model_name") or (serialized or {}).get("name", "chat_model")
+        self._start(
+            run_id, parent_run_id, f"llm {model}", SPAN_KIND_CLIENT,
+            {"gen_ai.request.model": model, "gen_ai.prompt.messages": sum(len(m) for m in messages)},
+        )
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        if _exporter is None:
+            return
+        model = (metadata or {}).get("ls_model_name") or (serialized or {}).get("name", "llm")
+        self._start(run_id, parent_run_id, f"llm {model}", SPAN_KIND_CLIENT, {"gen_ai.request.model": model})
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        usage = {}
+        for generations in response.generations:
+            for generation in generations:
+                metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                usage["gen_ai.usage.input_tokens"] = usage.get("gen_ai.usage.input_tokens", 0) + metadata.get("input_tokens", 0)
+                usage["gen_ai.usage.output_tokens"] = usage.get("gen_ai.usage.output_tokens", 0) + metadata.get("output_tokens", 0)
+        self._end(run_id, **usage)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=error)
+
+
+def tracing_callbacks() -> list:
+    """Callbacks to pass in a run config: a fresh handler while tracing is on, else []."""
+    return [TracingCallbackHandler()] if _exporter is not None else []
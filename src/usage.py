@@ -0,0 +1,300 @@
+"""Token and cost accounting per request, tool and sub-agent.
+
+A `UsageCallbackHandler` is attached to each request's run config. For every
+model call it records prompt and completion tokens (from the response's usage
+metadata, or a tiktoken estimate when the provider reports none) and attributes
+them to the code path that made the call:
+- "main_agent"                  the advisor's own reasoning steps
+- "subagent:<name>"             any model call inside a delegated sub-agent
+- "<helper>"                    summarize_webpage_content and classify_task_complexity
+                                calls (prefixed with the sub-agent when made inside one)
+
+Records are collected in a process-wide `UsageLedger`, which keeps running
+process totals and the records of requests still in progress (dropped when the
+request finishes), and, when ADVISOR_USAGE_LOG is set, appended to a JSONL file
+for offline analysis.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import asdict, dataclass
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+USAGE_LOG_ENV = "ADVISOR_USAGE_LOG"
+
+# USD per million tokens: (input, output)
+PRICES_PER_MTOK = {
+    "qwen-flash": (0.05, 0.40),
+}
+DEFAULT_MODEL = "qwen-flash"
+
+# Model calls made under these tools belong to the delegated sub-agent
+DELEGATION_TOOLS = frozenset({"task", "parallel_task"})
+
+# Helper calls reported separately (tool names or run names of the runs making the call)
+HELPER_SOURCES = frozenset({"summarize_webpage_content", "classify_task_complexity"})
+
+_encoder = None
+_encoder_failed = False
+
+
+def _model_price(model: str) -> tuple[float, float]:
+    """Return (input, output) USD per million tokens, honouring env overrides."""
+    input_price, output_price = PRICES_PER_MTOK.get(model, PRICES_PER_MTOK[DEFAULT_MODEL])
+    return (
+        float(os.environ.get("ADVISOR_INPUT_PRICE_PER_MTOK", input_price)),
+        float(os.environ.get("ADVISOR_OUTPUT_PRICE_PER_MTOK", output_price)),
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate a token count with tiktoken, or ~4 characters per token without it."""
+    global _encoder, _encoder_failed
+    if _encoder is None and not _encoder_failed:
+        try:
+            import tiktoken
+
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # tiktoken downloads its tables on first use; offline hosts fall back
+            _encoder_failed = True
+    if _encoder is not None:
+        return len(_encoder.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4) if text else 0
+
+
+def _message_text(message) -> str:
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content, default=str)
+    tool_calls = getattr(message, "tool_calls", None)
+    return content + (json.dumps(tool_calls, default=str) if tool_calls else "")
+
+
+@dataclass
+class UsageRecord:
+    """Tokens used by one model call."""
+
+    request_id: str
+    source: str
+    model: str
+    input_tokens: int
+    output_tokens: int
+    estimated: bool
+    cost_usd: float
+    timestamp: float
+
+
+class UsageTotals:
+    """Running token and cost totals, overall and per source."""
+
+    def __init__(self):
+        self.requests = 0
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost_usd = 0.0
+        self.estimated_calls = 0
+        self.by_source = defaultdict(lambda: {"calls": 0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0})
+
+    def add(self, record: UsageRecord) -> None:
+        self.calls += 1
+        self.input_tokens += record.input_tokens
+        self.output_tokens += record.output_tokens
+        self.cost_usd += record.cost_usd
+        self.estimated_calls += record.estimated
+        entry = self.by_source[record.source]
+        entry["calls"] += 1
+        entry["input_tokens"] += record.input_tokens
+        entry["output_tokens"] += record.output_tokens
+        entry["cost_usd"] += record.cost_usd
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "calls": self.calls,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": self.cost_usd,
+            "estimated_calls": self.estimated_calls,
+            "by_source": {
+                source: dict(entry)
+                for source, entry in sorted(self.by_source.items(), key=lambda item: item[1]["cost_usd"], reverse=True)
+            },
+        }
+
+
+class UsageLedger:
+    """Thread-safe usage accounting: process totals plus the records of open requests.
+
+    A request's records are kept until `finish(request_id)`; requests never
+    finished (a failed turn) are evicted oldest first past `max_open_requests`,
+    so memory stays bounded in long-running servers and batches.
+    """
+
+    def __init__(self, log_path: str | None = None, max_open_requests: int = 1000):
+        self.log_path = log_path
+        self.max_open_requests = max_open_requests
+        self._open: OrderedDict[str, list[UsageRecord]] = OrderedDict()
+        self._totals = UsageTotals()
+        self._lock = threading.Lock()
+
+    def add(self, record: UsageRecord) -> None:
+        with self._lock:
+            records = self._open.get(record.request_id)
+            if records is None:
+                records = self._open[record.request_id] = []
+                self._totals.requests += 1
+                while len(self._open) > self.max_open_requests:
+                    self._open.popitem(last=False)
+            records.append(record)
+            self._totals.add(record)
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+
+    def report(self, request_id: str | None = None) -> dict:
+        """Aggregate tokens and cost by source, for one open request or the whole process."""
+        with self._lock:
+            if request_id is None:
+                return self._totals.as_dict()
+            records = list(self._open.get(request_id, ()))
+        return summarize_records(records)
+
+    def finish(self, request_id: str) -> None:
+        """Drop a finished request's records (they stay in the process totals)."""
+        with self._lock:
+            self._open.pop(request_id, None)
+
+
+def summarize_records(records: list[UsageRecord]) -> dict:
+    """Aggregate records into totals and a per-source breakdown (most expensive first).
+
+    Returns:
+        Dict with requests, calls, input_tokens, output_tokens, cost_usd,
+        estimated_calls and by_source {source: {calls, input_tokens, output_tokens, cost_usd}}
+    """
+    totals = UsageTotals()
+    for record in records:
+        totals.add(record)
+    totals.requests = len({r.request_id for r in records})
+    return totals.as_dict()
+
+
+def format_usage_report(report: dict) -> str:
+    """Multi-line human-readable usage report."""
+    lines = [
+        f"{report['input_tokens']:,} in / {report['output_tokens']:,} out tokens, "
+        f"${report['cost_usd']:.5f} over {report['calls']} model call(s)"
+        + (f" ({report['estimated_calls']} estimated)" if report["estimated_calls"] else "")
+    ]
+    for source, entry in report["by_source"].items():
+        lines.append(
+            f"  {source:<50} {entry['calls']:>4} call(s) {entry['input_tokens']:>8,} in "
+            f"{entry['output_tokens']:>7,} out  ${entry['cost_usd']:.5f}"
+        )
+    return "\n".join(lines)
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """Record the token usage of every model call in one request."""
+
+    def __init__(self, request_id: str, ledger: "UsageLedger"):
+        self.request_id = request_id
+        self.ledger = ledger
+        self._runs: dict[UUID, tuple[UUID | None, str, str]] = {}
+        self._calls: dict[UUID, tuple[str, str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _remember(self, run_id: UUID, parent_run_id: UUID | None, kind: str, name: str) -> None:
+        with self._lock:
+            self._runs[run_id] = (parent_run_id, kind, name)
+
+    def _attribute(self, parent_run_id: UUID | None, run_name: str | None) -> str:
+        """Attribute a model call by walking up its chain of parent runs."""
+        helper = run_name if run_name in HELPER_SOURCES else None
+        subagent = None
+        with self._lock:
+            run_id, child_name = parent_run_id, None
+            while run_id is not None and run_id in self._runs:
+                parent, kind, name = self._runs[run_id]
+                if helper is None and name in HELPER_SOURCES:
+                    helper = name
+                if kind == "tool" and name in DELEGATION_TOOLS and child_name:
+                    # The chain directly under a delegation tool is the sub-agent graph
+                    subagent = child_name
+                    break
+                child_name = name if kind == "chain" else child_name
+                run_id = parent
+        prefix = f"subagent:{subagent}" if subagent else None
+        if helper:
+            return f"{prefix}/{helper}" if prefix else helper
+        return prefix or "main_agent"
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        self._remember(run_id, parent_run_id, "chain", kwargs.get("name") or (serialized or {}).get("name", ""))
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        self._remember(run_id, parent_run_id, "tool", kwargs.get("name") or (serialized or {}).get("name", ""))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        model = (metadata or {}).get("ls_model_name") or DEFAULT_MODEL
+        source = self._attribute(parent_run_id, kwargs.get("name"))
+        prompt_tokens = sum(estimate_tokens(_message_text(m)) for batch in messages for m in batch)
+        with self._lock:
+            self._calls[run_id] = (source, model, prompt_tokens)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            call = self._calls.pop(run_id, None)
+        if call is None:
+            return
+        source, model, estimated_prompt = call
+
+        input_tokens = output_tokens = 0
+        estimated = False
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                if usage:
+                    input_tokens += usage.get("input_tokens", 0)
+                    output_tokens += usage.get("output_tokens", 0)
+                else:
+                    estimated = True
+                    input_tokens += estimated_prompt
+                    output_tokens += estimate_tokens(_message_text(message) if message else generation.text)
+
+        input_price, output_price = _model_price(model)
+        self.ledger.add(
+            UsageRecord(
+                request_id=self.request_id,
+                source=source,
+                model=model,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                estimated=estimated,
+                cost_usd=(input_tokens * input_price + output_tokens * output_price) / 1_000_000,
+                timestamp=time.time(),
+            )
+        )
+
+
+# Shared ledger instance - initialize lazily on first use
+_ledger = None
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Get the process-wide usage ledger (logging to $ADVISOR_USAGE_LOG if set)."""
+    global _ledger
+    if _ledger is None:
+        _ledger = UsageLedger(log_path=os.environ.get(USAGE_LOG_ENV))
+    return _ledger
+
+
+def usage_callbacks(request_id: str) -> list:
+    """Callbacks recording a request's token usage into the shared ledger."""
+    return [UsageCallbackHandler(request_id, get_usage_ledger())]
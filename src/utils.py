@@ -1,10 +1,13 @@
 """Utility functions for displaying messages and prompts in Jupyter notebooks."""
 
 import json
+import time
+from dataclasses import dataclass, field
 
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
 
 console = Console()
 
@@ -123,3 +126,163 @@ async def stream_agent(agent, query, config=None):
             current_state = event
 
     return current_state
+
+
+@dataclass
+class TurnTimings:
+    """Latency milestones of one streamed turn, in seconds from the start."""
+
+    time_to_first_token: float | None = None
+    time_to_first_tool_result: float | None = None
+    total: float | None = None
+    tool_calls: int = 0
+    events: list[tuple[float, str]] = field(default_factory=list, repr=False)
+
+    def as_dict(self) -> dict:
+        return {
+            "time_to_first_token": self.time_to_first_token,
+            "time_to_first_tool_result": self.time_to_first_tool_result,
+            "total": self.total,
+            "tool_calls": self.tool_calls,
+        }
+
+
+def _iter_updates(update):
+    """Yield the state-update dicts of a node (ToolNode may emit a list of them)."""
+    if isinstance(update, dict):
+        yield update
+    elif isinstance(update, (list, tuple)):
+        for item in update:
+            if isinstance(item, dict):
+                yield item
+            elif hasattr(item, "update") and isinstance(item.update, dict):
+                yield item.update
+
+
+def _message_text(message) -> str:
+    if isinstance(message.content, str):
+        return message.content
+    return "".join(
+        part.get("text", "") for part in message.content if isinstance(part, dict) and part.get("type") == "text"
+    )
+
+
+async def iter_agent_events(agent, query, config=None, timings: TurnTimings | None = None):
+    """Stream a turn as progress events, with final-answer tokens as they arrive.
+
+    Builds on the same `astream(..., subgraphs=True)` loop as stream_agent and
+    yields plain dicts:
+    - {"type": "token", "text"}: text generated by the main agent
+    - {"type": "tool_start", "name", "args", "subagent"}: a tool call was issued
+    - {"type": "tool_result", "name", "content", "subagent"}: a tool finished
+    - {"type": "final", "state"}: the final graph state (always last)
+
+    `subagent` is True for events raised inside a delegated sub-agent.
+
+    Args:
+        agent: Compiled advisor graph
+        query: Graph input (e.g. {"messages": [...]})
+        config: Optional run config
+        timings: Optional TurnTimings filled in with time to first token / tool result
+    """
+    timings = timings if timings is not None else TurnTimings()
+    start = time.perf_counter()
+    final_state = None
+
+    async for namespace, stream_mode, event in agent.astream(
+        query,
+        stream_mode=["messages", "updates", "values"],
+        subgraphs=True,
+        config=config,
+    ):
+        now = time.perf_counter() - start
+        depth = len(namespace)
+
+        if stream_mode == "messages":
+            chunk, metadata = event
+            # Only the main agent's own model output is streamed as text
+            if depth == 1 and metadata.get("langgraph_node") == "agent" and isinstance(chunk, (AIMessageChunk, AIMessage)):
+                text = _message_text(chunk)
+                if text:
+                    if timings.time_to_first_token is None:
+                        timings.time_to_first_token = now
+                    yield {"type": "token", "text": text}
+
+        elif stream_mode == "updates":
+            for node, update in event.items():
+                if depth == 0 and node == "agent":
+                    # The agent subgraph's final output repeats messages already seen inside it
+                    continue
+                for item in _iter_updates(update):
+                    for message in item.get("messages", []) or []:
+                        if isinstance(message, AIMessage) and message.tool_calls:
+                            for call in message.tool_calls:
+                                timings.tool_calls += 1
+                                timings.events.append((now, f"tool_start:{call['name']}"))
+                                yield {"type": "tool_start", "name": call["name"], "args": call["args"], "subagent": depth > 1}
+                        elif isinstance(message, ToolMessage):
+                            if timings.time_to_first_tool_result is None:
+                                timings.time_to_first_tool_result = now
+                            timings.events.append((now, f"tool_result:{message.name}"))
+                            yield {"type": "tool_result", "name": message.name, "content": _message_text(message), "subagent": depth > 1}
+
+        elif stream_mode == "values" and depth == 0:
+            final_state = event
+
+    timings.total = time.perf_counter() - start
+    yield {"type": "final", "state": final_state}
+
+
+async def stream_agent_cli(agent, query, config=None) -> tuple[dict, TurnTimings]:
+    """Run one turn, printing answer tokens and tool / sub-agent progress live.
+
+    Args:
+        agent: Compiled advisor graph
+        query: Graph input (e.g. {"messages": [...]})
+        config: Optional run config
+
+    Returns:
+        (final state, TurnTimings for the turn)
+    """
+    timings = TurnTimings()
+    final_state = None
+    streaming_text = False
+
+    async for event in iter_agent_events(agent, query, config=config, timings=timings):
+        if event["type"] == "token":
+            if not streaming_text:
+                console.print("\n🤖 ", end="")
+                streaming_text = True
+            console.print(event["text"], end="", markup=False, highlight=False, soft_wrap=True)
+            continue
+
+        if streaming_text:
+            console.print()
+            streaming_text = False
+
+        prefix = "   ↳ sub-agent " if event.get("subagent") else ""
+        if event["type"] == "tool_start":
+            if event["name"] in ("task", "parallel_task"):
+                console.print(f"{prefix}🧑‍🤝‍🧑 Delegating: {json.dumps(event['args'], ensure_ascii=False)[:200]}", style="magenta")
+            else:
+                console.print(f"{prefix}🔧 {event['name']}", style="dim")
+        elif event["type"] == "tool_result":
+            console.print(f"{prefix}✅ {event['name']} done", style="dim")
+        elif event["type"] == "final":
+            final_state = event["state"]
+
+    if streaming_text:
+        console.print()
+    return final_state, timings
+
+
+def format_turn_timings(timings: TurnTimings) -> str:
+    """One-line summary of a turn's latency milestones."""
+    def _fmt(value):
+        return f"{value:.2f}s" if value is not None else "n/a"
+
+    return (
+        f"TTFT {_fmt(timings.time_to_first_token)} | "
+        f"first tool result {_fmt(timings.time_to_first_tool_result)} | "
+        f"total {_fmt(timings.total)} | tool calls {timings.tool_calls}"
+    )
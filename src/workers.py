@@ -0,0 +1,173 @@
+"""Pre-fork worker pool for server mode.
+
+One process cannot use more than one core for the CPU-bound parts of a turn
+(markdownify, JSON and prompt work all hold the GIL). In worker mode the parent
+process forks N workers, each building its own advisor and serving it with
+src.server on a private port, and then runs a thin front router:
+- Sessions are pinned to a worker by a stable hash of the session id, so a
+  session's conversation state (kept in that worker's checkpointer) is always
+  found again.
+- Workers share search, page and summary results through the SQLite cache of
+  src.cache, so a page fetched by one worker is reused by all of them.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+import uuid
+import zlib
+from typing import Callable
+
+import aiohttp
+import httpx
+from aiohttp import web
+
+from src.cache import CACHE_PATH_ENV, reset_cache
+from src.server import run_server
+
+logger = logging.getLogger(__name__)
+
+WORKERS_KEY = web.AppKey("worker_urls", list)
+CLIENT_KEY = web.AppKey("client_session", aiohttp.ClientSession)
+
+# Headers of a worker response that are passed back to the client
+_FORWARDED_HEADERS = ("Content-Type", "Cache-Control", "Retry-After", "X-Session-Id")
+
+
+def worker_for_session(session_id: str, workers: int) -> int:
+    """Stable worker index for a session (the same in every process and run)."""
+    return zlib.crc32(session_id.encode("utf-8")) % workers
+
+
+def _worker_main(index: int, port: int, agent_factory: Callable, server_options: dict) -> None:
+    # The parent's cache connection must not be reused across fork
+    reset_cache()
+    agent = agent_factory()
+    logger.info("Worker %d (pid %d) serving on port %d", index, os.getpid(), port)
+    run_server(agent, host="127.0.0.1", port=port, quiet=True, **server_options)
+
+
+async def handle_chat(request: web.Request) -> web.StreamResponse:
+    """Forward a chat turn to the session's worker and relay its SSE stream."""
+    try:
+        body = await request.json()
+    except ValueError:
+        return web.json_response({"error": "Request body must be JSON."}, status=400)
+    body["session_id"] = body.get("session_id") or uuid.uuid4().hex
+    workers = request.app[WORKERS_KEY]
+    url = workers[worker_for_session(body["session_id"], len(workers))]
+
+    try:
+        upstream = await request.app[CLIENT_KEY].post(f"{url}/chat", json=body)
+    except aiohttp.ClientError:
+        return web.json_response(
+            {"error": "The advisor worker is unavailable, please retry shortly."},
+            status=503,
+            headers={"Retry-After": "5"},
+        )
+
+    async with upstream:
+        headers = {k: upstream.headers[k] for k in _FORWARDED_HEADERS if k in upstream.headers}
+        response = web.StreamResponse(status=upstream.status, headers=headers)
+        await response.prepare(request)
+        async for chunk in upstream.content.iter_any():
+            await response.write(chunk)
+        await response.write_eof()
+        return response
+
+
+async def handle_health(request: web.Request) -> web.Response:
+    """Aggregate the health of all workers."""
+    async def _one(url):
+        try:
+            async with request.app[CLIENT_KEY].get(f"{url}/health") as resp:
+                return await resp.json()
+        except aiohttp.ClientError as e:
+            return {"status": "down", "error": str(e)}
+
+    workers = await asyncio.gather(*[_one(url) for url in request.app[WORKERS_KEY]])
+    status = "ok" if all(w.get("status") == "ok" for w in workers) else "degraded"
+    return web.json_response({"status": status, "workers": workers})
+
+
+def create_router_app(worker_urls: list[str]) -> web.Application:
+    """Create the front router application for the given worker base URLs."""
+    app = web.Application()
+    app[WORKERS_KEY] = worker_urls
+
+    async def _client(app):
+        # No total timeout: SSE streams last as long as the turn does
+        app[CLIENT_KEY] = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None, sock_connect=5))
+        yield
+        await app[CLIENT_KEY].close()
+
+    app.cleanup_ctx.append(_client)
+    app.router.add_post("/chat", handle_chat)
+    app.router.add_get("/health", handle_health)
+    return app
+
+
+def _wait_until_ready(urls: list[str], processes: list, timeout: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout
+    pending = list(urls)
+    while pending and time.monotonic() < deadline:
+        if any(not p.is_alive() for p in processes):
+            raise RuntimeError("A worker process exited during startup")
+        for url in list(pending):
+            try:
+                if httpx.get(f"{url}/health", timeout=1.0).status_code == 200:
+                    pending.remove(url)
+            except httpx.HTTPError:
+                pass
+        time.sleep(0.2)
+    if pending:
+        raise RuntimeError(f"Workers did not become ready: {pending}")
+
+
+def run_worker_pool(
+    agent_factory: Callable,
+    workers: int,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    **server_options,
+) -> None:
+    """Fork worker processes and route sessions to them until interrupted.
+
+    Args:
+        agent_factory: Zero-argument callable building a compiled advisor graph;
+            called once inside every worker after the fork
+        workers: Number of worker processes
+        host: Front router bind address
+        port: Front router port; workers use the following `workers` ports on 127.0.0.1
+        **server_options: Passed to each worker's AdvisorServer
+    """
+    # Workers share one cache file unless the caller configured one already
+    if not os.environ.get(CACHE_PATH_ENV):
+        os.environ[CACHE_PATH_ENV] = os.path.join(tempfile.gettempdir(), f"unsw_advisor_cache_{os.getpid()}.sqlite")
+
+    context = multiprocessing.get_context("fork")
+    worker_ports = [port + 1 + i for i in range(workers)]
+    processes = [
+        context.Process(
+            target=_worker_main,
+            args=(i, worker_port, agent_factory, server_options),
+            name=f"advisor-worker-{i}",
+            daemon=True,
+        )
+        for i, worker_port in enumerate(worker_ports)
+    ]
+    for process in processes:
+        process.start()
+
+    urls = [f"http://127.0.0.1:{worker_port}" for worker_port in worker_ports]
+    try:
+        _wait_until_ready(urls, processes)
+        web.run_app(create_router_app(urls), host=host, port=port)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(timeout=5)
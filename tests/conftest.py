@@ -0,0 +1,6 @@
+"""Shared pytest setup: make the project root importable as in scripts/."""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
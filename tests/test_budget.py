@@ -0,0 +1,83 @@
+"""Tests for the per-difficulty turn budgets."""
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.budget import (
+    NOTICE_NAME,
+    SPECULATIVE_ID_PREFIX,
+    BudgetController,
+    select_tool_names,
+    turn_usage,
+)
+from src.search_tools import search_career_opportunities, search_unsw_programs
+from src.stubs import StubChatModel
+
+SIMPLE_CAREER = {"task_type": "Career Advice", "difficulty": "Simple"}
+
+
+def _call(name: str, call_id: str, **args) -> dict:
+    return {"name": name, "args": args, "id": call_id, "type": "tool_call"}
+
+
+def _speculated_turn(question: str) -> list:
+    """A turn as the speculation stage leaves it: classification plus a speculative search."""
+    classify = _call("classify_task_complexity", f"{SPECULATIVE_ID_PREFIX}a", user_request=question)
+    search = _call("search_unsw_programs", f"{SPECULATIVE_ID_PREFIX}b", query=f"UNSW {question}")
+    return [
+        HumanMessage(content=question),
+        AIMessage(content="", tool_calls=[classify, search]),
+        ToolMessage(str(SIMPLE_CAREER), name="classify_task_complexity", tool_call_id=classify["id"]),
+        ToolMessage("🔍 Found 1 result(s)", name="search_unsw_programs", tool_call_id=search["id"]),
+    ]
+
+
+def test_speculative_calls_do_not_count():
+    state = {"messages": _speculated_turn("What jobs can I get with a Master of IT?"), "task_classification": SIMPLE_CAREER}
+    usage = turn_usage(state)
+    assert usage["tool_calls"] == 0
+    assert not usage["exhausted"]
+
+
+def test_simple_career_question_can_make_its_one_real_call():
+    question = "What jobs can I get with a Master of IT?"
+    state = {"messages": _speculated_turn(question), "task_classification": SIMPLE_CAREER}
+    controller = BudgetController(StubChatModel(), [search_unsw_programs, search_career_opportunities])
+
+    # Before its first step the agent still has its search tool and no final-answer notice
+    assert controller.select_model(state).tool_names == ("search_career_opportunities",)
+    assert controller.pre_model_hook(state)["llm_input_messages"] == state["messages"]
+
+    call = _call("search_career_opportunities", "call_1", query=question)
+    state["messages"] += [AIMessage(content="", tool_calls=[call]), ToolMessage("jobs", tool_call_id="call_1")]
+    usage = turn_usage(state)
+    assert (usage["tool_calls"], usage["exhausted"], usage["reason"]) == (1, True, "tool-call")
+    assert controller.select_model(state).tool_names == ()
+    assert controller.pre_model_hook(state)["llm_input_messages"][-1].name == NOTICE_NAME
+
+
+def test_parallel_batch_counts_as_one_round_and_bookkeeping_is_free():
+    calls = [_call("search_course_details", "1", query="a", course_code="COMP9020"),
+             _call("search_course_details", "2", query="b", course_code="COMP9021")]
+    messages = [
+        HumanMessage(content="old question"),
+        AIMessage(content="", tool_calls=[_call("search_unsw_programs", "0", query="old")]),
+        HumanMessage(content="Compare COMP9020 and COMP9021"),
+        AIMessage(content="", tool_calls=[_call("think_tool", "t", reflection="plan")]),
+        AIMessage(content="", tool_calls=calls),
+    ]
+    usage = turn_usage({"messages": messages, "task_classification": {"difficulty": "Moderate"}})
+    assert usage["tool_calls"] == 1
+    assert not usage["exhausted"]
+
+
+def test_time_budget():
+    usage = turn_usage({"messages": [], "task_classification": {"difficulty": "Simple"}, "turn_started_at": 100.0}, now=131.0)
+    assert usage["reason"] == "time"
+
+
+def test_select_tool_names():
+    assert select_tool_names(None) is None
+    assert select_tool_names({"task_type": "Career Advice", "difficulty": "Difficult"}) is None
+    assert select_tool_names(SIMPLE_CAREER) == {
+        "search_career_opportunities", "ls", "read_file", "write_todos", "read_todos"
+    }
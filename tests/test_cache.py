@@ -0,0 +1,117 @@
+"""Tests for the memory and shared SQLite caches and stale-while-revalidate loading."""
+
+import threading
+import time
+
+import pytest
+
+from src import cache as cache_module
+from src.cache import STALE_TTLS, MemoryCache, Refresher, SQLiteCache
+
+
+@pytest.fixture
+def sqlite_cache(tmp_path):
+    return SQLiteCache(str(tmp_path / "cache.sqlite"))
+
+
+@pytest.mark.parametrize("make", [lambda tmp: MemoryCache(), lambda tmp: SQLiteCache(str(tmp / "c.sqlite"))])
+def test_fresh_stale_and_expired(make, tmp_path):
+    cache = make(tmp_path)
+    cache.set("search", "fresh", {"a": 1})
+    cache.set("search", "stale", "old", ttl=-60)
+    cache.set("search", "gone", "older", ttl=-(STALE_TTLS["search"] + 60))
+
+    assert cache.get("search", "fresh") == {"a": 1}
+    assert cache.lookup("search", "stale") == ("old", True)
+    assert cache.get("search", "stale") is None
+    assert cache.lookup("search", "gone") is None
+    assert cache.lookup("search", "missing") is None
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "shared.sqlite")
+    SQLiteCache(path).set("page", "https://example.com", "# Page")
+    other = SQLiteCache(path)
+    assert other.get("page", "https://example.com") == "# Page"
+    assert other.stats["page_shared_hits"] == 1
+
+
+def _rows(cache: SQLiteCache) -> int:
+    return cache._connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+def test_purge_keeps_entries_within_their_grace_period(sqlite_cache):
+    sqlite_cache.set("summary", "stale", "s", ttl=-60)
+    sqlite_cache.set("summary", "expired", "s", ttl=-(STALE_TTLS["summary"] + 60))
+    sqlite_cache.set("other", "expired", "s", ttl=-1)
+    assert sqlite_cache.purge_expired() == 2
+    assert _rows(sqlite_cache) == 1
+
+
+def test_purge_runs_on_open_and_every_n_writes(tmp_path):
+    path = str(tmp_path / "purge.sqlite")
+    cache = SQLiteCache(path, purge_every=3)
+    cache.set("other", "a", 1, ttl=-1)
+    cache.set("other", "b", 2, ttl=-1)
+    assert _rows(cache) == 2
+    cache.set("other", "c", 3)
+    assert _rows(cache) == 1
+
+    cache.set("other", "d", 4, ttl=-1)
+    reopened = SQLiteCache(path, purge_every=0)
+    assert _rows(reopened) == 1
+    assert reopened.stats["purged"] == 1
+
+
+def test_refresher_loads_once_for_concurrent_misses():
+    refresher = Refresher(MemoryCache())
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(refresher.load("page", "k", loader))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+    assert refresher.cache.get("page", "k") == "value"
+
+
+def test_get_or_load_serves_stale_and_refreshes(monkeypatch):
+    monkeypatch.setattr(cache_module, "_cache", MemoryCache())
+    monkeypatch.setattr(cache_module, "_refresher", None)
+    cache_module.get_cache().set("search", "k", "old", ttl=-1)
+    refreshed = threading.Event()
+
+    def loader():
+        refreshed.set()
+        return "new"
+
+    assert cache_module.get_or_load("search", "k", loader) == ("old", "stale")
+    assert refreshed.wait(5)
+    deadline = time.time() + 5
+    while cache_module.get_cache().get("search", "k") is None and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache_module.get_or_load("search", "k", loader) == ("new", "hit")
+    assert cache_module.get_or_load("search", "missing", lambda: None) == (None, "miss")
+
+
+def test_get_refresher_is_shared_across_threads(monkeypatch):
+    monkeypatch.setattr(cache_module, "_cache", MemoryCache())
+    monkeypatch.setattr(cache_module, "_refresher", None)
+    refreshers = []
+    threads = [threading.Thread(target=lambda: refreshers.append(cache_module.get_refresher())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(r) for r in refreshers}) == 1
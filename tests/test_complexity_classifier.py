@@ -0,0 +1,66 @@
+"""Tests for the local complexity classifier and its LLM fallback."""
+
+import json
+import os
+
+import pytest
+
+from src.complexity_classifier import DEFAULT_CLASSIFICATION, ComplexityClassifier, _rule_task_type
+
+AMBIGUOUS = "Tell me something interesting about studying here next year"
+
+
+def test_confident_request_is_answered_locally():
+    classifier = ComplexityClassifier()
+    calls = []
+    result = classifier.classify("What are the prerequisites for COMP9021?", llm_fallback=calls.append)
+    assert result == {"task_type": "Course Planning", "difficulty": "Simple"}
+    assert calls == []
+
+
+def test_fallback_result_is_cached():
+    classifier = ComplexityClassifier(confidence_threshold=1.1)
+    calls = []
+
+    def fallback(request):
+        calls.append(request)
+        return {"task_type": "General Inquiry", "difficulty": "Simple"}
+
+    assert classifier.classify(AMBIGUOUS, fallback)["difficulty"] == "Simple"
+    assert classifier.classify(AMBIGUOUS, fallback)["difficulty"] == "Simple"
+    assert len(calls) == 1
+
+
+def test_unparsed_fallback_is_not_cached():
+    classifier = ComplexityClassifier(confidence_threshold=1.1)
+    answers = [None, {"task_type": "Career Advice", "difficulty": "Simple"}]
+
+    assert classifier.classify(AMBIGUOUS, lambda _: answers.pop(0)) == DEFAULT_CLASSIFICATION
+    assert classifier.classify(AMBIGUOUS, lambda _: answers.pop(0))["task_type"] == "Career Advice"
+    assert classifier.stats["llm_unparsed"] == 1
+
+
+def _eval_rows():
+    path = os.path.join(os.path.dirname(__file__), "..", "scripts", "data", "classifier_eval.jsonl")
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_fast_path_accuracy_on_eval_set():
+    classifier = ComplexityClassifier()
+    confident = correct = 0
+    for row in _eval_rows():
+        predicted, confidence = classifier.predict_local(row["request"])
+        if confidence >= classifier.confidence_threshold:
+            confident += 1
+            correct += predicted == {"task_type": row["task_type"], "difficulty": row["difficulty"]}
+    assert confident >= 5
+    assert correct / confident >= 0.9
+
+
+@pytest.mark.parametrize(
+    "request_text",
+    ["Tell me about careers after the Master of Cyber Security", "What careers suit a data scientist?"],
+)
+def test_career_rule_matches_plurals(request_text):
+    assert _rule_task_type(request_text) == "Career Advice"
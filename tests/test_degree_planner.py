@@ -0,0 +1,74 @@
+"""Tests for the term-by-term degree plan solver."""
+
+from src.degree_planner import _cheapest_combinations, solve_plan
+from src.prereq_graph import PrerequisiteGraph
+
+
+def make_graph(pages: dict[str, str]) -> PrerequisiteGraph:
+    graph = PrerequisiteGraph()
+    for code, content in pages.items():
+        graph.add_page(code, content, code=code)
+    return graph
+
+
+def test_plan_orders_prerequisites():
+    graph = make_graph({
+        "COMP1511": "Offering Terms: Term 1, Term 2, Term 3",
+        "COMP1521": "Prerequisite: COMP1511\n\nOffering Terms: Term 1, Term 2, Term 3",
+        "COMP2521": "Prerequisite: COMP1511 or DPST1091, and COMP1521\n\nOffering Terms: Term 1, Term 2, Term 3",
+    })
+    plan = solve_plan(graph, ["COMP2521"], num_terms=3, max_uoc_per_term=12)
+    assert plan.feasible
+    assert [courses for _, courses, _ in plan.terms] == [["COMP1511"], ["COMP1521"], ["COMP2521"]]
+
+
+def test_plan_pulls_in_corequisites_and_their_prerequisites():
+    graph = make_graph({
+        "COMP2521": "Offering Terms: Term 1",
+        "COMP3311": "Prerequisite: COMP2521\n\nOffering Terms: Term 2",
+        "COMP3900": "Co-requisite: COMP3311\n\nOffering Terms: Term 2",
+    })
+    plan = solve_plan(graph, ["COMP3900"], num_terms=2)
+    assert plan.feasible, plan.problems
+    assert [courses for _, courses, _ in plan.terms] == [["COMP2521"], ["COMP3311", "COMP3900"]]
+
+
+def test_infeasible_plan_names_missing_corequisite():
+    graph = make_graph({
+        "COMP3311": "Offering Terms: Term 3",
+        "COMP3900": "Co-requisite: COMP3311\n\nOffering Terms: Term 1",
+    })
+    plan = solve_plan(graph, ["COMP3900"], num_terms=1)
+    assert not plan.feasible
+    assert any("co-requisite COMP3311" in problem for problem in plan.problems)
+
+
+def test_capacity_of_dropped_course_is_refilled():
+    graph = make_graph({
+        "COMP1511": "Offering Terms: Term 1, Term 2",
+        "COMP1521": "Prerequisite: COMP1511\n\nOffering Terms: Term 1, Term 2",
+        "COMP1531": "Co-requisite: COMP1521\n\nOffering Terms: Term 1, Term 2",
+        "MATH1081": "Offering Terms: Term 1, Term 2",
+    })
+    plan = solve_plan(graph, ["COMP1531", "MATH1081"], num_terms=2, max_uoc_per_term=12)
+    assert plan.feasible, plan.problems
+    # COMP1531 cannot go first (its co-requisite is not eligible); MATH1081 takes its place
+    assert plan.terms[0][1:] == (["COMP1511", "MATH1081"], 12)
+
+
+def test_cheapest_electives_chosen_from_a_large_pool():
+    pages = {f"COMP{9000 + i}": "Prerequisite: COMP1511\n\nOffering Terms: Term 1" for i in range(30)}
+    pages.update({"ZZEN9998": "Offering Terms: Term 1", "ZZEN9999": "Offering Terms: Term 1"})
+    graph = make_graph({**pages, "COMP1511": "Offering Terms: Term 1"})
+    plan = solve_plan(graph, [], elective_courses=sorted(pages), electives_required=2, num_terms=1)
+    assert plan.feasible, plan.problems
+    assert plan.electives == ["ZZEN9998", "ZZEN9999"]
+
+
+def test_cheapest_combinations_are_ordered_by_total_cost():
+    cost = {"a": 0, "b": 1, "c": 1, "d": 5}
+    combos = list(_cheapest_combinations(["a", "b", "c", "d"], 2, cost))
+    assert len(combos) == 6
+    totals = [sum(cost[c] for c in combo) for combo in combos]
+    assert totals == sorted(totals)
+    assert combos[0] == ("a", "b")
@@ -0,0 +1,67 @@
+"""Tests for query normalization and the response cache keys."""
+
+import pytest
+
+from src.fingerprint import canonical_key, code_key, extract_codes
+from src.response_cache import ResponseCache
+
+
+def test_canonical_key_folds_phrasings():
+    assert canonical_key("COMP9021 prerequisites") == canonical_key("prereqs for comp 9021?")
+
+
+def test_canonical_key_ignores_word_order_around_one_code():
+    assert canonical_key("COMP9021 term 3 offered") == canonical_key("Is COMP9021 offered in term 3?")
+
+
+def test_canonical_key_keeps_order_of_several_codes():
+    assert canonical_key("Is COMP9021 a prerequisite for COMP9024?") != canonical_key(
+        "Is COMP9024 a prerequisite for COMP9021?"
+    )
+    assert canonical_key("Does COMP3311 require COMP2521?") != canonical_key("Does COMP2521 require COMP3311?")
+
+
+def test_canonical_key_keeps_code_order_around_before_and_after():
+    forward = canonical_key("Should I take COMP9021 before COMP9020?")
+    assert forward != canonical_key("Should I take COMP9020 before COMP9021?")
+    assert forward != canonical_key("Should I take COMP9021 after COMP9020?")
+    assert forward == canonical_key("should i take comp 9021 before comp 9020")
+
+
+def test_code_key():
+    assert code_key("Is COMP9021 offered?") == ("COMP9021",)
+    assert code_key("COMP9021 and 8543") == ("comp9021", "8543")
+    assert code_key("COMP9021 before COMP9020") == ("comp9021", "before", "comp9020")
+
+
+def test_extract_codes():
+    assert extract_codes("Is comp 9021 in program 8543?") == ["8543", "COMP9021"]
+
+
+def test_response_cache_does_not_swap_course_order():
+    cache = ResponseCache()
+    cache.store("Can I take COMP9021 before COMP9020?", "Yes")
+    assert cache.lookup("Can I take COMP9021 before COMP9020 please?").answer == "Yes"
+    assert cache.lookup("Can I take COMP9020 before COMP9021?") is None
+
+
+def test_response_cache_never_matches_different_codes():
+    cache = ResponseCache()
+    cache.store("What are the prerequisites for COMP9021?", "COMP1511")
+    assert cache.lookup("What are the prerequisites for COMP9024?") is None
+
+
+@pytest.mark.parametrize(
+    "question, reversed_question",
+    [
+        ("Is COMP9021 a prerequisite for COMP9024?", "Is COMP9024 a prerequisite for COMP9021?"),
+        ("Does COMP3311 require COMP2521?", "Does COMP2521 require COMP3311?"),
+        ("Can I take COMP9024 instead of COMP9021 if I've done COMP1511?",
+         "Can I take COMP9021 instead of COMP9024 if I've done COMP1511?"),
+    ],
+)
+def test_response_cache_never_serves_reversed_pair(question, reversed_question):
+    cache = ResponseCache()
+    cache.store(question, "Yes")
+    assert cache.lookup(question).exact
+    assert cache.lookup(reversed_question) is None
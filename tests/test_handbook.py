@@ -0,0 +1,88 @@
+"""Tests for the local handbook index."""
+
+import sqlite3
+import time
+
+import pytest
+
+from src.handbook import HandbookIndex, HandbookPage, answers_query, query_terms
+
+PROGRAMS = {
+    "8543": (
+        "Master of Information Technology",
+        "The Master of Information Technology prepares graduates for the IT industry. "
+        "Entry requirements: a bachelor degree in any discipline. Duration two years.",
+    ),
+    "8959": (
+        "Master of Data Science",
+        "The Master of Data Science combines statistics and computing for information technology roles. "
+        "Entry requirements: a bachelor degree with mathematics. Duration two years.",
+    ),
+}
+
+
+def _page(code, title, content):
+    return HandbookPage(f"https://www.handbook.unsw.edu.au/{code}", code, "program", title, content, time.time())
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = HandbookIndex(str(tmp_path / "handbook.sqlite"))
+    for code, (title, content) in PROGRAMS.items():
+        index.add(_page(code, title, content))
+    return index
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["UNSW Master of IT", "Tell me about the Master of IT", "entry requirements Master of Information Technology"],
+)
+def test_search_finds_the_program_asked_about(index, query):
+    assert [page.code for page in index.search(query, kind="program", limit=1)] == ["8543"]
+
+
+def test_search_misses_loosely_related_programs(index):
+    assert index.search("Master of Business Analytics", kind="program") == []
+    assert index.stats["weak_matches"] > 0
+
+
+def test_query_terms_expand_upper_case_abbreviations_only():
+    assert query_terms("Master of IT") == ["master", "information", "technology"]
+    assert query_terms("is it hard") == ["hard"]
+
+
+def test_unstemmed_index_is_rebuilt(tmp_path):
+    path = str(tmp_path / "old.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE pages (url TEXT PRIMARY KEY, code TEXT NOT NULL, kind TEXT NOT NULL, title TEXT NOT NULL,"
+        " content TEXT NOT NULL, fetched_at REAL NOT NULL)"
+    )
+    conn.execute("CREATE VIRTUAL TABLE pages_fts USING fts5(title, content, code)")
+    conn.commit()
+    conn.close()
+    index = HandbookIndex(path)
+    title, content = PROGRAMS["8543"]
+    index.add(_page("8543", title, content))
+    assert [page.code for page in index.search("entry requirements Master of IT")] == ["8543"]
+
+
+COURSE_RESULT = [{
+    "title": "COMP9021 Principles of Programming",
+    "raw_content": "Units of credit: 6. Offering terms: Term 1, Term 3. Prerequisites: none. Assessment: exam 60%.",
+}]
+
+
+@pytest.mark.parametrize(
+    "query, answered",
+    [
+        ("COMP9021 course details UNSW", True),
+        ("UNSW handbook course overview prerequisites", True),
+        ("Is COMP9021 offered in term 3?", True),
+        ("COMP9021 assessments", True),
+        ("COMP9021 fees", False),
+        ("COMP9021 exam weighting", False),
+    ],
+)
+def test_answers_query_only_for_overview_or_covered_terms(query, answered):
+    assert answers_query(COURSE_RESULT, query) is answered
@@ -0,0 +1,54 @@
+"""Tests for per-host circuit breakers and hedge delays."""
+
+import httpx
+import pytest
+
+import src.tavilys as tavilys
+from src import host_health
+from src.host_health import CLOSED, DEFAULT_HEDGE_DELAY, HALF_OPEN, OPEN, HostMonitor
+
+
+def test_breaker_opens_after_consecutive_failures():
+    monitor = HostMonitor(failure_threshold=2, cooldown=60)
+    monitor.record("a.example", 0.1, ok=False)
+    assert monitor.allow("a.example")
+    monitor.record("a.example", 0.1, ok=False)
+    assert not monitor.allow("a.example")
+    assert monitor.report()["a.example"]["state"] == OPEN
+
+
+def test_half_open_allows_one_trial_and_closes_on_success():
+    monitor = HostMonitor(failure_threshold=1, cooldown=0)
+    monitor.record("a.example", 0.1, ok=False)
+    assert monitor.allow("a.example")
+    assert monitor.report()["a.example"]["state"] == HALF_OPEN
+    assert not monitor.allow("a.example")
+    monitor.record("a.example", 0.1, ok=True)
+    assert monitor.report()["a.example"]["state"] == CLOSED
+
+
+def test_hedge_delay_defaults_without_history():
+    assert HostMonitor().hedge_delay("new.example") == DEFAULT_HEDGE_DELAY
+
+
+class _RaisingClient:
+    def get(self, url, **kwargs):
+        raise httpx.InvalidURL("bad url")
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    monitor = HostMonitor(failure_threshold=1, cooldown=0)
+    monkeypatch.setattr(host_health, "_monitor", monitor)
+    monkeypatch.setattr(tavilys, "http_client", _RaisingClient())
+    return monitor
+
+
+def test_trial_that_raises_non_http_error_is_recorded(monitor):
+    monitor.record("a.example", 0.1, ok=False)
+    # The half-open trial raises something other than httpx.HTTPError
+    with pytest.raises(httpx.InvalidURL):
+        tavilys._download_page_markdown("https://a.example/page")
+    assert monitor.report()["a.example"]["failures"] == 2
+    # The failed trial reopened the breaker; after the cooldown another trial may run
+    assert monitor.allow("a.example")
@@ -0,0 +1,38 @@
+"""Tests for near-duplicate page detection."""
+
+import time
+
+from src.cache import DEFAULT_TTLS
+from src.page_dedup import PageFingerprintStore, page_codes
+
+PAGE = " ".join(f"word{i}" for i in range(200)) + " COMP9021 handbook page"
+
+
+def test_near_duplicate_reuses_summary():
+    store = PageFingerprintStore()
+    signature = store.signature(PAGE)
+    store.add("https://a.example/x", signature, page_codes(PAGE), "summary", "x.md")
+    mirror = PAGE + " footer"
+    match = store.find(store.signature(mirror), page_codes(mirror))
+    assert match is not None and match.page.filename == "x.md"
+
+
+def test_different_course_codes_never_match():
+    store = PageFingerprintStore()
+    store.add("https://a.example/x", store.signature(PAGE), page_codes(PAGE), "summary", "x.md")
+    other = PAGE.replace("COMP9021", "COMP9020")
+    assert store.find(store.signature(other), page_codes(other)) is None
+
+
+def test_short_pages_are_not_fingerprinted():
+    assert PageFingerprintStore().signature("too short") is None
+
+
+def test_fingerprint_age_is_capped_at_summary_ttl():
+    store = PageFingerprintStore(max_age_seconds=30 * 24 * 60 * 60)
+    assert store.max_age_seconds == DEFAULT_TTLS["summary"]
+    signature = store.signature(PAGE)
+    store.add("https://a.example/x", signature, page_codes(PAGE), "summary", "x.md")
+    # Once the source summary has expired, the page is summarized afresh
+    store._entries["https://a.example/x"].created_at = time.time() - DEFAULT_TTLS["summary"] - 60
+    assert store.find(signature, page_codes(PAGE)) is None
@@ -0,0 +1,62 @@
+"""Tests for enrolment rule parsing and the prerequisite graph."""
+
+from src.prereq_graph import PrerequisiteGraph, is_satisfied, parse_course_page, parse_requirement
+
+HANDBOOK_RULE = "Prerequisite: COMP1511 or DPST1091 or COMP1911 or COMP1917, and COMP1521 or DPST1092"
+
+
+def test_and_binds_tighter_than_or():
+    assert parse_requirement("COMP1511 and (MATH1081 or MATH1131)") == (
+        "and", ["COMP1511", ("or", ["MATH1081", "MATH1131"])]
+    )
+    assert parse_requirement("COMP1511 and COMP1521 or COMP2521") == (
+        "or", [("and", ["COMP1511", "COMP1521"]), "COMP2521"]
+    )
+
+
+def test_comma_and_separates_clauses():
+    expr = parse_requirement(HANDBOOK_RULE)
+    assert expr == (
+        "and",
+        [("or", ["COMP1511", "DPST1091", "COMP1911", "COMP1917"]), ("or", ["COMP1521", "DPST1092"])],
+    )
+    assert not is_satisfied(expr, {"COMP1511"})
+    assert is_satisfied(expr, {"COMP1911", "DPST1092"})
+
+
+def test_semicolon_separates_clauses():
+    expected = ("and", [("or", ["COMP1511", "DPST1091"]), ("or", ["COMP1521", "COMP1531"])])
+    assert parse_requirement("COMP1511 or DPST1091; COMP1521 or COMP1531") == expected
+    assert parse_requirement("COMP1511 or DPST1091; and COMP1521 or COMP1531") == expected
+
+
+def test_plain_commas_and_slashes():
+    assert parse_requirement("COMP1511, COMP1521") == ("and", ["COMP1511", "COMP1521"])
+    assert parse_requirement("COMP2521 / COMP9024") == ("or", ["COMP2521", "COMP9024"])
+    assert parse_requirement("COMP1511 & COMP1521, or COMP2521") == (
+        "or", [("and", ["COMP1511", "COMP1521"]), "COMP2521"]
+    )
+    assert parse_requirement("Enrolment in a Computer Science program") is None
+
+
+def test_parse_course_page_reads_rules_uoc_and_terms():
+    node = parse_course_page(
+        "COMP2521",
+        "COMP2521 Data Structures and Algorithms",
+        f"Units of Credit: 6\nOffering Terms: Term 1, Term 2, Term 3\n{HANDBOOK_RULE}\n\n"
+        "Exclusions: COMP9024\n",
+    )
+    assert node.uoc == 6
+    assert node.terms == {"T1", "T2", "T3"}
+    assert node.exclusions == {"COMP9024"}
+    assert not is_satisfied(node.prerequisite, {"COMP1511"})
+
+
+def test_study_order_follows_clauses():
+    graph = PrerequisiteGraph()
+    graph.add_page("COMP1511", "Offering Terms: Term 1", code="COMP1511")
+    graph.add_page("COMP1521", "Prerequisite: COMP1511", code="COMP1521")
+    graph.add_page("COMP2521", HANDBOOK_RULE, code="COMP2521")
+    layers, unresolved = graph.study_order(["COMP2521"])
+    assert layers == [["COMP1511"], ["COMP1521"], ["COMP2521"]]
+    assert unresolved == []
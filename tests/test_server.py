@@ -0,0 +1,35 @@
+"""Tests for the HTTP server's request validation."""
+
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.server import create_app
+
+
+async def _post(body: str) -> tuple[int, dict]:
+    # Invalid requests are rejected before the agent runs, so none is needed
+    async with TestClient(TestServer(create_app(agent=None))) as client:
+        response = await client.post("/chat", data=body, headers={"Content-Type": "application/json"})
+        return response.status, await response.json()
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        "not json",
+        "[1, 2]",
+        '"hi"',
+        "null",
+        "{}",
+        '{"message": "   "}',
+        '{"message": 42}',
+        '{"message": ["hi"]}',
+        '{"message": "hi", "session_id": 7}',
+    ],
+)
+def test_invalid_chat_requests_are_rejected(body):
+    status, payload = asyncio.run(_post(body))
+    assert status == 400
+    assert "error" in payload
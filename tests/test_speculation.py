@@ -0,0 +1,39 @@
+"""Tests for choosing the speculative first search."""
+
+import pytest
+
+from src.budget import SPECULATIVE_ID_PREFIX
+from src.speculation import plan_speculative_search
+
+
+def _tool(message: str) -> str | None:
+    call = plan_speculative_search(message)
+    return call["name"] if call else None
+
+
+def test_course_codes_prefetch_course_details():
+    call = plan_speculative_search("Can I take COMP9020 and comp 9021 together?")
+    assert call["name"] == "parallel_course_details"
+    assert call["args"]["course_codes"] == ["COMP9020", "COMP9021"]
+    assert call["id"].startswith(SPECULATIVE_ID_PREFIX)
+
+
+@pytest.mark.parametrize(
+    "message, tool",
+    [
+        ("What is program 8543?", "search_unsw_programs"),
+        ("Tell me about the Master of Data Science", "search_unsw_programs"),
+        ("What jobs can I get with a Master of IT?", "search_career_opportunities"),
+        ("Do I need a student visa to study at UNSW?", "search_international_student_info"),
+    ],
+)
+def test_topic_messages_use_their_search_tool(message, tool):
+    assert _tool(message) == tool
+
+
+@pytest.mark.parametrize(
+    "message",
+    ["Hello", "How are you today?", "Where is the UNSW library?", "What should I do in 2026?"],
+)
+def test_off_topic_messages_are_not_speculated(message):
+    assert _tool(message) is None
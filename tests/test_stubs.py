@@ -0,0 +1,42 @@
+"""Tests for the offline stub backends."""
+
+from src.stubs import LatencyDistribution, StubBackendError, StubHttpClient, StubTavilyClient
+
+
+def _failures(client, calls=50):
+    outcomes = []
+    for i in range(calls):
+        try:
+            client.search(f"q{i}")
+            outcomes.append(False)
+        except StubBackendError:
+            outcomes.append(True)
+    return outcomes
+
+
+def test_seeded_backends_inject_repeatable_errors():
+    first = _failures(StubTavilyClient(error_rate=0.3, seed="7/search-errors"))
+    assert first == _failures(StubTavilyClient(error_rate=0.3, seed="7/search-errors"))
+    assert any(first) and not all(first)
+
+
+def test_backends_draw_errors_independently():
+    search = StubTavilyClient(error_rate=0.5, seed=1)
+    fetch = StubHttpClient(error_rate=0.5, seed=1)
+    alone = [fetch.get("https://a.example").status_code for _ in range(20)]
+    fetch = StubHttpClient(error_rate=0.5, seed=1)
+    interleaved = []
+    for _ in range(20):
+        try:
+            search.search("q")
+        except StubBackendError:
+            pass
+        interleaved.append(fetch.get("https://a.example").status_code)
+    assert alone == interleaved
+
+
+def test_latency_distribution_parse():
+    assert LatencyDistribution.parse("0.2").sample() == 0.2
+    uniform = LatencyDistribution.parse("uniform:0.1,0.5", seed=3)
+    assert 0.1 <= uniform.sample() <= 0.5
+    assert repr(uniform) == "uniform:0.1,0.5"
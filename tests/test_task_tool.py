@@ -0,0 +1,47 @@
+"""Tests for the sub-agent input state and file merging."""
+
+from src.state import ScopedFiles
+from langchain_core.messages import AIMessage
+
+from src.task_tool import _merge_subagent_files, _subagent_report, _subagent_state
+
+STATE = {
+    "messages": [{"role": "user", "content": "parent history"}],
+    "files": {"notes.md": "parent"},
+    "task_classification": {"task_type": "Course Planning", "difficulty": "Simple"},
+}
+
+
+def test_subagent_state_is_isolated_and_keeps_the_classification():
+    sub_state = _subagent_state("Find COMP9020 prerequisites", STATE)
+    assert sub_state["messages"] == [{"role": "user", "content": "Find COMP9020 prerequisites"}]
+    assert isinstance(sub_state["files"], ScopedFiles)
+    assert sub_state["files"]["notes.md"] == "parent"
+    assert sub_state["task_classification"] == STATE["task_classification"]
+
+
+def test_parallel_subagent_state_uses_the_given_files():
+    sub_state = _subagent_state("task", STATE, {"other.md": "x"})
+    assert dict(sub_state["files"]) == {"other.md": "x"}
+    assert sub_state["task_classification"]["difficulty"] == "Simple"
+
+
+def test_merge_renames_conflicting_writes():
+    merged, renamed = _merge_subagent_files(
+        {"notes.md": "parent"},
+        [("course-planner", {"plan.md": "a", "notes.md": "parent"}), ("career-advisor", {"plan.md": "b"})],
+    )
+    assert merged == {"plan.md": "a", "career-advisor_plan.md": "b"}
+    assert renamed == ["career-advisor_plan.md"]
+
+
+def test_report_of_finished_subagent_is_its_answer():
+    result = {"messages": [AIMessage(content="COMP9020 needs COMP1511")], "files": {}}
+    assert _subagent_report("course-planner", result, timed_out=False, deadline=60) == "COMP9020 needs COMP1511"
+
+
+def test_report_of_subagent_without_answer():
+    result = {"messages": [], "files": ScopedFiles({}, {"plan.md": "draft"})}
+    report = _subagent_report("course-planner", result, timed_out=False, deadline=60)
+    assert "without producing an answer" in report
+    assert "plan.md" in report
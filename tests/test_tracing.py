@@ -0,0 +1,56 @@
+"""Tests for span nesting and the OTLP/JSON trace file format."""
+
+import json
+
+import pytest
+
+from src import tracing
+from src.tracing import SERVICE_NAME, configure_tracing, iter_otlp_spans, span
+
+
+@pytest.fixture
+def trace_path(tmp_path, monkeypatch):
+    monkeypatch.delenv(tracing.TRACE_PATH_ENV, raising=False)
+    path = tmp_path / "traces.jsonl"
+    configure_tracing(str(path))
+    yield path
+    configure_tracing(None)
+
+
+def _lines(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_each_line_is_an_otlp_export_request(trace_path):
+    with span("turn"):
+        with span("tavily.search", query="COMP9020"):
+            pass
+
+    lines = _lines(trace_path)
+    assert len(lines) == 2
+    resource_spans = lines[0]["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"][0] == {"key": "service.name", "value": {"stringValue": SERVICE_NAME}}
+    assert resource_spans["scopeSpans"][0]["scope"]["name"] == tracing.SCOPE_NAME
+
+    child, parent = (next(iter_otlp_spans(line)) for line in lines)
+    assert (child["name"], parent["name"]) == ("tavily.search", "turn")
+    assert child["parentSpanId"] == parent["spanId"]
+    assert child["traceId"] == parent["traceId"]
+    assert "parentSpanId" not in parent
+    assert child["attributes"] == [{"key": "query", "value": {"stringValue": "COMP9020"}}]
+    assert "resource" not in child
+
+
+def test_errors_are_recorded(trace_path):
+    with pytest.raises(ValueError):
+        with span("page.fetch"):
+            raise ValueError("boom")
+    (recorded,) = iter_otlp_spans(_lines(trace_path)[0])
+    assert recorded["status"] == {"code": tracing.STATUS_ERROR, "message": "ValueError: boom"}
+
+
+def test_span_is_a_no_op_while_tracing_is_off(monkeypatch):
+    monkeypatch.delenv(tracing.TRACE_PATH_ENV, raising=False)
+    configure_tracing(None)
+    with span("anything") as span_:
+        assert span_ is None
@@ -0,0 +1,47 @@
+"""Tests for the token usage ledger."""
+
+from src.usage import UsageLedger, UsageRecord, summarize_records
+
+
+def _record(request_id: str, source: str = "main_agent", tokens: int = 100, cost: float = 0.001) -> UsageRecord:
+    return UsageRecord(request_id, source, "qwen-flash", tokens, tokens // 2, False, cost, 0.0)
+
+
+def test_request_report_and_process_totals():
+    ledger = UsageLedger()
+    ledger.add(_record("a"))
+    ledger.add(_record("a", "summarize_webpage_content", cost=0.003))
+    ledger.add(_record("b"))
+
+    report = ledger.report("a")
+    assert (report["requests"], report["calls"], report["input_tokens"]) == (1, 2, 200)
+    assert list(report["by_source"]) == ["summarize_webpage_content", "main_agent"]
+
+    totals = ledger.report()
+    assert (totals["requests"], totals["calls"], totals["output_tokens"]) == (2, 3, 150)
+    assert totals["by_source"]["main_agent"]["calls"] == 2
+
+
+def test_finished_requests_are_dropped_but_stay_in_totals():
+    ledger = UsageLedger()
+    ledger.add(_record("a"))
+    ledger.finish("a")
+    assert ledger.report("a")["calls"] == 0
+    assert ledger.report()["calls"] == 1
+    assert not ledger._open
+
+
+def test_unfinished_requests_are_bounded():
+    ledger = UsageLedger(max_open_requests=3)
+    for i in range(10):
+        ledger.add(_record(str(i)))
+    assert list(ledger._open) == ["7", "8", "9"]
+    assert ledger.report()["requests"] == 10
+
+
+def test_summarize_records_matches_the_ledger():
+    records = [_record("a"), _record("b", "classify_task_complexity")]
+    ledger = UsageLedger()
+    for record in records:
+        ledger.add(record)
+    assert summarize_records(records) == ledger.report()
@@ -7,6 +7,11 @@ Supports sub-agents, TODO management, and a virtual file system.
 from operator import imod
 import sys, os
 sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
+import argparse
+import asyncio
+import contextlib
+import functools
+import uuid
 import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
@@ -15,12 +20,13 @@ from re import sub
 from dotenv import load_dotenv
 # TavilyClient is imported in tavily.py module
 from IPython.display import Image, display
-from langchain_core.messages import HumanMessage, ToolMessage
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 from langchain_core.tools import tool
 from langgraph.types import Command
 from langgraph.prebuilt import InjectedState
 from langchain_core.tools import InjectedToolCallId
 from langgraph.prebuilt import create_react_agent
+from langgraph.graph import StateGraph, START, END
 from src.search_tools import search_career_opportunities,search_course_details,search_international_student_info,search_unsw_programs
 from src.prompts import international_advisor_subagent_prompt,course_planner_subagent_prompt,career_advisor_subagent_prompt,INSTRUCTIONS
 from src.state import DeepAgentState
@@ -32,10 +38,20 @@ from src.research_tools import (
     parallel_career_opportunities,
     parallel_international_info,
 )
-from src.task_tool import _create_task_tool
+from src.task_tool import _create_parallel_task_tool, _create_subagent_registry, _create_task_tool
 from src.todo_tools import write_todos, read_todos, classify_task_complexity
 from src.file_tools import ls, read_file, write_file
-from src.utils import format_messages
+from src.planner_tools import course_prerequisites, plan_degree
+from src.utils import format_messages, format_turn_timings, stream_agent_cli
+from src.response_cache import ResponseCache
+from src.prefetch import get_prefetcher
+from src.speculation import create_speculation_node
+from src.budget import BudgetController, format_budget_usage
+from src.stubs import install_stub_backends
+from src.tracing import TRACE_PATH_ENV, configure_tracing, tracing_callbacks
+from src.usage import format_usage_report, get_usage_ledger, usage_callbacks
+from src.prompt_prefix import prefix_callbacks
+from src.profiling import TurnProfiler
 # 导入deep-agents
 
 # Load environment variables
@@ -76,7 +92,7 @@ course_planner_subagent = {
     "name": "course-planner",
     "description": "Delegate course planning tasks to the course planner. Focus on course selection, prerequisites, and study pathways.",
     "prompt": course_planner_subagent_prompt,
-    "tools": ["search_course_details", "search_unsw_programs", "think_tool"],
+    "tools": ["search_course_details", "search_unsw_programs", "course_prerequisites", "plan_degree", "think_tool"],
 }
 
 # Career advisor sub-agent
@@ -97,12 +113,8 @@ international_advisor_subagent = {
 
 # ==================== 创建智能体 ====================
 
-def create_unsw_deep_agent():
-    """Create the deep-agents based UNSW course advisor"""
-    
-    # Initialize LLM
-    llm = create_llm()
-    
+def create_main_tools(llm):
+    """Create the full tool set of the main agent (sub-agent delegation runs on `llm`)"""
     # Define sub-agents
     subagents = [
         course_planner_subagent,
@@ -110,14 +122,14 @@ def create_unsw_deep_agent():
         international_advisor_subagent
     ]
     
-    sub_agent_tools = [search_unsw_programs, search_course_details, search_career_opportunities, search_international_student_info, think_tool]
-    # Create task tool
-    task_tool = _create_task_tool(
-        sub_agent_tools, subagents, llm, DeepAgentState
-    )
+    sub_agent_tools = [search_unsw_programs, search_course_details, search_career_opportunities, search_international_student_info, course_prerequisites, plan_degree, think_tool]
+    # Compile the sub-agents once; task and parallel_task share them
+    agents = _create_subagent_registry(sub_agent_tools, subagents, llm, DeepAgentState)
+    task_tool = _create_task_tool(agents, subagents)
+    parallel_task_tool = _create_parallel_task_tool(agents, subagents)
     
     # Define base tools
-    basic_tools = [
+    return [
         search_unsw_programs,
         search_course_details, 
         search_career_opportunities,
@@ -134,20 +146,123 @@ def create_unsw_deep_agent():
         ls,
         read_file,
         write_file,
-        task_tool
+        task_tool,
+        parallel_task_tool
     ]
+
+
+def create_unsw_deep_agent(llm=None, checkpointer=None):
+    """Create the deep-agents based UNSW course advisor
+
+    Args:
+        llm: Chat model to use (default: create_llm())
+        checkpointer: Optional checkpointer keeping per-thread conversation state
+    """
+    
+    # Initialize LLM
+    llm = llm or create_llm()
+    basic_tools = create_main_tools(llm)
     
-    # Create simple ReAct agent
+    # Create simple ReAct agent; the budget controller binds the tool subset of
+    # the request's task type and difficulty, and forces a final answer once
+    # the request's tool-call or time budget is spent
+    budget = BudgetController(llm, basic_tools)
     agent = create_react_agent(
-        llm, basic_tools+[task_tool], prompt=INSTRUCTIONS, state_schema=DeepAgentState
+        budget.select_model,
+        basic_tools,
+        prompt=INSTRUCTIONS,
+        state_schema=DeepAgentState,
+        pre_model_hook=budget.pre_model_hook,
+        post_model_hook=budget.post_model_hook,
     )
     
-    return agent
+    # Pre-agent stage: classification and a speculative first search run
+    # concurrently, so the agent starts with both already in state
+    workflow = StateGraph(DeepAgentState)
+    workflow.add_node("speculate", create_speculation_node())
+    workflow.add_node("agent", agent)
+    workflow.add_edge(START, "speculate")
+    workflow.add_edge("speculate", "agent")
+    workflow.add_edge("agent", END)
+    
+    return workflow.compile(checkpointer=checkpointer)
 
 # ==================== Main ====================
 
-def main():
+def parse_args(argv=None):
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="UNSW Deep-Agents Course Advisor")
+    parser.add_argument("--serve", action="store_true", help="Serve many sessions over HTTP/SSE instead of the REPL")
+    parser.add_argument("--host", default="127.0.0.1", help="Server bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Server port (default: 8000)")
+    parser.add_argument("--max-concurrent", type=int, default=8, help="Turns executing at once in server mode")
+    parser.add_argument("--max-queue", type=int, default=32, help="Turns allowed to wait before returning 503")
+    parser.add_argument("--workers", type=int, default=1, help="Pre-forked worker processes in server mode (default: 1)")
+    parser.add_argument(
+        "--trace", nargs="?", const="traces.jsonl", default=None, metavar="PATH",
+        help="Write per-node / per-tool latency spans as OpenTelemetry JSONL (default file: traces.jsonl)",
+    )
+    parser.add_argument(
+        "--profile", nargs="?", const="profiles", default=None, metavar="DIR",
+        help="Write CPU (cProfile + flame-graph stacks) and memory profiles per turn (default dir: profiles)",
+    )
+    parser.add_argument("--stub", action="store_true", help="Use offline stub model and search backends (no API keys)")
+    parser.add_argument(
+        "--batch", metavar="QUESTIONS.jsonl",
+        help="Answer every question of a JSONL file instead of the REPL (resumes into an existing output file)",
+    )
+    parser.add_argument("--batch-output", metavar="PATH", help="Batch answers JSONL (default: <input>.answers.jsonl)")
+    parser.add_argument("--batch-concurrency", type=int, default=4, help="Batch questions running at once (default: 4)")
+    return parser.parse_args(argv)
+
+
+def build_server_advisor(stub=False):
+    """Build an advisor that keeps per-session conversation state in memory"""
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    llm = install_stub_backends() if stub else None
+    return create_unsw_deep_agent(llm=llm, checkpointer=InMemorySaver())
+
+
+def serve(args):
+    """Build the advisor once (per worker) and serve concurrent sessions over SSE"""
+    from src.server import run_server
+    from src.workers import run_worker_pool
+
+    server_options = {"max_concurrent_runs": args.max_concurrent, "max_queue": args.max_queue}
+    print(f"🌐 Serving the advisor on http://{args.host}:{args.port} (POST /chat, GET /health)")
+    if args.workers > 1:
+        print(f"🧵 Pre-forking {args.workers} workers with session affinity and a shared cache")
+        run_worker_pool(
+            functools.partial(build_server_advisor, stub=args.stub),
+            args.workers,
+            host=args.host,
+            port=args.port,
+            **server_options,
+        )
+        return
+    run_server(build_server_advisor(stub=args.stub), host=args.host, port=args.port, **server_options)
+
+
+def run_batch_mode(args):
+    """Answer a JSONL file of questions concurrently, sharing one advisor and its caches"""
+    from src.batch import default_output_path, run_batch
+
+    advisor = create_unsw_deep_agent(llm=install_stub_backends() if args.stub else None)
+    output_path = args.batch_output or default_output_path(args.batch)
+    print(f"📚 Batch: {args.batch} -> {output_path} ({args.batch_concurrency} at a time)")
+    summary = asyncio.run(run_batch(
+        advisor, args.batch, output_path, concurrency=args.batch_concurrency, response_cache=ResponseCache()
+    ))
+    print(f"📈 Batch summary: {summary}")
+    print(f"💰 Batch token usage: {format_usage_report(get_usage_ledger().report())}")
+
+
+def main(argv=None):
     """Main entrypoint"""
+    args = parse_args(argv)
+    if configure_tracing(args.trace):
+        print(f"🧭 Tracing spans to {args.trace or os.environ.get(TRACE_PATH_ENV)}")
     print("🎓 UNSW Deep-Agents Course Advisor")
     print("=" * 80)
     print("Deep-agents based course advisor")
@@ -155,18 +270,33 @@ def main():
     print("=" * 80)
     
     # Check API keys
-    if not os.environ.get("DASHSCOPE_API_KEY") or os.environ.get("DASHSCOPE_API_KEY") == "your_dashscope_api_key_here":
+    if args.stub:
+        print("🧪 Using offline stub model and search backends")
+    elif not os.environ.get("DASHSCOPE_API_KEY") or os.environ.get("DASHSCOPE_API_KEY") == "your_dashscope_api_key_here":
         print("⚠️  Please set your DASHSCOPE_API_KEY in the .env file")
         return
     
-    if not os.environ.get("TAVILY_API_KEY") or os.environ.get("TAVILY_API_KEY") == "your_tavily_api_key_here":
+    if not args.stub and (not os.environ.get("TAVILY_API_KEY") or os.environ.get("TAVILY_API_KEY") == "your_tavily_api_key_here"):
         print("⚠️  Please set your TAVILY_API_KEY in the .env file")
         return
     
+    if args.serve:
+        serve(args)
+        return
+
+    if args.batch:
+        run_batch_mode(args)
+        return
+    
     try:
         # Create advisor
-        advisor = create_unsw_deep_agent()
+        advisor = create_unsw_deep_agent(llm=install_stub_backends() if args.stub else None)
+        response_cache = ResponseCache()
+        turn_timings = []
+        profiler = TurnProfiler(args.profile) if args.profile else None
         print("✅ Deep-Agents Student Advisor initialized successfully!")
+        if profiler:
+            print(f"🔬 Profiling each turn into {args.profile}/")
         
         # Workflow graph (optional)
         # try:
@@ -198,24 +328,52 @@ def main():
             user_input = input("\n🔍 Your question (enter 'quit','exit', 'quit' to exit the program): ").strip()
             
             if user_input.lower() in ['quit', 'exit', 'quit']:
+                print(f"📈 Response cache: {response_cache.metrics()}")
+                print(f"📦 Prefetch: {dict(get_prefetcher().stats)}")
+                print(f"💰 Session token usage: {format_usage_report(get_usage_ledger().report())}")
+                if turn_timings:
+                    ttfts = [t["time_to_first_token"] for t in turn_timings if t["time_to_first_token"] is not None]
+                    if ttfts:
+                        print(f"⏱️  Mean time to first token over {len(ttfts)} turn(s): {sum(ttfts) / len(ttfts):.2f}s")
                 print("👋 Goodbye!")
                 break
             
             if not user_input:
                 continue
             
+            # Answer repeated / near-duplicate questions without running the agent
+            cached = response_cache.lookup(user_input)
+            if cached is not None:
+                print(f"\n⚡ Answered from cache (matched: '{cached.matched_query}', "
+                      f"similarity {cached.similarity:.2f}, age {cached.age_seconds:.0f}s)")
+                format_messages([HumanMessage(content=user_input), AIMessage(content=cached.answer)])
+                continue
+            
             try:
                 print("\n🧠 Deep-Agents analyzing...")
                 
-                # Pre-processing hint (agent decides complexity & budget)
-                print("🎯 Calling complexity assessment tool to determine TODO complexity and tool budget...")
+                # Pre-agent stage classifies and prefetches before the agent plans
+                print("🎯 Classifying complexity and prefetching a first search in parallel...")
                 
-                # Invoke advisor
-                result = advisor.invoke(
-                    {"messages": [HumanMessage(content=user_input)]},
-                    config={"recursion_limit": 100}
+                # Stream the answer and tool / sub-agent progress as they arrive
+                request_id = uuid.uuid4().hex
+                with profiler.profile_turn() if profiler else contextlib.nullcontext() as profile_files:
+                    result, timings = asyncio.run(stream_agent_cli(
+                        advisor,
+                        {"messages": [HumanMessage(content=user_input)]},
+                        config={"recursion_limit": 100, "callbacks": [*tracing_callbacks(), *usage_callbacks(request_id), *prefix_callbacks()]}
+                    ))
+                if profile_files:
+                    print(f"🔬 Profile: {profile_files['summary']} (flame graph stacks: {profile_files['folded']})")
+                turn_timings.append(timings.as_dict())
+                print(f"⏱️  {format_turn_timings(timings)}")
+                if result.get("budget_usage"):
+                    print(f"📊 Budget {format_budget_usage(result['budget_usage'])}")
+                print(f"💰 Tokens {format_usage_report(get_usage_ledger().report(request_id))}")
+                get_usage_ledger().finish(request_id)
+                response_cache.store(
+                    user_input, result["messages"][-1].content, result.get("files", {})
                 )
-                format_messages(result["messages"])
                     
             except Exception as e:
                 print(f"❌ Error: {e}")